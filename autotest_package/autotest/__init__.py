@@ -2,15 +2,35 @@
 AutoTest Package - Automated Web Testing Framework
 """
 
-from .core.web_test_generator import WebTestGenerator
-from .core.llm_wrapper import LLMWrapper
-from .core.prompt_manager import PromptManager
-from .core.url_extractor import URLExtractor
-from .utils.logging_utils import ContextFilter
-from .db.database import init_db, SessionLocal
-from .tables.page import Page
-from .tables.redirect import Redirect
-from .tables.test_case_data import TestCase
+import importlib
+
+# Public names are imported on first access (PEP 562), so importing the package
+# or running the CLI parser doesn't load Selenium, SQLAlchemy or LLM SDKs.
+_LAZY_IMPORTS = {
+    'WebTestGenerator': '.core.web_test_generator',
+    'LLMWrapper': '.core.llm_wrapper',
+    'PromptManager': '.core.prompt_manager',
+    'URLExtractor': '.core.url_extractor',
+    'ContextFilter': '.utils.logging_utils',
+    'init_db': '.db.database',
+    'SessionLocal': '.db.database',
+    'Page': '.tables.page',
+    'Redirect': '.tables.redirect',
+    'TestCase': '.tables.test_case_data',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
 
 __version__ = "1.0.0"
 __author__ = "Ankit Saha"
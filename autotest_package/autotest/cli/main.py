@@ -1,6 +1,7 @@
 import argparse
+import re
 import sys
-from ..core.web_test_generator import WebTestGenerator
+from ..core.selection_policy import SelectionPolicy
 
 def main():
     parser = argparse.ArgumentParser(description="Automated Website Testing Agent")
@@ -33,11 +34,104 @@ def main():
                        type=int,
                        default=1,
                        help="Maximum depth for recursive URL extraction (default: 1)")
+    parser.add_argument("--workers",
+                       type=int,
+                       default=1,
+                       help="Number of parallel browser workers for recursive mode (default: 1)")
+    parser.add_argument("--crawl-rate",
+                       type=float,
+                       default=1.0,
+                       help="Page loads per second and host during recursive URL extraction, 0 for no limit (default: 1)")
+    parser.add_argument("--discovery",
+                       choices=["hybrid", "browser"],
+                       default="hybrid",
+                       help="How recursive mode reads page links: over HTTP with the browser only for JS-rendered pages, or always in the browser (default: hybrid)")
+    parser.add_argument("--no-sitemap",
+                       action="store_true",
+                       help="Don't seed recursive mode with the URLs of the site's sitemaps")
+    parser.add_argument("--ignore-robots",
+                       action="store_true",
+                       help="Crawl URLs disallowed by robots.txt and ignore its Crawl-delay (e.g., on staging sites)")
+    parser.add_argument("--incremental",
+                       action="store_true",
+                       help="Send conditional requests with the stored ETag/Last-Modified and only load, analyze and "
+                            "generate scripts for pages that changed; unchanged pages run their stored scripts")
+    parser.add_argument("--resume",
+                       action="store_true",
+                       help="Continue the last interrupted recursive run of this URL from its checkpoint")
     
     parser.add_argument("--no-cache",
                         action="store_true",
                         help="Disable use of cache memory during testing")
     
+    parser.add_argument("--no-llm-cache",
+                        action="store_true",
+                        help="Always call the LLM provider instead of reusing cached responses")
+    
+    parser.add_argument("--no-session-reuse",
+                        action="store_true",
+                        help="Log in on every page that requires it instead of reusing the stored login session")
+    
+    parser.add_argument("--batch-scripts",
+                        action="store_true",
+                        help="Generate scripts for several test cases of a page per LLM request")
+    
+    parser.add_argument("--browser-pool-size",
+                        type=int,
+                        default=0,
+                        help="Keep this many warm Chrome sessions for analysis, URL extraction and URL workers (default: off)")
+    
+    parser.add_argument("--browser-max-leases",
+                        type=int,
+                        default=50,
+                        help="Replace a pooled Chrome session after this many leases (default: 50)")
+    
+    parser.add_argument("--script-workers",
+                        type=int,
+                        default=1,
+                        help="Number of generated test scripts executed in parallel (default: 1)")
+    
+    parser.add_argument("--script-cpu-limit",
+                        type=int,
+                        help="CPU time limit in seconds for each test script process")
+    
+    parser.add_argument("--script-memory-limit",
+                        type=int,
+                        help="Memory limit in MB for each test script process and the browsers it starts")
+    
+    parser.add_argument("--execution-mode",
+                        choices=["subprocess", "in-process"],
+                        default="subprocess",
+                        help="Run each test script in a new Python process, or in-process on warm pooled browsers (default: subprocess)")
+    
+    parser.add_argument("--analysis-chunk-tokens",
+                        type=int,
+                        help="Analyze pages larger than this many tokens region by region in concurrent LLM requests (0 disables)")
+    
+    parser.add_argument("--batch",
+                        action="store_true",
+                        help="Run without prompts, selecting URLs and test cases from the selection policy")
+    
+    parser.add_argument("--selection-policy",
+                        help="YAML file with the batch selection policy (types, name_pattern, max_per_page, url_pattern, max_urls)")
+    
+    parser.add_argument("--select-types",
+                        help="Comma separated test case types selected in batch mode (default: all)")
+    
+    parser.add_argument("--select-name",
+                        help="Regex a test case name must match to be selected in batch mode")
+    
+    parser.add_argument("--max-per-page",
+                        type=int,
+                        help="Maximum number of test cases selected per page in batch mode")
+    
+    parser.add_argument("--select-urls",
+                        help="Regex a discovered URL must match to be selected in batch mode")
+    
+    parser.add_argument("--max-urls",
+                        type=int,
+                        help="Maximum number of discovered URLs selected in batch mode")
+    
     parser.add_argument("--llm-provider",
                     type=int,
                     choices=[1, 2, 3, 4, 5],
@@ -45,24 +139,63 @@ def main():
                     help="LLM Provider choice: 1=OpenAI, 2=Groq, 3=Google-Gemini, 4=Anthropic, 5=Ollama")
     
     args = parser.parse_args()
+
+    # Imported after argument parsing so --help doesn't load Selenium and the LLM SDKs
+    from ..core.web_test_generator import WebTestGenerator
+    from ..core.browser_pool import BrowserPool
     
     try:
+        if args.selection_policy:
+            selection_policy = SelectionPolicy.from_file(args.selection_policy)
+        else:
+            selection_policy = SelectionPolicy(
+                types=args.select_types.split(',') if args.select_types else None,
+                name_pattern=args.select_name,
+                max_per_page=args.max_per_page,
+                url_pattern=args.select_urls,
+                max_urls=args.max_urls
+            )
+        browser_pool = None
+        if args.browser_pool_size:
+            # One session for the main generator plus one per URL worker
+            browser_pool = BrowserPool(size=max(args.browser_pool_size, args.workers + 1), max_leases=args.browser_max_leases)
+            browser_pool.start(warm=args.browser_pool_size)
         tester = WebTestGenerator(
             log_level=args.loglevel.upper(), 
             selenium_version=args.selenium_version, 
             wait_time=args.wait_time, 
             testing_tool=args.testing_tool, 
             language=args.language,
-            llm_provider_choice=args.llm_provider  # Add this line
+            llm_provider_choice=args.llm_provider,  # Add this line
+            use_llm_cache=not args.no_llm_cache,
+            batch_scripts=args.batch_scripts,
+            script_workers=args.script_workers,
+            script_cpu_limit=args.script_cpu_limit,
+            script_memory_limit=args.script_memory_limit,
+            interactive=not args.batch,
+            selection_policy=selection_policy,
+            analysis_chunk_tokens=args.analysis_chunk_tokens,
+            browser_pool=browser_pool,
+            execution_mode=args.execution_mode,
+            reuse_sessions=not args.no_session_reuse,
+            crawl_rate=args.crawl_rate,
+            discovery=args.discovery,
+            use_sitemaps=not args.no_sitemap,
+            respect_robots=not args.ignore_robots,
+            incremental=args.incremental
         )
-    except ValueError as e:
+    except (ValueError, OSError, re.error) as e:
         print(f"Invalid configuration: {str(e)}")
         sys.exit(1)
         
     #report_file = tester.run_workflow(args.url, args.username, args.password, args.no_cache, recursive=args.recursive, max_depth=args.max_depth)
     #print(f"Test report generated: {report_file}")
 
-    report_result = tester.run_workflow(args.url, args.username, args.password, args.no_cache, recursive=args.recursive, max_depth=args.max_depth)
+    try:
+        report_result = tester.run_workflow(args.url, args.username, args.password, args.no_cache, recursive=args.recursive, max_depth=args.max_depth, workers=args.workers, resume=args.resume)
+    finally:
+        if browser_pool:
+            browser_pool.close()
     if args.recursive:
         print(f"Test reports generated ({len(report_result)} files):")
         for i, report_file in enumerate(report_result, 1):
@@ -0,0 +1,132 @@
+"""
+Auth cache module for reusing detected login forms and verifying logins without the LLM
+"""
+import logging
+import threading
+
+from ..db.database import SessionLocal
+from ..tables.auth_form import AuthForm
+
+
+def observe_login_signal(url_changed, form_present, cookies_before, cookies_after):
+    """
+    Describe what changed in the browser after a login form was submitted
+
+    Args:
+        url_changed (bool): Whether the browser left the login URL
+        form_present (bool): Whether the password field is still displayed
+        cookies_before (iterable): Cookie names before submitting
+        cookies_after (iterable): Cookie names after submitting
+
+    Returns:
+        dict: Observed signal with url_changed, form_present and the new cookie names
+    """
+    return {
+        "url_changed": bool(url_changed),
+        "form_present": bool(form_present),
+        "cookies": sorted(set(cookies_after) - set(cookies_before))
+    }
+
+
+def evaluate_login_signal(observed, learned=None):
+    """
+    Decide deterministically whether a login succeeded
+
+    With a learned signal (recorded after an earlier verified login on the same
+    form) the login succeeded if the browser behaved the same way. Without one,
+    only unambiguous outcomes are decided: the form is gone after a redirect, or
+    nothing changed at all.
+
+    Args:
+        observed (dict): Signal returned by observe_login_signal
+        learned (dict): Signal of a previous successful login, or None
+
+    Returns:
+        bool: True or False, or None when the outcome is ambiguous
+    """
+    if learned:
+        if (observed["url_changed"] == learned["url_changed"]
+                and observed["form_present"] == learned["form_present"]
+                and set(learned["cookies"]) <= set(observed["cookies"])):
+            return True
+        return None
+    if observed["url_changed"] and not observed["form_present"]:
+        return True
+    if not observed["url_changed"] and observed["form_present"] and not observed["cookies"]:
+        return False
+    return None
+
+
+class AuthFormCache:
+    """Stores auth form selectors and login success signals per host and login form fingerprint"""
+
+    def __init__(self, logger=None):
+        """
+        Initialize auth form cache
+
+        Args:
+            logger (Logger): Optional logger
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    def get(self, host, form_fingerprint):
+        """
+        Get the cached auth form of a login form
+
+        Args:
+            host (str): Host of the login page
+            form_fingerprint (str): Fingerprint of the login form
+
+        Returns:
+            dict: Entry with selectors and success_signal, or None if the form is unknown
+        """
+        if not form_fingerprint:
+            return None
+        with SessionLocal() as db:
+            row = db.query(AuthForm).filter(
+                AuthForm.host == host, AuthForm.form_fingerprint == form_fingerprint
+            ).first()
+            if not row:
+                return None
+            return {"selectors": row.selectors, "success_signal": row.success_signal}
+
+    def save(self, host, form_fingerprint, selectors=None, success_signal=None):
+        """
+        Store the selectors and/or the success signal of a login form
+
+        Args:
+            host (str): Host of the login page
+            form_fingerprint (str): Fingerprint of the login form
+            selectors (dict): auth_form_selectors result, or None to keep the stored one
+            success_signal (dict): Signal of a verified login, or None to keep the stored one
+        """
+        if not form_fingerprint:
+            return
+        with self._lock, SessionLocal() as db:
+            row = db.query(AuthForm).filter(
+                AuthForm.host == host, AuthForm.form_fingerprint == form_fingerprint
+            ).first()
+            if not row:
+                row = AuthForm(host=host, form_fingerprint=form_fingerprint)
+                db.add(row)
+            if selectors is not None:
+                row.selectors = selectors
+            if success_signal is not None:
+                row.success_signal = success_signal
+            db.commit()
+        self.logger.debug(f"Stored auth form of '{host}'")
+
+    def forget(self, host, form_fingerprint):
+        """
+        Drop a cached auth form, e.g. when its selectors no longer match the page
+
+        Args:
+            host (str): Host of the login page
+            form_fingerprint (str): Fingerprint of the login form
+        """
+        with self._lock, SessionLocal() as db:
+            db.query(AuthForm).filter(
+                AuthForm.host == host, AuthForm.form_fingerprint == form_fingerprint
+            ).delete()
+            db.commit()
@@ -0,0 +1,24 @@
+"""
+Browser module for creating configured WebDriver instances
+"""
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+
+
+def create_chrome_driver():
+    """
+    Create a headless Chrome WebDriver with the standard autotest configuration
+
+    Returns:
+        webdriver.Chrome: Started Chrome WebDriver instance
+    """
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    service = Service()
+    # service = Service(ChromeDriverManager().install())
+    return webdriver.Chrome(service=service, options=chrome_options)
@@ -0,0 +1,299 @@
+"""
+Browser pool module for sharing warm headless Chrome sessions
+"""
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from ..utils.process_memory import process_tree_memory
+from .browser import create_chrome_driver
+
+# Storage of the page a session was left on, cleared before the next lease when CDP is unavailable
+_CLEAR_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+class PooledBrowser:
+    """A pooled WebDriver session with its lease and memory bookkeeping"""
+
+    def __init__(self, driver):
+        """
+        Initialize pooled browser
+
+        Args:
+            driver (WebDriver): Started WebDriver session
+        """
+        self.driver = driver
+        self.leases = 0
+        self.created_at = time.time()
+        self.baseline_memory = None
+
+
+class BrowserPool:
+    """Keeps warm headless Chrome sessions and leases them out one caller at a time"""
+
+    def __init__(self, size=2, max_leases=50, max_memory_growth_mb=256, driver_factory=None, logger=None):
+        """
+        Initialize browser pool
+
+        Args:
+            size (int): Maximum number of browser sessions
+            max_leases (int): Leases after which a session is replaced by a fresh one
+            max_memory_growth_mb (int): Growth of the memory of chromedriver and its Chrome processes
+                after the first lease, after which a session is replaced
+            driver_factory (callable): Function creating a WebDriver, defaults to create_chrome_driver
+            logger (Logger): Optional logger
+        """
+        self.size = max(1, size)
+        self.max_leases = max_leases
+        self.max_memory_growth = max_memory_growth_mb * 1024 * 1024 if max_memory_growth_mb else None
+        self.driver_factory = driver_factory or create_chrome_driver
+        self.logger = logger or logging.getLogger(__name__)
+        self._idle = queue.LifoQueue()  # Most recently used session first, it is the warmest
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+        self.stats = {"created": 0, "leases": 0, "recycled": 0, "unhealthy": 0}
+
+    def start(self, warm=None):
+        """
+        Start browser sessions ahead of the first lease
+
+        Args:
+            warm (int): Number of sessions to start, defaults to the pool size
+        """
+        for _ in range(min(warm or self.size, self.size)):
+            browser = self._create()
+            if browser:
+                self._idle.put(browser)
+
+    def _create(self):
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+        try:
+            browser = PooledBrowser(self.driver_factory())
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        with self._lock:
+            self.stats["created"] += 1
+            created = self.stats["created"]
+        self.logger.debug(f"Browser pool started session {created}")
+        return browser
+
+    def _discard(self, browser):
+        with self._lock:
+            self._created -= 1
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            self.logger.debug(f"Failed to quit pooled browser: {str(e)}")
+
+    def _is_healthy(self, browser):
+        try:
+            return browser.driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def acquire(self, timeout=None):
+        """
+        Lease a healthy browser session, starting one if the pool has capacity
+
+        Args:
+            timeout (float): Seconds to wait for a free session, None waits indefinitely
+
+        Returns:
+            PooledBrowser: Leased session, return it with release()
+
+        Raises:
+            TimeoutError: If no session became free within the timeout
+        """
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        deadline = time.time() + timeout if timeout is not None else None
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                browser = self._create()
+                if browser is None:
+                    if deadline is not None and time.time() >= deadline:
+                        raise TimeoutError("No browser session became available")
+                    # Poll, a discarded session frees capacity without returning to the queue
+                    try:
+                        browser = self._idle.get(timeout=0.5)
+                    except queue.Empty:
+                        continue
+
+            if self._is_healthy(browser):
+                break
+            with self._lock:
+                self.stats["unhealthy"] += 1
+            self.logger.warning("Pooled browser failed its health check, replacing it")
+            self._discard(browser)
+
+        browser.leases += 1
+        with self._lock:
+            self.stats["leases"] += 1
+        return browser
+
+    def release(self, browser):
+        """
+        Return a leased session, resetting or recycling it for the next caller
+
+        Args:
+            browser (PooledBrowser): Session returned by acquire()
+        """
+        if self._closed:
+            self._discard(browser)
+            return
+        if self.max_leases and browser.leases >= self.max_leases:
+            self.logger.debug(f"Recycling browser after {browser.leases} leases")
+            self._recycle(browser)
+            return
+        try:
+            self._reset(browser)
+        except Exception as e:
+            self.logger.warning(f"Failed to reset pooled browser, replacing it: {str(e)}")
+            self._discard(browser)
+            return
+        # Measured on the blank page the reset left, so page content doesn't skew the comparison
+        if self._memory_grew(browser):
+            self._recycle(browser)
+            return
+        self._idle.put(browser)
+
+    def discard(self, browser):
+        """
+        Quit a leased session instead of returning it, e.g. when its caller hung
+
+        Args:
+            browser (PooledBrowser): Session returned by acquire()
+        """
+        self._discard(browser)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """
+        Lease a browser session for the duration of a with block
+
+        Args:
+            timeout (float): Seconds to wait for a free session
+
+        Yields:
+            WebDriver: Driver of the leased session
+        """
+        browser = self.acquire(timeout=timeout)
+        try:
+            yield browser.driver
+        finally:
+            self.release(browser)
+
+    def _recycle(self, browser):
+        with self._lock:
+            self.stats["recycled"] += 1
+        self._discard(browser)
+
+    def _browser_memory(self, browser):
+        """Memory of the session's chromedriver and the Chrome processes it started, or None if unknown"""
+        process = getattr(getattr(browser.driver, "service", None), "process", None)
+        if process is None:
+            return None
+        return process_tree_memory(process.pid)
+
+    def _memory_grew(self, browser):
+        if not self.max_memory_growth:
+            return False
+        memory = self._browser_memory(browser)
+        if memory is None:
+            return False
+        if browser.baseline_memory is None:
+            browser.baseline_memory = memory
+            return False
+        if memory - browser.baseline_memory > self.max_memory_growth:
+            self.logger.debug(f"Recycling browser after its processes grew by {(memory - browser.baseline_memory) // (1024 * 1024)} MB")
+            return True
+        return False
+
+    def _visited_origins(self, driver):
+        """Origins in the current window's session history and frames"""
+        urls = []
+        try:
+            history = driver.execute_cdp_cmd("Page.getNavigationHistory", {})
+            urls.extend(entry.get("url") for entry in history.get("entries", []))
+        except Exception:
+            pass
+        try:
+            frames = [driver.execute_cdp_cmd("Page.getFrameTree", {})["frameTree"]]
+            while frames:
+                frame = frames.pop()
+                urls.append(frame.get("frame", {}).get("url"))
+                frames.extend(frame.get("childFrames", []))
+        except Exception:
+            pass
+        origins = set()
+        for url in urls:
+            parsed = urlparse(url or "")
+            if parsed.scheme in ("http", "https") and parsed.netloc:
+                origins.add(f"{parsed.scheme}://{parsed.netloc}")
+        return origins
+
+    def _reset(self, browser):
+        """Clear cookies and the storage of every origin visited by the previous lease and park the session on a blank page"""
+        driver = browser.driver
+        origins = self._visited_origins(driver)
+        if len(driver.window_handles) > 1:
+            for handle in driver.window_handles[1:]:
+                driver.switch_to.window(handle)
+                origins |= self._visited_origins(driver)
+                driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+        try:
+            # Clears cookies of every domain, not just the current one
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        except Exception:
+            driver.delete_all_cookies()
+        cleared = False
+        for origin in sorted(origins):
+            try:
+                # localStorage, IndexedDB, service workers and caches of the origin
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+                cleared = True
+            except Exception as e:
+                self.logger.debug(f"Failed to clear storage of {origin}: {str(e)}")
+        if not cleared:
+            driver.execute_script(_CLEAR_STORAGE_SCRIPT)
+        driver.get("about:blank")
+        try:
+            # The next lease's history then only holds the origins it visits
+            driver.execute_cdp_cmd("Page.resetNavigationHistory", {})
+        except Exception:
+            pass
+
+    def close(self):
+        """Quit all idle sessions; sessions still leased are quit when released"""
+        self._closed = True
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(browser)
+
+    def get_stats(self):
+        """
+        Get pool statistics
+
+        Returns:
+            dict: Created, leased, recycled and unhealthy session counts plus live sessions
+        """
+        with self._lock:
+            return {**self.stats, "live": self._created}
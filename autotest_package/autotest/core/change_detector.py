@@ -0,0 +1,156 @@
+"""
+Change detector module for incremental recrawls using HTTP validators and stored page analyses
+"""
+import logging
+import os
+import threading
+
+import httpx
+
+from ..db.database import SessionLocal
+from ..tables.page import Page
+from ..tables.test_case_data import TestCase
+from ..utils.hashing import canonical_json_hash
+from .link_discovery import USER_AGENT
+
+NOT_MODIFIED = "not_modified"
+MODIFIED = "modified"
+UNKNOWN = "unknown"
+
+
+class PageChangeDetector:
+    """Decides with conditional requests which pages changed since their last analysis, and counts the work skipped"""
+
+    def __init__(self, timeout=10, logger=None):
+        """
+        Initialize change detector
+
+        Args:
+            timeout (float): Request timeout in seconds
+            logger (Logger): Optional logger
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.client = httpx.Client(follow_redirects=True, timeout=timeout, headers={"User-Agent": USER_AGENT})
+        self._lock = threading.Lock()
+        self._pending = {}  # url -> (etag, last_modified) of the fetched version, stored once it is processed
+        self._unchanged = set()  # URLs known unchanged without a request (e.g., sitemap lastmod)
+        self.stats = {"not_modified": 0, "structure_unchanged": 0, "analyzed": 0}
+
+    def mark_unchanged(self, urls):
+        """Treat URLs as not modified without sending a request, e.g., by their sitemap lastmod"""
+        with self._lock:
+            self._unchanged.update(urls)
+
+    def check(self, url, session_state=None):
+        """
+        Send a conditional request for a page with the validators of its analyzed version
+
+        Args:
+            url (str): Page URL
+            session_state (dict): Stored login session whose cookies are sent along
+
+        Returns:
+            str: 'not_modified', 'modified', or 'unknown' when the page was never analyzed or the server can't tell
+        """
+        with self._lock:
+            if url in self._unchanged:
+                return NOT_MODIFIED
+        with SessionLocal() as db:
+            page = db.query(Page.etag, Page.last_modified, Page.test_cases).filter(Page.page_url == url).first()
+        etag, last_modified = (page.etag, page.last_modified) if page and page.test_cases is not None else (None, None)
+
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        if session_state and session_state.get("cookies"):
+            headers["Cookie"] = "; ".join(f"{c['name']}={c['value']}" for c in session_state["cookies"])
+        try:
+            # Only the headers are needed, the body is never read
+            with self.client.stream("GET", url, headers=headers) as response:
+                status = response.status_code
+                new_validators = (response.headers.get("etag"), response.headers.get("last-modified"))
+        except httpx.HTTPError as e:
+            self.logger.debug(f"Conditional request for {url} failed ({type(e).__name__})")
+            return UNKNOWN
+
+        if status == 304:
+            return NOT_MODIFIED
+        if status != 200:
+            return UNKNOWN
+        with self._lock:
+            self._pending[url] = new_validators
+        if not (etag or last_modified):
+            return UNKNOWN
+        # Servers ignoring conditional headers still reveal an unchanged version through its validators
+        if new_validators == (etag, last_modified):
+            return NOT_MODIFIED
+        return MODIFIED
+
+    def stored_analysis(self, url, selection_policy):
+        """
+        Build the analysis of a page from its stored test cases and scripts
+
+        Args:
+            url (str): Page URL
+            selection_policy (SelectionPolicy): Policy selecting the test cases whose scripts run
+
+        Returns:
+            dict: Analysis like WebTestGenerator.analyze_page returns, or None if scripts are missing
+        """
+        with SessionLocal() as db:
+            page = db.query(Page).filter(Page.page_url == url).first()
+            if not page or not page.test_cases:
+                return None
+            test_cases = page.test_cases
+            selected = [test_cases[number - 1] for number in selection_policy.select_test_cases(test_cases)]
+            rows = db.query(TestCase).filter(
+                TestCase.page_url == url,
+                TestCase.test_case_hash.in_([canonical_json_hash(test_case) for test_case in selected])
+            ).all()
+            scripts_by_hash = {row.test_case_hash: row for row in rows if row.test_script}
+            metadata = page.page_metadata
+
+        scripts, selected_test_cases = [], []
+        for test_case in selected:
+            row = scripts_by_hash.get(canonical_json_hash(test_case))
+            if row is None:
+                # A selected test case never got a script, the full workflow generates it
+                return None
+            scripts.append({"script": row.test_script, "filename": os.path.basename(row.script_path or "") or None})
+            selected_test_cases.append(test_case)
+        return {"metadata": metadata, "test_cases": test_cases, "scripts": scripts, "selected_test_cases": selected_test_cases}
+
+    def record(self, url, outcome):
+        """
+        Count a processed page and store the validators of the version it was processed with
+
+        Args:
+            url (str): Page URL
+            outcome (str): 'not_modified', 'structure_unchanged' or 'analyzed'
+        """
+        with self._lock:
+            self.stats[outcome] += 1
+            validators = self._pending.pop(url, None)
+        if validators is None:
+            return
+        with self._lock, SessionLocal() as db:
+            db.query(Page).filter(Page.page_url == url).update(
+                {"etag": validators[0], "last_modified": validators[1]}, synchronize_session=False
+            )
+            db.commit()
+
+    def get_stats(self):
+        """
+        Get the work skipped by this incremental run
+
+        Returns:
+            dict: Page counts and the browser loads, analyses and script generations skipped
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        stats["pages"] = sum(stats.values())
+        stats["page_loads_skipped"] = stats["not_modified"]
+        stats["analyses_skipped"] = stats["not_modified"] + stats["structure_unchanged"]
+        return stats
@@ -0,0 +1,201 @@
+"""
+Crawl checkpoint module for persisting recursive crawl progress so interrupted runs can resume
+"""
+import json
+import logging
+import threading
+
+from ..db.database import SessionLocal
+from ..tables.crawl_run import CrawlRun
+from ..tables.crawl_url import CrawlURL
+
+
+class CrawlCheckpoint:
+    """Durable crawl frontier, visited set and per-URL stage completion of one recursive run"""
+
+    def __init__(self, run_id, logger=None):
+        """
+        Initialize crawl checkpoint
+
+        Args:
+            run_id (int): ID of the crawl_run row
+            logger (Logger): Optional logger
+        """
+        self.run_id = run_id
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        with SessionLocal() as db:
+            run = db.get(CrawlRun, run_id)
+            self.start_url = run.start_url
+            self.max_depth = run.max_depth
+            self.status = run.status
+            rows = db.query(CrawlURL.url, CrawlURL.stage).filter(CrawlURL.run_id == run_id).all()
+        self._known = {url for url, _ in rows}  # URLs already in the frontier or visited
+        self._stages = {url: stage for url, stage in rows if stage}
+
+    @classmethod
+    def open(cls, start_url, max_depth, resume=False, logger=None):
+        """
+        Open a checkpoint for a recursive crawl
+
+        Args:
+            start_url (str): URL the crawl starts from
+            max_depth (int): Maximum crawl depth
+            resume (bool): Whether to continue the latest unfinished run with the same start URL and depth
+            logger (Logger): Optional logger
+
+        Returns:
+            CrawlCheckpoint: Resumed or new checkpoint
+        """
+        logger = logger or logging.getLogger(__name__)
+        with SessionLocal() as db:
+            run = None
+            if resume:
+                run = db.query(CrawlRun).filter(
+                    CrawlRun.start_url == start_url,
+                    CrawlRun.max_depth == max_depth,
+                    CrawlRun.status != "completed"
+                ).order_by(CrawlRun.id.desc()).first()
+                if run:
+                    logger.info(f"Resuming crawl run {run.id} of {start_url} ({run.status})")
+                else:
+                    logger.info(f"No unfinished crawl of {start_url} with depth {max_depth}, starting a new one")
+            if not run:
+                run = CrawlRun(start_url=start_url, max_depth=max_depth, status="crawling")
+                db.add(run)
+                db.flush()
+                db.add(CrawlURL(run_id=run.id, url=start_url, depth=0, state="queued"))
+                db.commit()
+            run_id = run.id
+        return cls(run_id, logger)
+
+    @property
+    def extraction_done(self):
+        """Whether URL extraction of this run finished"""
+        return self.status != "crawling"
+
+    def load_frontier(self):
+        """
+        Load the crawl state to continue URL extraction from
+
+        Returns:
+            tuple: (visited set, list of (url, depth) still to visit in BFS order); failed URLs are retried
+        """
+        with SessionLocal() as db:
+            rows = db.query(CrawlURL.url, CrawlURL.depth, CrawlURL.state).filter(
+                CrawlURL.run_id == self.run_id
+            ).order_by(CrawlURL.id).all()
+        visited = {url for url, _, state in rows if state == "visited"}
+        to_visit = [(url, depth) for url, depth, state in rows if state != "visited"]
+        return visited, to_visit
+
+    def record_visit(self, url, discovered):
+        """
+        Mark a URL visited and add the URLs found on it to the frontier, in one transaction
+
+        Args:
+            url (str): Visited URL
+            discovered (list): (url, depth) tuples queued from the page
+        """
+        with self._lock, SessionLocal() as db:
+            db.query(CrawlURL).filter(CrawlURL.run_id == self.run_id, CrawlURL.url == url).update({"state": "visited"})
+            self._queue(db, discovered)
+            db.commit()
+
+    def add_to_frontier(self, discovered):
+        """
+        Add URLs found outside of a page (e.g., in sitemaps) to the frontier
+
+        Args:
+            discovered (list): (url, depth) tuples to queue
+        """
+        with self._lock, SessionLocal() as db:
+            self._queue(db, discovered)
+            db.commit()
+
+    def _queue(self, db, discovered):
+        for new_url, depth in discovered:
+            if new_url not in self._known:
+                db.add(CrawlURL(run_id=self.run_id, url=new_url, depth=depth, state="queued"))
+                self._known.add(new_url)
+
+    def record_failure(self, url):
+        """Mark a URL that could not be loaded, it is retried when the run resumes"""
+        with self._lock, SessionLocal() as db:
+            db.query(CrawlURL).filter(CrawlURL.run_id == self.run_id, CrawlURL.url == url).update({"state": "failed"})
+            db.commit()
+
+    def finish_extraction(self):
+        """Mark URL extraction finished so a resumed run goes straight to URL processing"""
+        self._set_status("extracted")
+
+    def visited_urls(self):
+        """
+        Get the URLs visited by this run
+
+        Returns:
+            list: Sorted visited URLs
+        """
+        with SessionLocal() as db:
+            rows = db.query(CrawlURL.url).filter(CrawlURL.run_id == self.run_id, CrawlURL.state == "visited").all()
+        return sorted(url for url, in rows)
+
+    def stage_of(self, url):
+        """
+        Get the last completed processing stage of a URL
+
+        Returns:
+            str: 'analyzed', 'done', or None if processing never finished a stage
+        """
+        with self._lock:
+            return self._stages.get(url)
+
+    def mark_analyzed(self, url):
+        """Record that the URL's analysis and scripts are stored, so a resume reuses them instead of calling the LLM"""
+        self._set_stage(url, "analyzed")
+
+    def mark_done(self, url, results):
+        """
+        Record that a URL was fully processed
+
+        Args:
+            url (str): Processed URL
+            results (list): Test result entries logged for the URL
+        """
+        # Keep only JSON-serializable data, the report renders whatever is stored
+        self._set_stage(url, "done", json.loads(json.dumps(results, default=str)))
+
+    def results_of(self, url):
+        """
+        Get the stored test results of a processed URL
+
+        Returns:
+            list: Test result entries, empty if the URL is not done
+        """
+        with SessionLocal() as db:
+            row = db.query(CrawlURL.results).filter(CrawlURL.run_id == self.run_id, CrawlURL.url == url).first()
+        return (row.results if row else None) or []
+
+    def complete(self):
+        """Mark the run completed; a later --resume starts a new crawl"""
+        self._set_status("completed")
+
+    def _set_stage(self, url, stage, results=None):
+        with self._lock, SessionLocal() as db:
+            row = db.query(CrawlURL).filter(CrawlURL.run_id == self.run_id, CrawlURL.url == url).first()
+            if not row:
+                # Processed URLs come from the visited set, but keep the record if one doesn't
+                row = CrawlURL(run_id=self.run_id, url=url, depth=0, state="visited")
+                db.add(row)
+                self._known.add(url)
+            row.stage = stage
+            if results is not None:
+                row.results = results
+            db.commit()
+            self._stages[url] = stage
+
+    def _set_status(self, status):
+        with self._lock, SessionLocal() as db:
+            db.query(CrawlRun).filter(CrawlRun.id == self.run_id).update({"status": status})
+            db.commit()
+            self.status = status
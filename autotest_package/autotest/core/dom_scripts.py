@@ -0,0 +1,153 @@
+"""
+JavaScript payloads executed in the browser through WebDriver.execute_script
+"""
+
+# Helpers mirroring WebElement.get_attribute and WebElement.text so in-browser
+# extraction returns the same values as the per-element WebDriver calls.
+_ELEMENT_HELPERS = """
+function attr(el, name) {
+    if (name === 'href' && el.tagName === 'A') {
+        return el.hasAttribute('href') ? el.href : null;
+    }
+    var value = el[name];
+    if (value === undefined || value === null || typeof value === 'object' || typeof value === 'function') {
+        value = el.getAttribute(name);
+    }
+    return value === undefined || value === null ? null : String(value);
+}
+
+function visibleText(el) {
+    if (!el.getClientRects().length) {
+        return '';
+    }
+    return (el.innerText || '').trim();
+}
+
+function collect(nodes, fn) {
+    return Array.prototype.map.call(nodes, fn);
+}
+"""
+
+# Structural signature of a form control or interactive element, free of page content
+_SIGNATURE_HELPER = """
+function signature(el) {
+    var label = '';
+    if (el.tagName === 'BUTTON' || (el.tagName === 'INPUT' && /^(submit|button|reset)$/i.test(el.type))) {
+        label = (el.tagName === 'INPUT' ? attr(el, 'value') : visibleText(el)) || '';
+    }
+    return [
+        el.tagName.toLowerCase(),
+        attr(el, 'type'),
+        el.getAttribute('id'),
+        el.getAttribute('name'),
+        el.getAttribute('href'),
+        el.getAttribute('role'),
+        el.getAttribute('aria-label'),
+        el.hasAttribute('required'),
+        el.hasAttribute('disabled'),
+        label.substring(0, 50)
+    ];
+}
+"""
+
+# Returns the static page metadata used by WebTestGenerator.analyze_page:
+# forms, interactive elements ("buttons"), data tables and key flows.
+STATIC_METADATA_SCRIPT = """
+return (function () {
+""" + _ELEMENT_HELPERS + """
+    var forms = collect(document.getElementsByTagName('form'), function (form) {
+        return {
+            id: attr(form, 'id'),
+            action: attr(form, 'action'),
+            method: attr(form, 'method'),
+            inputs: collect(form.getElementsByTagName('input'), function (inp) {
+                return {type: attr(inp, 'type'), name: attr(inp, 'name'), id: attr(inp, 'id')};
+            }),
+            buttons: collect(form.getElementsByTagName('button'), function (btn) {
+                return {type: attr(btn, 'type'), text: visibleText(btn), id: attr(btn, 'id')};
+            })
+        };
+    });
+
+    var buttons = collect(document.querySelectorAll('button, a, input, select, textarea'), function (el) {
+        return {
+            tag: el.tagName.toLowerCase(),
+            text: visibleText(el).substring(0, 50),
+            id: attr(el, 'id'),
+            type: attr(el, 'type')
+        };
+    });
+
+    var tables = collect(document.getElementsByTagName('table'), function (table) {
+        return {
+            id: attr(table, 'id'),
+            headers: collect(table.getElementsByTagName('th'), visibleText),
+            row_count: table.getElementsByTagName('tr').length
+        };
+    });
+
+    var keyFlows = {
+        main_navigation: collect(Array.prototype.slice.call(document.querySelectorAll('nav a, .menu a'), 0, 5), function (a) {
+            return attr(a, 'href');
+        }),
+        primary_actions: collect(document.querySelectorAll('.primary-btn, .cta-button'), visibleText)
+    };
+
+    return {forms: forms, buttons: buttons, tables: tables, key_flows: keyFlows};
+})();
+"""
+
+# Returns the structural signature hashed into Page.dom_fingerprint: forms with
+# their fields and every interactive element with the attributes tests depend on.
+# Free text is left out (except short control labels) so content-only updates
+# such as new articles or timestamps don't count as a page change.
+DOM_FINGERPRINT_SCRIPT = """
+return (function () {
+""" + _ELEMENT_HELPERS + _SIGNATURE_HELPER + """
+
+    var forms = collect(document.getElementsByTagName('form'), function (form) {
+        return {
+            id: form.getAttribute('id'),
+            action: form.getAttribute('action'),
+            method: (form.getAttribute('method') || 'get').toLowerCase(),
+            fields: collect(form.querySelectorAll('input, select, textarea, button'), signature)
+        };
+    });
+
+    var interactive = collect(
+        document.querySelectorAll('a[href], button, input, select, textarea, [role=button], [onclick], [contenteditable=true]'),
+        signature
+    );
+
+    return {forms: forms, interactive: interactive};
+})();
+"""
+
+# Returns the structural signature of the login form (the form holding the first
+# password field, else the first form), hashed into AuthForm.form_fingerprint.
+# Returns null when the page has no form.
+LOGIN_FORM_SCRIPT = """
+return (function () {
+""" + _ELEMENT_HELPERS + _SIGNATURE_HELPER + """
+    var password = document.querySelector('input[type=password]');
+    var form = password ? (password.form || password.closest('form')) : document.forms[0];
+    var scope = form || (password ? password.parentElement : null);
+    if (!scope) {
+        return null;
+    }
+    return {
+        action: form ? form.getAttribute('action') : null,
+        method: form ? (form.getAttribute('method') || 'get').toLowerCase() : null,
+        fields: collect(scope.querySelectorAll('input, select, textarea, button'), signature)
+    };
+})();
+"""
+
+# Returns the href of every anchor (resolved like WebElement.get_attribute('href'))
+# in one round trip instead of one WebDriver call per link.
+ANCHOR_HREFS_SCRIPT = """
+return (function () {
+""" + _ELEMENT_HELPERS + """
+    return collect(document.getElementsByTagName('a'), function (a) { return attr(a, 'href'); });
+})();
+"""
@@ -0,0 +1,173 @@
+"""
+HTML minimizer module for reducing page sources to their test-relevant structure
+"""
+import re
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # lxml is optional, callers fall back to BeautifulSoup
+    lxml = None
+
+# Tags removed together with their content (same set as the BeautifulSoup minimizer)
+DROP_TAGS = {"script", "meta", "link", "style", "path", "noscript"}
+
+# Attributes kept on elements; everything else (inline styles, tracking data, ...) is dropped
+KEEP_ATTRIBUTES = {
+    "id", "name", "class", "type", "value", "placeholder", "href", "action", "method",
+    "for", "role", "title", "alt", "label", "src", "target", "tabindex",
+    "disabled", "required", "checked", "selected", "readonly", "multiple", "hidden",
+    "min", "max", "minlength", "maxlength", "pattern", "step", "autocomplete",
+    "onclick", "onsubmit", "contenteditable", "data-testid", "data-test", "data-test-id",
+    "data-qa", "data-cy", "data-id", "data-action", "data-toggle", "data-target",
+}
+MAX_ATTRIBUTE_LENGTH = 200
+
+# Relevance of elements for test generation, used to decide what to prune first
+RELEVANCE_WEIGHTS = {
+    "form": 5, "input": 3, "select": 3, "textarea": 3, "button": 3, "option": 1,
+    "a": 1, "label": 1, "table": 1, "th": 1,
+}
+NEVER_PRUNE = {"html", "head", "body"}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def lxml_available():
+    """Return whether the lxml backend can be used"""
+    return lxml is not None
+
+
+def _keep_attribute(name):
+    return name in KEEP_ATTRIBUTES or name.startswith("aria-")
+
+
+def _element_relevance(element):
+    weight = RELEVANCE_WEIGHTS.get(element.tag, 0)
+    if not weight and (element.get("role") or element.get("onclick") or element.get("tabindex")):
+        weight = 1
+    return weight
+
+
+class _Subtree:
+    """Size and relevance of one element subtree, collected during the tree walk"""
+    __slots__ = ("element", "parent", "size", "relevance")
+
+    def __init__(self, element, parent):
+        self.element = element
+        self.parent = parent
+        self.size = 0
+        self.relevance = 0
+
+
+def _clean(element, parent_stats, subtrees):
+    """
+    Clean an element in place and collect subtree statistics in a single walk
+
+    Drops unwanted tags and comments, filters attributes, collapses whitespace
+    and records the approximate serialized size and relevance of the subtree.
+    """
+    stats = _Subtree(element, parent_stats)
+    subtrees.append(stats)
+
+    for name in list(element.attrib):
+        if not _keep_attribute(name):
+            del element.attrib[name]
+        elif len(element.attrib[name]) > MAX_ATTRIBUTE_LENGTH:
+            element.attrib[name] = element.attrib[name][:MAX_ATTRIBUTE_LENGTH]
+
+    if element.text:
+        element.text = _WHITESPACE.sub(" ", element.text)
+        if element.text == " ":
+            element.text = None
+
+    size = 2 * len(element.tag) + 5 + len(element.text or "")
+    size += sum(len(name) + len(value) + 4 for name, value in element.attrib.items())
+    relevance = _element_relevance(element)
+
+    for child in list(element):
+        if not isinstance(child.tag, str) or child.tag in DROP_TAGS:
+            # Comments, processing instructions and dropped tags; keep the text following them
+            child.drop_tree()
+            continue
+        if child.tail:
+            child.tail = _WHITESPACE.sub(" ", child.tail)
+            if child.tail == " ":
+                child.tail = None
+        child_stats = _clean(child, stats, subtrees)
+        size += child_stats.size + len(child.tail or "")
+        relevance += child_stats.relevance
+
+    stats.size = size
+    stats.relevance = relevance
+    return stats
+
+
+def _prune_to_budget(subtrees, total_size, max_chars):
+    """
+    Remove the least test-relevant subtrees until the document fits the budget
+
+    Subtrees without interactive content go first (largest first), then subtrees
+    with the lowest relevance per character.
+
+    Returns:
+        int: Number of pruned subtrees
+    """
+    candidates = sorted(
+        (s for s in subtrees if s.element.tag not in NEVER_PRUNE and s.parent is not None),
+        key=lambda s: (s.relevance / s.size, -s.size)
+    )
+    pruned = set()
+    pruned_count = 0
+    for stats in candidates:
+        if total_size <= max_chars:
+            break
+        ancestor = stats.parent
+        while ancestor is not None and id(ancestor) not in pruned:
+            ancestor = ancestor.parent
+        if ancestor is not None:
+            continue  # Already removed with an ancestor
+        pruned.add(id(stats))
+        stats.element.drop_tree()
+        total_size -= stats.size
+        pruned_count += 1
+        # Keep ancestor sizes accurate for candidates pruned later
+        ancestor = stats.parent
+        while ancestor is not None:
+            ancestor.size -= stats.size
+            ancestor = ancestor.parent
+    return pruned_count
+
+
+def minimize_html(page_source, token_budget=None, logger=None):
+    """
+    Reduce a page source to its test-relevant markup with lxml
+
+    The output has the same shape as the BeautifulSoup minimizer (whitespace
+    collapsed, no whitespace between tags) so existing prompts work unchanged.
+
+    Args:
+        page_source (str): Raw HTML of the page
+        token_budget (int): Maximum estimated tokens of the output, or None for no limit
+        logger (Logger): Optional logger for pruning statistics
+
+    Returns:
+        str: Minimized HTML
+    """
+    if lxml is None:
+        raise ImportError("lxml is required for the lxml HTML minimizer")
+    if not page_source or not page_source.strip():
+        return ""
+
+    root = lxml.html.document_fromstring(page_source)
+    subtrees = []
+    root_stats = _clean(root, None, subtrees)
+
+    # Same estimate as rate_limiter.estimate_tokens: ~4 characters per token
+    if token_budget and root_stats.size > token_budget * 4:
+        pruned = _prune_to_budget(subtrees, root_stats.size, token_budget * 4)
+        if logger:
+            logger.debug(f"Pruned {pruned} low-relevance subtrees to fit {token_budget} tokens")
+
+    html_string = etree.tostring(root, encoding="unicode", method="html")
+    return re.sub(r">\s+<", "><", html_string).strip()
@@ -0,0 +1,180 @@
+"""
+Link discovery module for reading page links over HTTP and detecting pages that need a browser
+"""
+import logging
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import httpx
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # lxml is optional, links are parsed with html.parser instead
+    lxml = None
+
+# Elements single-page apps mount into; empty in the server response when the page is rendered client-side
+SPA_ROOT_IDS = {"root", "app", "__next", "__nuxt", "svelte", "main-app"}
+SPA_ROOT_TAGS = {"app-root"}  # Angular
+SPA_ROOT_XPATH = " | ".join([f"//*[@id='{root_id}']" for root_id in sorted(SPA_ROOT_IDS)]
+                            + [f"//{tag}" for tag in sorted(SPA_ROOT_TAGS)] + ["//*[@ng-app]"])
+
+NOSCRIPT_JS_REQUIRED = re.compile(r"enable\s+javascript|requires\s+javascript|javascript\s+(is\s+)?required", re.I)
+
+USER_AGENT = "Mozilla/5.0 (compatible; autotest-web-generator)"
+
+# Responses the crawler's browser may get past (bot protection, login walls, transient errors)
+ESCALATE_STATUS = {401, 403, 429}
+
+
+class _LinkParser(HTMLParser):
+    """Fallback parser collecting what LinkFetcher reads from an lxml tree"""
+
+    def __init__(self):
+        super().__init__()
+        self.hrefs = []
+        self.base_href = None
+        self.script_count = 0
+        self.spa_root_tags = []  # root element tags, to check whether they received children
+        self.spa_root_children = 0
+        self.noscript_text = []
+        self._open_roots = 0
+        self._in_noscript = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self._open_roots:
+            self.spa_root_children += 1
+        if tag == "a" and attrs.get("href"):
+            self.hrefs.append(attrs["href"])
+        elif tag == "base" and attrs.get("href") and self.base_href is None:
+            self.base_href = attrs["href"]
+        elif tag == "script":
+            self.script_count += 1
+        elif tag == "noscript":
+            self._in_noscript = True
+        if attrs.get("id") in SPA_ROOT_IDS or tag in SPA_ROOT_TAGS or "ng-app" in attrs:
+            self.spa_root_tags.append(tag)
+            self._open_roots += 1
+
+    def handle_endtag(self, tag):
+        if tag == "noscript":
+            self._in_noscript = False
+        if self._open_roots and self.spa_root_tags and tag == self.spa_root_tags[-1]:
+            self._open_roots -= 1
+
+    def handle_data(self, data):
+        if self._in_noscript:
+            self.noscript_text.append(data)
+
+
+def parse_page(html, page_url):
+    """
+    Read the links of a page and the signals telling whether it is rendered client-side
+
+    Args:
+        html (str): Page source returned by the server
+        page_url (str): Final URL of the page (after redirects)
+
+    Returns:
+        dict: hrefs (absolute URLs), script_count, empty_spa_root (bool) and noscript_text
+    """
+    if lxml is not None and html.strip():
+        try:
+            doc = lxml.html.fromstring(html)
+            base = doc.xpath("string(//base/@href)")
+            base_url = urljoin(page_url, base) if base else page_url
+            roots = doc.xpath(SPA_ROOT_XPATH)
+            return {
+                "hrefs": [urljoin(base_url, href.strip()) for href in doc.xpath("//a/@href") if href.strip()],
+                "script_count": int(doc.xpath("count(//script)")),
+                "empty_spa_root": any(len(root) == 0 and not (root.text or "").strip() for root in roots),
+                "noscript_text": " ".join(doc.xpath("//noscript//text()")),
+            }
+        except (ValueError, etree.ParserError):
+            pass  # e.g., documents with an XML declaration; html.parser copes with them
+
+    parser = _LinkParser()
+    parser.feed(html)
+    base_url = urljoin(page_url, parser.base_href) if parser.base_href else page_url
+    return {
+        "hrefs": [urljoin(base_url, href.strip()) for href in parser.hrefs if href.strip()],
+        "script_count": parser.script_count,
+        "empty_spa_root": bool(parser.spa_root_tags) and parser.spa_root_children == 0,
+        "noscript_text": " ".join(parser.noscript_text),
+    }
+
+
+def looks_js_rendered(page, min_anchors=3):
+    """
+    Decide whether a page's links can only be read after running its JavaScript
+
+    Args:
+        page (dict): Result of parse_page
+        min_anchors (int): Pages with scripts and fewer anchors than this are rendered in the browser
+
+    Returns:
+        bool: True if the page should be loaded in the browser
+    """
+    if page["empty_spa_root"]:
+        return True
+    if NOSCRIPT_JS_REQUIRED.search(page["noscript_text"] or ""):
+        return True
+    return page["script_count"] > 0 and len(page["hrefs"]) < min_anchors
+
+
+class LinkFetcher:
+    """Pooled HTTP client reading page links without a browser"""
+
+    def __init__(self, max_connections=10, timeout=10, min_anchors=3, logger=None):
+        """
+        Initialize link fetcher
+
+        Args:
+            max_connections (int): Connections kept open across fetcher threads
+            timeout (float): Request timeout in seconds
+            min_anchors (int): Anchor count below which pages with scripts are treated as JS-rendered
+            logger (Logger): Optional logger
+        """
+        self.min_anchors = min_anchors
+        self.logger = logger or logging.getLogger(__name__)
+        # httpx.Client is thread-safe; all fetcher threads share its keep-alive connections
+        self.client = httpx.Client(
+            follow_redirects=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            headers={"User-Agent": USER_AGENT, "Accept": "text/html,*/*;q=0.8"},
+        )
+
+    def fetch_links(self, url):
+        """
+        Fetch a page over HTTP and read its links
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            list: Absolute hrefs of the page, or None if the page has to be loaded in the browser
+        """
+        try:
+            response = self.client.get(url)
+        except httpx.HTTPError as e:
+            self.logger.debug(f"HTTP fetch of {url} failed ({type(e).__name__}), using the browser")
+            return None
+        if response.status_code in ESCALATE_STATUS or response.status_code >= 500:
+            self.logger.debug(f"HTTP fetch of {url} returned {response.status_code}, using the browser")
+            return None
+        content_type = response.headers.get("content-type", "")
+        if "html" not in content_type and "xml" not in content_type:
+            # Files and other non-HTML resources have no links to follow
+            return []
+        page = parse_page(response.text, str(response.url))
+        if looks_js_rendered(page, self.min_anchors):
+            self.logger.debug(f"{url} looks rendered client-side, using the browser")
+            return None
+        return page["hrefs"]
+
+    def close(self):
+        """Close the pooled connections"""
+        self.client.close()
@@ -0,0 +1,212 @@
+"""
+LLM response cache module for persisting provider responses on disk
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from ..utils.hashing import sha256_text
+
+
+class LLMResponseCache:
+    """Content-addressed SQLite cache for LLM responses with LRU/TTL eviction"""
+
+    def __init__(self, cache_path=None, max_entries=5000, ttl_seconds=604800):
+        """
+        Initialize the response cache
+
+        Args:
+            cache_path (str, optional): Path to the SQLite cache file
+            max_entries (int): Maximum number of cached responses before LRU eviction
+            ttl_seconds (int): Time-to-live of a cached response in seconds (0 disables expiry)
+        """
+        if cache_path is None:
+            # Keep the cache next to the application database by default
+            package_dir = os.path.dirname(os.path.dirname(__file__))
+            cache_path = os.path.join(package_dir, 'db', 'llm_cache.db')
+
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False, timeout=30)
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create cache table and indexes if they don't exist"""
+        with self._lock:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_response_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    provider TEXT,
+                    model_type TEXT,
+                    model_name TEXT,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_response_cache_last_accessed "
+                "ON llm_response_cache (last_accessed)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(provider, model_type, model_name, temperature, system_prompt, user_prompt):
+        """
+        Build the content-addressed cache key for a request
+
+        Args:
+            provider (str): Provider name (e.g., 'openai')
+            model_type (str): Model role ('analysis', 'selenium' or 'result_analysis')
+            model_name (str): Concrete model name used by the provider
+            temperature (float): Sampling temperature
+            system_prompt (str): System prompt sent to the model
+            user_prompt (str): User prompt sent to the model
+
+        Returns:
+            str: Hex encoded cache key
+        """
+        key_material = json.dumps([
+            provider,
+            model_type,
+            model_name,
+            temperature,
+            sha256_text(system_prompt),
+            sha256_text(user_prompt)
+        ])
+        return sha256_text(key_material)
+
+    def get(self, cache_key):
+        """
+        Fetch a cached response
+
+        Args:
+            cache_key (str): Key produced by make_key
+
+        Returns:
+            str or None: Cached response content, None on miss or expiry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_response_cache WHERE cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            response, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_response_cache WHERE cache_key = ?", (cache_key,))
+                self._conn.commit()
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_response_cache SET last_accessed = ? WHERE cache_key = ?",
+                (now, cache_key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return response
+
+    def set(self, cache_key, response, provider=None, model_type=None, model_name=None):
+        """
+        Store a response and evict least recently used entries above the size bound
+
+        Args:
+            cache_key (str): Key produced by make_key
+            response (str): Response content to store
+            provider (str, optional): Provider name, stored for inspection
+            model_type (str, optional): Model role, stored for inspection
+            model_name (str, optional): Model name, stored for inspection
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_response_cache
+                    (cache_key, provider, model_type, model_name, response, created_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (cache_key, provider, model_type, model_name, response, now, now)
+            )
+            self._evict_overflow()
+            self._conn.commit()
+
+    def _evict_overflow(self):
+        """Drop least recently used entries beyond max_entries (caller holds the lock)"""
+        if not self.max_entries:
+            return
+        count = self._conn.execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                """
+                DELETE FROM llm_response_cache WHERE cache_key IN (
+                    SELECT cache_key FROM llm_response_cache ORDER BY last_accessed ASC LIMIT ?
+                )
+                """,
+                (overflow,)
+            )
+            self.evictions += overflow
+
+    def purge_expired(self):
+        """
+        Remove all entries older than the configured TTL
+
+        Returns:
+            int: Number of removed entries
+        """
+        if not self.ttl_seconds:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM llm_response_cache WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,)
+            )
+            self._conn.commit()
+            self.evictions += cursor.rowcount
+            return cursor.rowcount
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_response_cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()[0]
+
+    def get_stats(self):
+        """Get hit/miss counters and current cache size"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self),
+            "hit_rate": self.hits / lookups if lookups else 0
+        }
+
+    def close(self):
+        """Close the underlying SQLite connection"""
+        with self._lock:
+            self._conn.close()
@@ -1,27 +1,52 @@
 """
 LLM Wrapper module for handling different language model providers
 """
+import asyncio
+import importlib
 import os
+import threading
 import yaml
-from langchain_openai import ChatOpenAI
-from langchain_groq import ChatGroq
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_anthropic import ChatAnthropic
-# from langchain_community.chat_models import ChatOllama
-from langchain_ollama import ChatOllama
-from langchain.schema import HumanMessage, SystemMessage
+
+from .llm_cache import LLMResponseCache
+from .rate_limiter import ProviderRateLimiter, estimate_tokens
+
+# Chat model class of each provider. SDKs are imported on first use,
+# so a run only pays the import time of the provider it talks to.
+PROVIDER_CHAT_MODELS = {
+    "openai": ("langchain_openai", "ChatOpenAI"),
+    "groq": ("langchain_groq", "ChatGroq"),
+    "google-gemini": ("langchain_google_genai", "ChatGoogleGenerativeAI"),
+    "anthropic": ("langchain_anthropic", "ChatAnthropic"),
+    # "ollama": ("langchain_community.chat_models", "ChatOllama"),
+    "ollama": ("langchain_ollama", "ChatOllama"),
+}
+
+
+def load_chat_model_class(provider):
+    """
+    Import and return the chat model class of a provider
+
+    Args:
+        provider (str): Provider name
+
+    Returns:
+        type: LangChain chat model class
+    """
+    module_name, class_name = PROVIDER_CHAT_MODELS[provider]
+    return getattr(importlib.import_module(module_name), class_name)
 
 
 class LLMWrapper:
     """Wrapper class for handling different LLM providers"""
     
-    def __init__(self, config_path=None, llm_provider_choice=1):
+    def __init__(self, config_path=None, llm_provider_choice=1, use_cache=True):
         """
         Initialize LLM wrapper with configuration
         
         Args:
             config_path (str, optional): Path to configuration file
             llm_provider_choice (int): Provider choice (1=OpenAI, 2=Groq, 3=Google-Gemini, 4=Anthropic, 5=Ollama)
+            use_cache (bool): Whether to serve repeated requests from the persistent response cache
         """
         if config_path is None:
             # Get the package directory and default config path
@@ -46,6 +71,17 @@ class LLMWrapper:
         if not self.provider:
             raise ValueError(f"Invalid provider choice: {llm_provider_choice}. Valid choices: {list(provider_mapping.keys())}")
         self.models = self._initialize_models()
+        self.cache = self._initialize_cache() if use_cache else None
+
+        # Provider quota shared by the sync and async request paths
+        params = self.config["providers"][self.provider]
+        self.rate_limiter = ProviderRateLimiter(
+            requests_per_minute=params.get("requests_per_minute"),
+            tokens_per_minute=params.get("tokens_per_minute")
+        )
+        self.max_concurrency = params.get("max_concurrency", 4)
+        self._loop = None
+        self._loop_lock = threading.Lock()
 
     def _get_api_key(self, provider):
         """Get API key for the specified provider"""
@@ -89,6 +125,7 @@ class LLMWrapper:
         api_key = self._get_api_key(provider)
 
         if provider == "openai":
+            ChatOpenAI = load_chat_model_class(provider)
             return {
                 "analysis": ChatOpenAI(
                     api_key=api_key, 
@@ -109,6 +146,7 @@ class LLMWrapper:
                 )
             }
         elif provider == "groq":
+            ChatGroq = load_chat_model_class(provider)
             return {
                 "analysis": ChatGroq(
                     api_key=api_key, 
@@ -129,6 +167,7 @@ class LLMWrapper:
                 )
             }
         elif provider == "google-gemini":
+            ChatGoogleGenerativeAI = load_chat_model_class(provider)
             return {
                 "analysis": ChatGoogleGenerativeAI(
                     # api_key=os.getenv("GOOGLE_API_KEY"), 
@@ -153,6 +192,7 @@ class LLMWrapper:
             }
         
         elif provider == "anthropic":
+            ChatAnthropic = load_chat_model_class(provider)
             return {
                 "analysis": ChatAnthropic(
                     api_key=api_key,
@@ -174,6 +214,7 @@ class LLMWrapper:
             }
         
         elif provider == "ollama":
+            ChatOllama = load_chat_model_class(provider)
             return {
                 "analysis": ChatOllama(
                     model=params["analysis_model"],
@@ -193,41 +234,194 @@ class LLMWrapper:
         else:
             raise ValueError(f"Unsupported provider: {provider}")
         
+    def _initialize_cache(self):
+        """Initialize the response cache from the 'cache' configuration section"""
+        cache_config = self.config.get("cache") or {}
+        if not cache_config.get("enabled", True):
+            return None
+        return LLMResponseCache(
+            cache_path=cache_config.get("path"),
+            max_entries=cache_config.get("max_entries", 5000),
+            ttl_seconds=cache_config.get("ttl_seconds", 604800)
+        )
+
+    def _get_model_signature(self, model_type):
+        """Get (model_name, temperature) of the configured model for cache keying"""
+        model = self.models[model_type]
+        model_name = getattr(model, "model_name", None) or getattr(model, "model", None)
+        return str(model_name), getattr(model, "temperature", None)
+
     def _needs_json_in_prompt(self):
         """Check if provider needs JSON instruction in prompt instead of model_kwargs"""
         return self.provider in ["google-gemini", "anthropic", "ollama"]
 
-    def generate(self, system_prompt, user_prompt, model_type="analysis"):
+    def _prepare_request(self, system_prompt, user_prompt, model_type):
         """
-        Generate response using specified model type
-        
+        Build the message list and cache key for a request
+
         Args:
             system_prompt (str): System prompt for the model
             user_prompt (str): User prompt for the model
-            model_type (str): Type of model to use ('analysis', 'selenium' or 'result_analysis')
-            
+            model_type (str): Type of model to use
+
         Returns:
-            str: Generated response content
+            tuple: (messages, cache_key, model_name) - cache_key is None when caching is disabled
         """
-
         # For providers that don't support response_format, add JSON instruction to prompt
         if (model_type == "analysis" or model_type == "result_analysis") and self._needs_json_in_prompt():
             json_instruction = "\n\nIMPORTANT: Please respond with valid JSON format only. Do not include any text outside the JSON structure."
             system_prompt += json_instruction
 
+        model_name, temperature = self._get_model_signature(model_type)
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(self.provider, model_type, model_name, temperature, system_prompt, user_prompt)
+
+        # langchain_core.messages is what langchain.schema re-exports, without loading all of langchain
+        from langchain_core.messages import HumanMessage, SystemMessage
         messages = [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_prompt)
         ]
+        return messages, cache_key, model_name
+
+    def _store_response(self, cache_key, content, model_type, model_name):
+        """Persist a successful response in the cache"""
+        if cache_key is not None and isinstance(content, str) and content:
+            self.cache.set(cache_key, content, provider=self.provider, model_type=model_type, model_name=model_name)
+
+    def generate(self, system_prompt, user_prompt, model_type="analysis"):
+        """
+        Generate response using specified model type
+        
+        Args:
+            system_prompt (str): System prompt for the model
+            user_prompt (str): User prompt for the model
+            model_type (str): Type of model to use ('analysis', 'selenium' or 'result_analysis')
+            
+        Returns:
+            str: Generated response content
+        """
+        messages, cache_key, model_name = self._prepare_request(system_prompt, user_prompt, model_type)
+        if cache_key is not None:
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
+                return cached_response
+
+        self.rate_limiter.acquire(estimate_tokens(system_prompt, user_prompt))
         try:
-            return self.models[model_type].invoke(messages).content
+            content = self.models[model_type].invoke(messages).content
         except Exception as e:
             raise RuntimeError(f"Error generating response with {self.provider} ({model_type} model): {str(e)}")
-    
+
+        self._store_response(cache_key, content, model_type, model_name)
+        return content
+
+    async def agenerate(self, system_prompt, user_prompt, model_type="analysis"):
+        """
+        Asynchronously generate response using specified model type
+
+        Args:
+            system_prompt (str): System prompt for the model
+            user_prompt (str): User prompt for the model
+            model_type (str): Type of model to use ('analysis', 'selenium' or 'result_analysis')
+
+        Returns:
+            str: Generated response content
+        """
+        messages, cache_key, model_name = self._prepare_request(system_prompt, user_prompt, model_type)
+        if cache_key is not None:
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
+                return cached_response
+
+        await self.rate_limiter.acquire_async(estimate_tokens(system_prompt, user_prompt))
+        try:
+            response = await self.models[model_type].ainvoke(messages)
+            content = response.content
+        except Exception as e:
+            raise RuntimeError(f"Error generating response with {self.provider} ({model_type} model): {str(e)}")
+
+        self._store_response(cache_key, content, model_type, model_name)
+        return content
+
+    async def agenerate_many(self, prompts, model_type="analysis", max_concurrency=None):
+        """
+        Asynchronously generate responses for many prompts with bounded concurrency
+
+        Args:
+            prompts (list): List of (system_prompt, user_prompt) tuples
+            model_type (str): Type of model to use for every prompt
+            max_concurrency (int, optional): Maximum in-flight requests, defaults to the provider setting
+
+        Returns:
+            list: Responses in input order; failed requests hold the raised exception instead of a string
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def run(system_prompt, user_prompt):
+            async with semaphore:
+                return await self.agenerate(system_prompt, user_prompt, model_type=model_type)
+
+        return await asyncio.gather(
+            *(run(system_prompt, user_prompt) for system_prompt, user_prompt in prompts),
+            return_exceptions=True
+        )
+
+    def generate_many(self, prompts, model_type="analysis", max_concurrency=None):
+        """
+        Generate responses for many prompts concurrently from synchronous code
+
+        Args:
+            prompts (list): List of (system_prompt, user_prompt) tuples
+            model_type (str): Type of model to use for every prompt
+            max_concurrency (int, optional): Maximum in-flight requests, defaults to the provider setting
+
+        Returns:
+            list: Responses in input order; failed requests hold the raised exception instead of a string
+        """
+        if not prompts:
+            return []
+        future = asyncio.run_coroutine_threadsafe(
+            self.agenerate_many(prompts, model_type=model_type, max_concurrency=max_concurrency),
+            self._get_event_loop()
+        )
+        return future.result()
+
+    def _get_event_loop(self):
+        """
+        Get the wrapper's background event loop, starting it on first use
+
+        The async provider clients keep connection pools bound to the loop they
+        were first used on, so every batch runs on the same long-lived loop.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="llm-event-loop", daemon=True).start()
+        return self._loop
+
     def get_provider(self):
         """Get current provider name"""
         return self.provider
     
+    def get_cache_stats(self):
+        """Get response cache hit/miss counters (None when caching is disabled)"""
+        return self.cache.get_stats() if self.cache is not None else None
+
+    def get_context_limits(self):
+        """
+        Get context window and output limits of the current provider
+
+        Returns:
+            dict: 'context_window' and 'max_output_tokens' token counts
+        """
+        params = self.config["providers"][self.provider]
+        return {
+            "context_window": params.get("context_window", 32768),
+            "max_output_tokens": params.get("max_output_tokens", 8192)
+        }
+
     def get_available_models(self):
         """Get list of available model types"""
         return list(self.models.keys())
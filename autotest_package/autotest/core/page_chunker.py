@@ -0,0 +1,218 @@
+"""
+Page chunker module for map-reduce analysis of pages too large for one LLM request
+"""
+from .rate_limiter import estimate_tokens
+from ..utils.hashing import canonical_json_hash
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # Without lxml pages are analyzed in a single request
+    lxml = None
+
+# Landmark elements a page is split into, by tag and by ARIA role
+REGION_TAGS = {
+    "header": "header", "nav": "nav", "form": "form", "main": "main",
+    "article": "main", "section": "main", "aside": "aside", "footer": "footer",
+}
+REGION_ROLES = {
+    "banner": "header", "navigation": "nav", "search": "form", "main": "main",
+    "complementary": "aside", "contentinfo": "footer",
+}
+
+# Keys of the llm_page_analysis schema holding lists of objects, deduplicated by selector
+_OBJECT_LIST_KEYS = ("contact_form_fields", "interactive_elements", "ui_validation_indicators")
+_AUTH_TYPE_PRIORITY = {"login": 0, "registration": 1}
+
+
+def _serialize(element):
+    return etree.tostring(element, encoding="unicode", method="html", with_tail=False)
+
+
+def _split_large_region(label, element, max_tokens):
+    """Split an oversized region into runs of consecutive children that fit the budget"""
+    parts = []
+    current = []
+    current_tokens = 0
+    for child in element:
+        if not isinstance(child.tag, str):
+            continue
+        html = _serialize(child)
+        tokens = estimate_tokens(html)
+        if tokens > max_tokens and len(child):
+            parts.extend(_split_large_region(label, child, max_tokens))
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            parts.append((label, "".join(current)))
+            current, current_tokens = [], 0
+        current.append(html)
+        current_tokens += tokens
+    if current:
+        parts.append((label, "".join(current)))
+    return parts
+
+
+def split_into_regions(html, max_tokens):
+    """
+    Split minimized page HTML into semantic regions that each fit a token budget
+
+    Landmarks (header, nav, forms, main content, aside, footer) become regions;
+    content outside of them forms a 'body' region. Oversized regions are split
+    by their children and small regions are packed together.
+
+    Args:
+        html (str): Minimized page HTML
+        max_tokens (int): Maximum estimated tokens per chunk
+
+    Returns:
+        list: (labels, html) tuples in document order, labels joined with '+'
+    """
+    if lxml is None or estimate_tokens(html) <= max_tokens:
+        return [("page", html)]
+
+    root = lxml.html.document_fromstring(html)
+    body = root.find("body")
+    if body is None:
+        body = root
+
+    regions = _collect_regions(body)
+
+    chunks = []
+    for label, element in regions:
+        region_html = _serialize(element)
+        if estimate_tokens(region_html) > max_tokens:
+            chunks.extend(_split_large_region(label, element, max_tokens))
+        else:
+            chunks.append((label, region_html))
+        element.drop_tree()
+
+    # Whatever is left outside the landmarks
+    remainder = "".join(_serialize(child) for child in body if isinstance(child.tag, str))
+    if remainder.strip():
+        if estimate_tokens(remainder) > max_tokens:
+            chunks.extend(_split_large_region("body", body, max_tokens))
+        else:
+            chunks.append(("body", remainder))
+
+    return _pack_chunks(chunks, max_tokens)
+
+
+def _region_label(element):
+    return REGION_TAGS.get(element.tag) or REGION_ROLES.get(element.get("role"))
+
+
+def _collect_regions(body):
+    """Find the outermost landmark elements in document order"""
+    regions = []
+    stack = [child for child in reversed(body) if isinstance(child.tag, str)]
+    while stack:
+        element = stack.pop()
+        label = _region_label(element)
+        if label:
+            # Nested landmarks (a form inside main, nav inside header) stay with the outer region
+            regions.append((label, element))
+        else:
+            stack.extend(child for child in reversed(element) if isinstance(child.tag, str))
+    return regions
+
+
+def _pack_chunks(chunks, max_tokens):
+    """Combine consecutive small chunks so each request carries up to max_tokens"""
+    packed = []
+    for label, html in chunks:
+        if packed and estimate_tokens(packed[-1][1] + html) <= max_tokens:
+            previous_label, previous_html = packed[-1]
+            labels = previous_label if label in previous_label.split("+") else f"{previous_label}+{label}"
+            packed[-1] = (labels, previous_html + html)
+        else:
+            packed.append((label, html))
+    return packed
+
+
+def _ordered_union(*lists):
+    seen = set()
+    merged = []
+    for items in lists:
+        for item in items or []:
+            key = canonical_json_hash(item)
+            if key not in seen:
+                seen.add(key)
+                merged.append(item)
+    return merged
+
+
+def _merge_objects(*lists):
+    """Union of object lists, treating objects with the same selector (or content) as one"""
+    seen = set()
+    merged = []
+    for items in lists:
+        for item in items or []:
+            selector = (item.get("selector") or item.get("element_selector")) if isinstance(item, dict) else None
+            key = selector or canonical_json_hash(item)
+            if key not in seen:
+                seen.add(key)
+                merged.append(item)
+    return merged
+
+
+def _merge_auth_requirements(parts):
+    parts = [part for part in parts if isinstance(part, dict)]
+    if not parts:
+        return {}
+    auth_types = sorted(
+        (part.get("auth_type") for part in parts if part.get("auth_type") not in (None, "", "none")),
+        key=lambda auth_type: _AUTH_TYPE_PRIORITY.get(auth_type, len(_AUTH_TYPE_PRIORITY))
+    )
+    hints = [part.get("credentials_hint") for part in parts if part.get("credentials_hint")]
+    return {
+        "auth_required": any(bool(part.get("auth_required")) for part in parts),
+        "auth_type": auth_types[0] if auth_types else "none",
+        "auth_fields": _merge_objects(*(part.get("auth_fields") for part in parts)),
+        "credentials_hint": hints[0] if hints else ""
+    }
+
+
+def merge_page_analyses(partials):
+    """
+    Deterministically merge per-region llm_page_analysis results into one page_metadata dict
+
+    Results are combined in region order, so the merged output doesn't depend on
+    which request finished first.
+
+    Args:
+        partials (list): Parsed JSON results of the regions, in region order
+
+    Returns:
+        dict: Merged metadata in the llm_page_analysis schema
+    """
+    partials = [partial for partial in partials if isinstance(partial, dict) and partial]
+    if not partials:
+        return {}
+
+    merged = {}
+    keys = []
+    for partial in partials:
+        keys.extend(key for key in partial if key not in keys)
+
+    for key in keys:
+        values = [partial[key] for partial in partials if key in partial]
+        if key == "auth_requirements":
+            merged[key] = _merge_auth_requirements(values)
+        elif key in _OBJECT_LIST_KEYS:
+            merged[key] = _merge_objects(*values)
+        elif key == "main_content":
+            merged[key] = " ".join(dict.fromkeys(value.strip() for value in values if isinstance(value, str) and value.strip()))
+        elif all(isinstance(value, list) for value in values):
+            merged[key] = _ordered_union(*values)
+        elif all(isinstance(value, dict) for value in values):
+            combined = {}
+            for value in values:
+                for sub_key, sub_value in value.items():
+                    if isinstance(sub_value, list) and isinstance(combined.get(sub_key), list):
+                        combined[sub_key] = _ordered_union(combined[sub_key], sub_value)
+                    else:
+                        combined.setdefault(sub_key, sub_value)
+            merged[key] = combined
+        else:
+            merged[key] = next((value for value in values if value not in (None, "", [], {})), values[0])
+    return merged
@@ -0,0 +1,134 @@
+"""
+Rate limiting primitives for throttling requests to external providers
+"""
+import asyncio
+import threading
+import time
+
+
+def estimate_tokens(*texts):
+    """
+    Roughly estimate the token count of one or more prompt texts
+
+    Args:
+        *texts (str): Texts that will be sent to the model
+
+    Returns:
+        int: Estimated token count (~4 characters per token)
+    """
+    return sum(len(text or "") for text in texts) // 4 + 1
+
+
+class TokenBucket:
+    """Thread-safe token bucket continuously refilled at a per-minute rate"""
+
+    def __init__(self, capacity_per_minute):
+        """
+        Initialize token bucket
+
+        Args:
+            capacity_per_minute (float): Tokens replenished per minute (also the burst size)
+        """
+        self.capacity = float(capacity_per_minute)
+        self.refill_rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount=1):
+        """
+        Reserve tokens from the bucket
+
+        The reservation is taken immediately (the balance may go negative) so
+        concurrent callers queue up fairly instead of racing for the refill.
+
+        Args:
+            amount (float): Number of tokens to take
+
+        Returns:
+            float: Seconds the caller has to wait before using the reservation
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+            self.updated_at = now
+            self.tokens -= min(amount, self.capacity)
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.refill_rate
+
+
+class ProviderRateLimiter:
+    """Requests/min and tokens/min limiter for a single LLM provider"""
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        """
+        Initialize provider rate limiter
+
+        Args:
+            requests_per_minute (int, optional): Request quota, None or 0 for unlimited
+            tokens_per_minute (int, optional): Token quota, None or 0 for unlimited
+        """
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def _reserve(self, tokens):
+        """Reserve one request and the given tokens, returning the wait time in seconds"""
+        wait_time = 0.0
+        if self.request_bucket:
+            wait_time = max(wait_time, self.request_bucket.reserve(1))
+        if self.token_bucket:
+            wait_time = max(wait_time, self.token_bucket.reserve(tokens))
+        return wait_time
+
+    def acquire(self, tokens=0):
+        """Block the current thread until the request fits in the provider quota"""
+        wait_time = self._reserve(tokens)
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    async def acquire_async(self, tokens=0):
+        """Wait without blocking the event loop until the request fits in the provider quota"""
+        wait_time = self._reserve(tokens)
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+
+class HostRateLimiter:
+    """Thread-safe per-host request spacing for polite crawling"""
+
+    def __init__(self, requests_per_second=1.0):
+        """
+        Initialize host rate limiter
+
+        Args:
+            requests_per_second (float): Requests allowed per host and second, None or 0 for unlimited
+        """
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._intervals = {}  # host -> interval overriding the default (e.g., robots.txt Crawl-delay)
+        self._next_slot = {}  # host -> monotonic time the next request may start
+        self._lock = threading.Lock()
+
+    def set_interval(self, host, seconds):
+        """Use a different minimum interval in seconds between requests to a host"""
+        with self._lock:
+            self._intervals[host] = max(0.0, float(seconds))
+
+    def reserve(self, host):
+        """
+        Reserve the next request slot of a host
+
+        Returns:
+            float: Seconds the caller has to wait before sending the request
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self._intervals.get(host, self.interval)
+            return slot - now
+
+    def acquire(self, host):
+        """Block the current thread until a request to the host is allowed"""
+        wait_time = self.reserve(host)
+        if wait_time > 0:
+            time.sleep(wait_time)
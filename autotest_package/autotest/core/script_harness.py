@@ -0,0 +1,256 @@
+"""
+Script harness module for running generated Python test scripts in-process on pooled browsers
+"""
+import ctypes
+import io
+import subprocess
+import sys
+import threading
+import traceback
+import types
+
+from .browser_pool import BrowserPool
+from .session_store import apply_session_state
+
+_state = threading.local()  # Per-thread leased driver, script module and output buffers
+_install_lock = threading.Lock()
+_installed = False
+_active_runs = 0  # Runs holding the stream redirection; the original streams return when it drops to 0
+
+
+class _ScriptTimeout(BaseException):
+    """Raised inside a timed out script's thread to stop it"""
+
+
+class _Discard:
+    """Output sink for scripts that timed out, their late writes must not land in any report"""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        return ""
+
+
+_DISCARD = _Discard()
+
+
+class _ThreadDispatchStream:
+    """sys.stdout/sys.stderr replacement writing to the running script's buffer, if any"""
+
+    def __init__(self, original, name):
+        self._original = original
+        self._name = name
+
+    def _target(self):
+        buffers = getattr(_state, "buffers", None)
+        return buffers[self._name] if buffers else self._original
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+
+class _SharedDriver:
+    """Proxy handed to scripts in place of a new Chrome; quitting it keeps the pooled session alive"""
+
+    def __init__(self, driver):
+        self.__dict__["_driver"] = driver
+
+    def quit(self):
+        pass
+
+    def close(self):
+        # Closing the last window would end the session
+        if len(self._driver.window_handles) > 1:
+            self._driver.close()
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._driver, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def _install_hooks():
+    """Patch Chrome construction and unittest.main once per process"""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        import unittest
+        from selenium import webdriver
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        original_chrome = webdriver.Chrome
+        original_install = ChromeDriverManager.install
+        original_unittest_main = unittest.main
+
+        def chrome(*args, **kwargs):
+            driver = getattr(_state, "driver", None)
+            if driver is None:
+                return original_chrome(*args, **kwargs)
+            return _SharedDriver(driver)
+
+        def install(self, *args, **kwargs):
+            # The pooled browser is already running, skip the driver download check
+            if getattr(_state, "driver", None) is not None:
+                return ""
+            return original_install(self, *args, **kwargs)
+
+        def unittest_main(*args, **kwargs):
+            # Load tests from the script's module and don't parse the autotest CLI arguments
+            module = getattr(_state, "module", None)
+            if module is not None:
+                if not args:
+                    kwargs.setdefault("module", module)
+                if len(args) < 2:
+                    kwargs.setdefault("argv", [module.__file__])
+            return original_unittest_main(*args, **kwargs)
+
+        webdriver.Chrome = chrome
+        ChromeDriverManager.install = install
+        unittest.main = unittest_main
+        _installed = True
+
+
+def _acquire_streams():
+    """Route sys.stdout/sys.stderr through per-thread buffers while scripts run, again if something replaced them"""
+    global _active_runs
+    with _install_lock:
+        _active_runs += 1
+        if not isinstance(sys.stdout, _ThreadDispatchStream):
+            sys.stdout = _ThreadDispatchStream(sys.stdout, "stdout")
+        if not isinstance(sys.stderr, _ThreadDispatchStream):
+            sys.stderr = _ThreadDispatchStream(sys.stderr, "stderr")
+
+
+def _release_streams():
+    """Restore the original streams once no script runs any more"""
+    global _active_runs
+    with _install_lock:
+        _active_runs -= 1
+        if _active_runs:
+            return
+        if isinstance(sys.stdout, _ThreadDispatchStream):
+            sys.stdout = sys.stdout._original
+        if isinstance(sys.stderr, _ThreadDispatchStream):
+            sys.stderr = sys.stderr._original
+
+
+def _stop_thread(thread):
+    """Ask a hung script thread to exit by raising _ScriptTimeout in it at its next bytecode (CPython only)"""
+    try:
+        ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread.ident), ctypes.py_object(_ScriptTimeout))
+    except (AttributeError, TypeError):
+        pass
+
+
+class ScriptHarness:
+    """Runs generated Python scripts as modules in this interpreter, each on a leased pooled browser"""
+
+    def __init__(self, browser_pool=None, size=1, logger=None):
+        """
+        Initialize script harness
+
+        Args:
+            browser_pool (BrowserPool): Pool to lease browsers from, a private pool is created if not given
+            size (int): Size of the private pool (number of scripts running at once)
+            logger (Logger): Optional logger
+        """
+        self.browser_pool = browser_pool or BrowserPool(size=size, logger=logger)
+        self._owns_pool = browser_pool is None
+        self.logger = self.browser_pool.logger
+        _install_hooks()
+
+    def _execute(self, script, driver, buffers, outcome):
+        # Fresh module named __main__ so `if __name__ == "__main__": unittest.main()` runs
+        module = types.ModuleType("__main__")
+        module.__file__ = "<generated_test>"
+        _state.driver = driver
+        _state.module = module
+        _state.buffers = buffers
+        try:
+            code = compile(script, module.__file__, "exec")
+            exec(code, module.__dict__)
+            outcome["returncode"] = 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                outcome["returncode"] = e.code or 0
+            else:
+                buffers["stderr"].write(f"{e.code}\n")
+                outcome["returncode"] = 1
+        except BaseException:
+            buffers["stderr"].write(traceback.format_exc())
+            outcome["returncode"] = 1
+        finally:
+            _state.driver = None
+            _state.module = None
+            _state.buffers = None
+
+    def run(self, script, timeout=30, session_state=None):
+        """
+        Run a script on a leased browser and capture its output
+
+        Args:
+            script (str): Python source of the generated test
+            timeout (int): Wall-clock timeout in seconds
+            session_state (dict): Stored login session loaded into the browser before the script runs, or None
+
+        Returns:
+            subprocess.CompletedProcess: Return code and captured stdout/stderr, as for a subprocess run
+
+        Raises:
+            subprocess.TimeoutExpired: If the script runs longer than the timeout
+        """
+        _acquire_streams()
+        browser = None
+        buffers = {"stdout": io.StringIO(), "stderr": io.StringIO()}
+        outcome = {}
+        try:
+            browser = self.browser_pool.acquire()
+            if session_state:
+                apply_session_state(browser.driver, session_state, self.logger)
+            runner = threading.Thread(
+                target=self._execute, args=(script, browser.driver, buffers, outcome),
+                name="script-harness", daemon=True
+            )
+            runner.start()
+            runner.join(timeout)
+            if runner.is_alive():
+                self.logger.warning("In-process test script timed out, discarding its browser")
+                output, errors = buffers["stdout"].getvalue(), buffers["stderr"].getvalue()
+                # The thread keeps its buffers; drop whatever it writes from now on
+                buffers["stdout"] = buffers["stderr"] = _DISCARD
+                # Ending the session makes the script's next WebDriver call fail, the async exception stops Python code
+                self.browser_pool.discard(browser)
+                browser = None
+                _stop_thread(runner)
+                raise subprocess.TimeoutExpired("generated_test", timeout, output=output, stderr=errors)
+        finally:
+            if browser is not None:
+                self.browser_pool.release(browser)
+            _release_streams()
+
+        return subprocess.CompletedProcess(
+            "generated_test", outcome.get("returncode", 1), buffers["stdout"].getvalue(), buffers["stderr"].getvalue()
+        )
+
+    def close(self):
+        """Close the private browser pool"""
+        if self._owns_pool:
+            self.browser_pool.close()
@@ -0,0 +1,105 @@
+"""
+Script runner module for executing generated test scripts in resource-limited subprocesses
+"""
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from ..utils.process_memory import process_group_memory
+
+# Applies the CPU limit and the stored login session inside the child, then runs the script as __main__.
+# Limits are set here instead of in a preexec_fn, which is unsafe to run from the generator's worker threads.
+_BOOTSTRAP = (
+    "import os, runpy, sys\n"
+    "cpu_limit, use_session, script = int(sys.argv[1]), sys.argv[2] == '1', sys.argv[3]\n"
+    "if cpu_limit:\n"
+    "    try:\n"
+    "        import resource\n"
+    "        resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_limit))\n"
+    "    except ImportError:\n"
+    "        pass\n"
+    "if use_session:\n"
+    "    from autotest.core.session_store import install_session_bootstrap\n"
+    "    install_session_bootstrap()\n"
+    "sys.argv = sys.argv[3:]\n"
+    "sys.path[0] = os.path.dirname(os.path.abspath(script))\n"
+    "runpy.run_path(script, run_name='__main__')\n"
+)
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# How often the memory use of a script's process group is sampled
+MEMORY_POLL_INTERVAL = 0.2
+
+
+def _kill(process, posix):
+    """Kill the script together with the browsers it started"""
+    if posix:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    else:
+        process.kill()
+
+
+def run_script_process(script_path, timeout=30, cpu_limit_seconds=None, memory_limit_mb=None, session_state_path=None):
+    """
+    Run a Python test script in its own process group
+
+    The whole process group (the script, chromedriver and Chrome) is killed on timeout,
+    so timed out scripts don't leave browsers behind. The CPU limit applies to each
+    process, the memory limit to the combined memory of the process group, which is
+    sampled while the script runs (Linux only).
+
+    Args:
+        script_path (str): Path of the script to run
+        timeout (int): Wall-clock timeout in seconds
+        cpu_limit_seconds (int): CPU time limit per process, or None
+        memory_limit_mb (int): Memory limit in MB for the script and its browsers, or None
+        session_state_path (str): JSON file with a stored login session loaded into the script's browsers, or None
+
+    Returns:
+        subprocess.CompletedProcess: Finished process with captured stdout and stderr
+
+    Raises:
+        subprocess.TimeoutExpired: If the script runs longer than the timeout
+    """
+    posix = os.name == "posix"
+    command = [sys.executable, "-c", _BOOTSTRAP, str(cpu_limit_seconds or 0), "1" if session_state_path else "0", script_path]
+    env = None
+    if session_state_path:
+        from .session_store import SESSION_STATE_ENV
+        env = dict(os.environ)
+        env[SESSION_STATE_ENV] = session_state_path
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [_PACKAGE_ROOT, env.get("PYTHONPATH")]))
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+        start_new_session=posix
+    )
+    memory_limit = memory_limit_mb * 1024 * 1024 if memory_limit_mb and posix else None
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        try:
+            stdout, stderr = process.communicate(
+                timeout=max(0, min(remaining, MEMORY_POLL_INTERVAL) if memory_limit else remaining)
+            )
+            return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
+        except subprocess.TimeoutExpired:
+            # communicate() can be retried after a timeout without losing output
+            if time.monotonic() >= deadline:
+                _kill(process, posix)
+                process.communicate()
+                raise subprocess.TimeoutExpired(process.args, timeout)
+            used = process_group_memory(process.pid) if memory_limit else None
+            if used is not None and used > memory_limit:
+                _kill(process, posix)
+                stdout, stderr = process.communicate()
+                stderr += f"\nKilled: the script and its browsers used {used // (1024 * 1024)} MB, over the {memory_limit_mb} MB limit\n"
+                return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
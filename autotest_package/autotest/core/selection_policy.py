@@ -0,0 +1,90 @@
+"""
+Selection policy module for choosing URLs and test cases without user interaction
+"""
+import re
+import yaml
+
+
+class SelectionPolicy:
+    """Declarative replacement for the interactive URL and test case selection prompts"""
+
+    def __init__(self, types=None, name_pattern=None, max_per_page=None, url_pattern=None, max_urls=None):
+        """
+        Initialize selection policy
+
+        Args:
+            types (list): Test case types to keep (case-insensitive), or None for all types
+            name_pattern (str): Regex a test case name must match, or None
+            max_per_page (int): Maximum number of test cases selected per page, or None
+            url_pattern (str): Regex a discovered URL must match, or None
+            max_urls (int): Maximum number of discovered URLs selected, or None
+        """
+        self.types = {t.strip().lower() for t in types if t.strip()} if types else None
+        self.name_pattern = re.compile(name_pattern, re.IGNORECASE) if name_pattern else None
+        self.max_per_page = max_per_page
+        self.url_pattern = re.compile(url_pattern) if url_pattern else None
+        self.max_urls = max_urls
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Load a selection policy from a YAML file
+
+        Args:
+            path (str): Path of a YAML file with any of the constructor arguments as keys
+
+        Returns:
+            SelectionPolicy: Loaded policy
+        """
+        with open(path, 'r') as f:
+            config = yaml.safe_load(f) or {}
+        unknown = set(config) - {'types', 'name_pattern', 'max_per_page', 'url_pattern', 'max_urls'}
+        if unknown:
+            raise ValueError(f"Unknown selection policy keys: {', '.join(sorted(unknown))}")
+        return cls(**config)
+
+    def select_test_cases(self, test_cases):
+        """
+        Select test cases of a page
+
+        Args:
+            test_cases (list): Test case dictionaries of the page
+
+        Returns:
+            list: 1-based numbers of the selected test cases
+        """
+        selected = []
+        for number, test_case in enumerate(test_cases, 1):
+            if self.types is not None and str(test_case.get('type', '')).lower() not in self.types:
+                continue
+            if self.name_pattern and not self.name_pattern.search(test_case.get('name', '')):
+                continue
+            selected.append(number)
+        return selected[:self.max_per_page] if self.max_per_page else selected
+
+    def select_urls(self, urls):
+        """
+        Select discovered URLs
+
+        Args:
+            urls (list): Discovered URLs
+
+        Returns:
+            list: 1-based numbers of the selected URLs
+        """
+        selected = [number for number, url in enumerate(urls, 1)
+                    if not self.url_pattern or self.url_pattern.search(url)]
+        return selected[:self.max_urls] if self.max_urls else selected
+
+    @staticmethod
+    def as_answer(numbers):
+        """
+        Format selected numbers as the answer to a selection prompt
+
+        Args:
+            numbers (list): 1-based selected numbers
+
+        Returns:
+            str: Comma separated numbers, or 'quit' when nothing is selected
+        """
+        return ','.join(str(number) for number in numbers) if numbers else 'quit'
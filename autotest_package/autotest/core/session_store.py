@@ -0,0 +1,211 @@
+"""
+Session store module for reusing authenticated browser state across pages and test scripts
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+from ..db.database import SessionLocal
+from ..tables.auth_session import AuthSession
+
+# Environment variable pointing subprocess test scripts to a session state file
+SESSION_STATE_ENV = "AUTOTEST_SESSION_STATE"
+
+_LOCAL_STORAGE_SCRIPT = """
+var items = {};
+try {
+    for (var i = 0; i < window.localStorage.length; i++) {
+        var key = window.localStorage.key(i);
+        items[key] = window.localStorage.getItem(key);
+    }
+} catch (e) {}
+return items;
+"""
+_SET_LOCAL_STORAGE_SCRIPT = """
+var items = arguments[0];
+for (var key in items) { window.localStorage.setItem(key, items[key]); }
+"""
+# Cookie fields accepted by WebDriver add_cookie
+_COOKIE_FIELDS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
+
+
+def _origin(url):
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def _live_cookies(cookies, now=None):
+    """Drop cookies that expired since the state was captured"""
+    now = now or time.time()
+    return [cookie for cookie in cookies if not cookie.get("expiry") or cookie["expiry"] > now]
+
+
+def capture_session_state(driver):
+    """
+    Capture cookies and localStorage of the page the driver is on
+
+    Args:
+        driver (WebDriver): Browser with an authenticated page loaded
+
+    Returns:
+        dict: Session state with origin, cookies and local_storage
+    """
+    return {
+        "origin": _origin(driver.current_url),
+        "cookies": [{k: v for k, v in cookie.items() if k in _COOKIE_FIELDS} for cookie in driver.get_cookies()],
+        "local_storage": driver.execute_script(_LOCAL_STORAGE_SCRIPT) or {}
+    }
+
+
+def apply_session_state(driver, state, logger=None):
+    """
+    Load a captured session state into a browser
+
+    Cookies can only be set for the current document's domain, so the browser
+    is navigated to the origin first; the caller loads the target page afterwards.
+
+    Args:
+        driver (WebDriver): Browser to authenticate
+        state (dict): State returned by capture_session_state
+        logger (Logger): Optional logger
+
+    Returns:
+        int: Number of cookies added
+    """
+    logger = logger or logging.getLogger(__name__)
+    driver.get(state["origin"])
+    added = 0
+    for cookie in _live_cookies(state.get("cookies") or []):
+        try:
+            driver.add_cookie(cookie)
+            added += 1
+        except Exception as e:
+            # Cookies of other domains (e.g., an SSO host) can't be set from this origin
+            logger.debug(f"Skipped cookie '{cookie.get('name')}': {str(e)}")
+    if state.get("local_storage"):
+        driver.execute_script(_SET_LOCAL_STORAGE_SCRIPT, state["local_storage"])
+    return added
+
+
+class SessionStore:
+    """Stores the authenticated browser state per host and account after a successful login"""
+
+    def __init__(self, logger=None):
+        """
+        Initialize session store
+
+        Args:
+            logger (Logger): Optional logger
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self._states = {}  # (host, username) -> state, loaded from the database on first use
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url):
+        """Return the host a URL's session state is stored under"""
+        return urlparse(url).netloc
+
+    def get(self, url, username):
+        """
+        Get the stored session state of an account on a URL's host
+
+        Args:
+            url (str): URL of the page to open
+            username (str): Account the run logs in with; without one no session is restored
+
+        Returns:
+            dict: Session state, or None if there is none or all its cookies expired
+        """
+        if not username:
+            return None
+        host = self.host_of(url)
+        key = (host, username)
+        with self._lock:
+            if key not in self._states:
+                with SessionLocal() as db:
+                    row = db.query(AuthSession).filter(AuthSession.host == host, AuthSession.username == username).first()
+                    self._states[key] = {
+                        "origin": row.origin,
+                        "cookies": row.cookies or [],
+                        "local_storage": row.local_storage or {}
+                    } if row else None
+            state = self._states[key]
+        if state and state["cookies"] and not _live_cookies(state["cookies"]):
+            self.logger.debug(f"Stored session for '{username}' on '{host}' expired")
+            self.invalidate(url, username)
+            return None
+        return state
+
+    def save(self, url, username, state):
+        """
+        Store the session state captured after a login
+
+        Args:
+            url (str): URL of the authenticated page
+            username (str): Account that logged in
+            state (dict): State returned by capture_session_state
+        """
+        if not username:
+            return
+        host = self.host_of(url)
+        expiries = [cookie.get("expiry") for cookie in state["cookies"]]
+        expires_at = None
+        if expiries and all(expiries):
+            expires_at = datetime.fromtimestamp(max(expiries), tz=timezone.utc)
+        with self._lock:
+            self._states[(host, username)] = state
+            with SessionLocal() as db:
+                row = db.query(AuthSession).filter(AuthSession.host == host, AuthSession.username == username).first()
+                if not row:
+                    row = AuthSession(host=host, username=username)
+                    db.add(row)
+                row.origin = state["origin"]
+                row.cookies = state["cookies"]
+                row.local_storage = state["local_storage"]
+                row.expires_at = expires_at
+                db.commit()
+        self.logger.debug(f"Stored session for '{username}' on '{host}' ({len(state['cookies'])} cookies)")
+
+    def invalidate(self, url, username):
+        """
+        Forget the session state of an account on a URL's host, e.g. when the site asks to log in again
+
+        Args:
+            url (str): URL of a page of the host
+            username (str): Account of the session
+        """
+        host = self.host_of(url)
+        with self._lock:
+            self._states[(host, username)] = None
+            with SessionLocal() as db:
+                db.query(AuthSession).filter(AuthSession.host == host, AuthSession.username == username).delete()
+                db.commit()
+
+
+def install_session_bootstrap():
+    """
+    Authenticate browsers created by a test script with the state file named in AUTOTEST_SESSION_STATE
+
+    Wraps webdriver.Chrome so the new browser is loaded with the stored cookies
+    and localStorage before the script opens its first page.
+    """
+    path = os.environ.get(SESSION_STATE_ENV)
+    if not path:
+        return
+    with open(path, "r") as f:
+        state = json.load(f)
+
+    from selenium import webdriver
+    original_chrome = webdriver.Chrome
+
+    def chrome(*args, **kwargs):
+        driver = original_chrome(*args, **kwargs)
+        apply_session_state(driver, state)
+        return driver
+
+    webdriver.Chrome = chrome
@@ -0,0 +1,208 @@
+"""
+Sitemap module for reading robots.txt rules and streaming the URLs of a site's sitemaps
+"""
+import logging
+import zlib
+from collections import deque
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import httpx
+
+from .link_discovery import USER_AGENT
+
+# Product token matched against robots.txt User-agent groups
+ROBOTS_AGENT = "autotest-web-generator"
+
+# Limits from the sitemap protocol, guarding against runaway indexes and gzip bombs
+MAX_SITEMAPS = 50
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+MAX_SITEMAP_URLS = 50000
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class RobotsRules:
+    """Parsed robots.txt of one host"""
+
+    def __init__(self, parser=None, sitemaps=None):
+        """
+        Initialize robots rules
+
+        Args:
+            parser (RobotFileParser): Parsed robots.txt, None allows everything
+            sitemaps (list): Sitemap URLs listed in robots.txt
+        """
+        self.parser = parser
+        self.sitemaps = sitemaps or []
+
+    @property
+    def crawl_delay(self):
+        """Crawl-delay in seconds requested for this crawler, or None"""
+        if self.parser is None:
+            return None
+        delay = self.parser.crawl_delay(ROBOTS_AGENT)
+        return float(delay) if delay is not None else None
+
+    def allowed(self, url):
+        """Whether robots.txt allows this crawler to fetch the URL"""
+        return self.parser is None or self.parser.can_fetch(ROBOTS_AGENT, url)
+
+
+def fetch_robots(client, base_url, logger=None):
+    """
+    Fetch and parse the robots.txt of a site
+
+    A missing or unreadable robots.txt allows everything.
+
+    Args:
+        client (httpx.Client): HTTP client
+        base_url (str): Any URL of the site
+        logger (Logger): Optional logger
+
+    Returns:
+        RobotsRules: Rules of the site's host
+    """
+    logger = logger or logging.getLogger(__name__)
+    parsed_url = urlparse(base_url)
+    robots_url = f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
+    try:
+        response = client.get(robots_url)
+    except httpx.HTTPError as e:
+        logger.warning(f"Could not fetch {robots_url} ({type(e).__name__}), crawling without robots rules")
+        return RobotsRules()
+    if response.status_code != 200:
+        logger.debug(f"{robots_url} returned {response.status_code}, crawling without robots rules")
+        return RobotsRules()
+
+    parser = RobotFileParser(robots_url)
+    parser.parse(response.text.splitlines())
+    return RobotsRules(parser, list(parser.site_maps() or []))
+
+
+def parse_lastmod(value):
+    """
+    Parse a sitemap <lastmod> value (W3C datetime)
+
+    Args:
+        value (str): Date such as '2024-05-01' or '2024-05-01T10:00:00+00:00'
+
+    Returns:
+        datetime: Timezone-aware datetime (UTC when no offset is given), or None if unparseable
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _stream_bytes(client, url):
+    """Yield the decompressed body of a sitemap, gzipped or not, in chunks"""
+    with client.stream("GET", url) as response:
+        response.raise_for_status()
+        decompressor = None
+        total = 0
+        for index, chunk in enumerate(response.iter_bytes()):
+            if index == 0 and chunk.startswith(GZIP_MAGIC):
+                # .xml.gz files are served as-is, not with a gzip Content-Encoding httpx would decode
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            while chunk:
+                if decompressor:
+                    data = decompressor.decompress(chunk, 1024 * 1024)
+                    chunk = decompressor.unconsumed_tail
+                else:
+                    data, chunk = chunk, b""
+                total += len(data)
+                if total > MAX_SITEMAP_BYTES:
+                    raise ValueError(f"Sitemap {url} is larger than {MAX_SITEMAP_BYTES} bytes")
+                yield data
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_sitemap(client, url):
+    """
+    Stream-parse one sitemap file
+
+    Only <loc> and <lastmod> directly inside a top-level <url> or <sitemap> are read, so
+    extension elements such as <image:image><image:loc> never replace the page URL.
+
+    Yields:
+        tuple: ('url', loc, lastmod) for pages and ('sitemap', loc, lastmod) for index entries
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    root = None
+    depth = 0
+    for data in _stream_bytes(client, url):
+        parser.feed(data)
+        for event, element in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            name = _local_name(element.tag)
+            if depth != 1 or name not in ("url", "sitemap"):
+                continue
+            fields = {}
+            for child in element:
+                child_name = _local_name(child.tag)
+                if child_name in ("loc", "lastmod"):
+                    fields[child_name] = (child.text or "").strip()
+            if fields.get("loc"):
+                yield name, fields["loc"], parse_lastmod(fields.get("lastmod"))
+            # Drop parsed entries so memory stays flat on 50,000-URL sitemaps
+            root.clear()
+    parser.close()
+
+
+def iter_sitemap_urls(client, sitemap_urls, logger=None, max_sitemaps=MAX_SITEMAPS, max_urls=MAX_SITEMAP_URLS):
+    """
+    Read page URLs from sitemaps, following sitemap indexes
+
+    Args:
+        client (httpx.Client): HTTP client
+        sitemap_urls (list): Sitemap or sitemap index URLs to start from
+        logger (Logger): Optional logger
+        max_sitemaps (int): Maximum number of sitemap files fetched
+        max_urls (int): Maximum number of page URLs yielded
+
+    Yields:
+        tuple: (page URL, lastmod datetime or None)
+    """
+    logger = logger or logging.getLogger(__name__)
+    pending = deque(dict.fromkeys(sitemap_urls))
+    fetched = set()
+    yielded = 0
+    while pending and len(fetched) < max_sitemaps:
+        sitemap_url = pending.popleft()
+        if sitemap_url in fetched:
+            continue
+        fetched.add(sitemap_url)
+        try:
+            for kind, loc, lastmod in _parse_sitemap(client, sitemap_url):
+                if kind == "sitemap":
+                    pending.append(loc)
+                    continue
+                yield loc, lastmod
+                yielded += 1
+                if yielded >= max_urls:
+                    logger.info(f"Read the maximum of {max_urls} sitemap URLs")
+                    return
+        except httpx.HTTPStatusError as e:
+            logger.debug(f"Sitemap {sitemap_url} returned {e.response.status_code}")
+        except (httpx.HTTPError, ParseError, ValueError, zlib.error) as e:
+            logger.warning(f"Could not read sitemap {sitemap_url}: {str(e)}")
+    if pending:
+        logger.info(f"Stopped after {max_sitemaps} sitemaps, {len(pending)} more were listed")
@@ -1,35 +1,118 @@
 """
 URL Extractor module for recursive URL discovery
 """
-import time
 import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, urljoin
+from zoneinfo import ZoneInfo
+
+import httpx
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from ..db.database import SessionLocal
+from ..tables.page import Page
+from .browser_pool import BrowserPool
+from .dom_scripts import ANCHOR_HREFS_SCRIPT
+from .link_discovery import USER_AGENT, LinkFetcher
+from .rate_limiter import HostRateLimiter
+from .sitemap import fetch_robots, iter_sitemap_urls
+
+# Fetcher threads in hybrid discovery; they mostly wait on HTTP, browsers are limited by `workers`
+HYBRID_FETCHERS = 4
+
+
+class CrawlFrontier:
+    """URLs waiting to be fetched, shallowest depth first, with a set index of every URL ever queued"""
+
+    def __init__(self):
+        self._levels = {}  # depth -> deque of URLs in discovery order
+        self._seen = set()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, url):
+        return url in self._seen
+
+    def add_seen(self, urls):
+        """Index URLs (e.g., already visited) so they are never queued"""
+        self._seen.update(urls)
+
+    def push(self, url, depth):
+        """
+        Queue a URL unless it was queued or seen before
+
+        Returns:
+            bool: True if the URL was queued
+        """
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        self._levels.setdefault(depth, deque()).append(url)
+        self._size += 1
+        return True
+
+    def pop(self):
+        """
+        Take the next URL of the shallowest non-empty depth
+
+        Returns:
+            tuple: (url, depth)
+        """
+        depth = min(self._levels)
+        level = self._levels[depth]
+        url = level.popleft()
+        if not level:
+            del self._levels[depth]
+        self._size -= 1
+        return url, depth
+
 
 class URLExtractor:
     """Class for extracting URLs from web pages recursively"""
     
-    def __init__(self, driver, logger=None):
+    def __init__(self, driver, logger=None, browser_pool=None, requests_per_second=1.0, discovery="hybrid",
+                 use_sitemaps=True, respect_robots=True, find_unchanged=False):
         """
         Initialize URL extractor
         
         Args:
             driver: Selenium WebDriver instance
             logger: Logger instance (optional)
+            browser_pool (BrowserPool): Pool parallel fetchers lease browsers from, a private pool is used if not given
+            requests_per_second (float): Page loads allowed per host and second across all fetchers
+            discovery (str): 'hybrid' reads links over HTTP and renders only JS-driven pages in the browser,
+                'browser' renders every page
+            use_sitemaps (bool): Whether to seed the crawl with the site's sitemap URLs
+            respect_robots (bool): Whether to skip URLs disallowed by robots.txt and honour its Crawl-delay
+            find_unchanged (bool): Whether to collect sitemap URLs not modified since their last analysis (incremental runs)
         """
+        if discovery not in ("hybrid", "browser"):
+            raise ValueError(f"Unknown discovery mode '{discovery}', use 'hybrid' or 'browser'")
         self.driver = driver
         self.logger = logger or logging.getLogger(__name__)
+        self.browser_pool = browser_pool
+        self.rate_limiter = HostRateLimiter(requests_per_second)
+        self.discovery = discovery
+        self.use_sitemaps = use_sitemaps
+        self.respect_robots = respect_robots
+        self.find_unchanged = find_unchanged
+        self.unchanged_urls = set()  # sitemap URLs not modified since they were last analyzed, crawled all the same
         
-    def extract_urls(self, base_url, max_depth=2):
+    def extract_urls(self, base_url, max_depth=2, checkpoint=None, workers=1):
         """
         Recursively extract unique internal URLs with BFS up to max_depth
         
         Args:
             base_url (str): Base URL to start extraction from
             max_depth (int): Maximum depth for recursive extraction
+            checkpoint (CrawlCheckpoint): Optional checkpoint the frontier and visited set are persisted to and resumed from
+            workers (int): Number of pages fetched in parallel, each in its own browser
             
         Returns:
             list: Sorted list of unique URLs found
@@ -37,57 +120,99 @@ class URLExtractor:
         self.logger.info(f"Starting recursive URL extraction from: {base_url}")
         
         try:
-            parsed_base = urlparse(base_url)
-            base_domain = parsed_base.netloc
+            base_domain = urlparse(base_url).netloc
             visited = set()
-            to_visit = [(base_url, 0)]  # (url, depth)
-
-            while to_visit:
-                current_url, depth = to_visit.pop(0)
-                
-                if current_url in visited or depth > max_depth:
-                    continue
-                
-                try:
-                    self.logger.debug(f"Waiting 1 sec. before processing {current_url}")
-                    time.sleep(1)
-                    self.driver.get(current_url)
-                    WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.TAG_NAME, 'body'))
-                    )
-                    visited.add(current_url)
-                    self.logger.info(f"Processing depth {depth}: {current_url}")
-
-                    # Extract links from current page
-                    links = self.driver.find_elements(By.TAG_NAME, 'a')
-                    new_urls = set()
-
-                    for link in links:
-                        href = link.get_attribute('href')
-                        if not href:
-                            continue
-                            
-                        full_url = urljoin(current_url, href)
-                        parsed_url = urlparse(full_url)
-                        
-                        if parsed_url.netloc == base_domain:
-                            # Normalize path and handle root URL
-                            path = parsed_url.path.rstrip('/') or '/'
-                            clean_url = f"{parsed_url.scheme}://{parsed_url.netloc}{path}"
-                            if clean_url not in visited:
-                                new_urls.add(clean_url)
-
-                    # Add discovered URLs to queue
-                    for url in new_urls:
-                        if url not in [u for u, _ in to_visit]:
-                            to_visit.append((url, depth + 1))
-                            
-                    self.logger.debug(f"Found {len(new_urls)} new URLs at depth {depth}")
-
-                except Exception as e:
-                    self.logger.error(f"Failed to process {current_url}: {str(e)}")
+            frontier = CrawlFrontier()
+            self.unchanged_urls = set()
+            if checkpoint and checkpoint.extraction_done:
+                urls = checkpoint.visited_urls()
+                self.logger.info(f"URL extraction already finished, reusing {len(urls)} checkpointed URLs")
+                return urls
+
+            resumed = False
+            if checkpoint:
+                visited, to_visit = checkpoint.load_frontier()
+                frontier.add_seen(visited)
+                for url, depth in to_visit:
+                    if depth <= max_depth:
+                        frontier.push(url, depth)
+                resumed = bool(visited) or len(to_visit) > 1
+                self.logger.info(f"Resuming URL extraction with {len(visited)} visited and {len(frontier)} queued URLs")
+            else:
+                frontier.push(base_url, 0)
+
+            # A resumed run has its sitemap seeds in the checkpoint already
+            robots, lastmods = self._load_site_rules(base_url, base_domain,
+                                                     read_sitemaps=self.use_sitemaps and max_depth > 0 and not resumed)
+            allowed = robots.allowed if robots else (lambda url: True)
+            disallowed = set()
+
+            if lastmods:
+                # Sitemap URLs count as linked from the start page
+                seeds = [(url, 1) for url in lastmods if allowed(url) and frontier.push(url, 1)]
+                disallowed.update(url for url in lastmods if not allowed(url))
+                if checkpoint:
+                    checkpoint.add_to_frontier(seeds)
+                self.logger.info(f"Seeded {len(seeds)} URLs from sitemaps")
+                if self.find_unchanged:
+                    # Only spares the analysis of these pages, their links are still followed
+                    self.unchanged_urls = self._unchanged_since_last_analysis(lastmods)
+                    self.logger.info(f"{len(self.unchanged_urls)} sitemap URLs unchanged since they were last analyzed")
+
+            # Fetchers share the frontier; extraction ends when it is empty and no page is being fetched
+            condition = threading.Condition()
+            in_flight = [0]
+
+            def next_url():
+                with condition:
+                    while not frontier and in_flight[0]:
+                        condition.wait()
+                    if not frontier:
+                        return None
+                    in_flight[0] += 1
+                    return frontier.pop()
+
+            def crawl(fetch):
+                while True:
+                    item = next_url()
+                    if item is None:
+                        return
+                    current_url, depth = item
+                    try:
+                        self.logger.info(f"Processing depth {depth}: {current_url}")
+                        new_urls = self._internal_links(fetch(current_url), current_url, base_domain)
+                        with condition:
+                            disallowed.update(url for url in new_urls if not allowed(url))
+                            new_urls = [url for url in new_urls if url not in disallowed]
+                            visited.add(current_url)
+                            queued = [(url, depth + 1) for url in new_urls
+                                      if depth < max_depth and frontier.push(url, depth + 1)]
+                            if checkpoint:
+                                # Rows must exist before another fetcher can pop and mark these URLs visited
+                                checkpoint.record_visit(current_url, queued)
+                        self.logger.debug(f"Found {len(queued)} new URLs at depth {depth}")
+                    except Exception as e:
+                        self.logger.error(f"Failed to process {current_url}: {str(e)}")
+                        if checkpoint:
+                            checkpoint.record_failure(current_url)
+                    finally:
+                        with condition:
+                            in_flight[0] -= 1
+                            condition.notify_all()
+
+            workers = max(1, workers)
+            if self.discovery == "hybrid":
+                self._crawl_hybrid(crawl, workers)
+            elif workers == 1:
+                crawl(lambda url: self._fetch_links(self.driver, url))
+            else:
+                self._crawl_in_parallel(crawl, workers)
 
             self.logger.info(f"Total unique URLs found: {len(visited)}")
+            if disallowed:
+                self.logger.info(f"Skipped {len(disallowed)} URLs disallowed by robots.txt")
+            if checkpoint:
+                checkpoint.finish_extraction()
 
             for url in visited:
                 self.logger.debug(f"Found URL: {url}")
@@ -97,6 +222,160 @@ class URLExtractor:
         except Exception as e:
             self.logger.error(f"URL extraction failed: {str(e)}")
             return []
+
+    def _load_site_rules(self, base_url, base_domain, read_sitemaps):
+        """
+        Read the site's robots.txt and sitemaps
+
+        Args:
+            base_url (str): Start URL of the crawl
+            base_domain (str): Host URLs are kept on
+            read_sitemaps (bool): Whether to read the sitemap URLs
+
+        Returns:
+            tuple: (RobotsRules or None when robots.txt is ignored, dict of sitemap URL -> lastmod)
+        """
+        lastmods = {}
+        if not (self.respect_robots or read_sitemaps):
+            return None, lastmods
+        with httpx.Client(follow_redirects=True, timeout=10, headers={"User-Agent": USER_AGENT}) as client:
+            robots = fetch_robots(client, base_url, self.logger)
+            if self.respect_robots and robots.crawl_delay:
+                self.logger.info(f"Honouring robots.txt Crawl-delay of {robots.crawl_delay}s for {base_domain}")
+                self.rate_limiter.set_interval(base_domain, max(robots.crawl_delay, self.rate_limiter.interval))
+            if read_sitemaps:
+                parsed_url = urlparse(base_url)
+                sitemap_urls = robots.sitemaps or [f"{parsed_url.scheme}://{base_domain}/sitemap.xml"]
+                for loc, lastmod in iter_sitemap_urls(client, sitemap_urls, self.logger):
+                    for url in self._internal_links([loc], base_url, base_domain):
+                        lastmods.setdefault(url, lastmod)
+        return (robots if self.respect_robots else None), lastmods
+
+    def _unchanged_since_last_analysis(self, lastmods):
+        """
+        Find sitemap URLs whose lastmod is not newer than their stored analysis
+
+        Args:
+            lastmods (dict): URL -> lastmod datetime or None
+
+        Returns:
+            set: URLs that did not change since they were last analyzed
+        """
+        dated = {url: lastmod for url, lastmod in lastmods.items() if lastmod}
+        urls = list(dated)
+        unchanged = set()
+        with SessionLocal() as db:
+            for start in range(0, len(urls), 500):
+                rows = db.query(Page.page_url, Page.analyzed_at).filter(
+                    Page.page_url.in_(urls[start:start + 500]), Page.test_cases.isnot(None)
+                ).all()
+                for url, analyzed_at in rows:
+                    if analyzed_at is None:
+                        continue
+                    if analyzed_at.tzinfo is None:
+                        # Stored in local time without an offset
+                        analyzed_at = analyzed_at.replace(tzinfo=ZoneInfo("Asia/Kolkata"))
+                    if dated[url] <= analyzed_at:
+                        unchanged.add(url)
+        return unchanged
+
+    def _parallel_browsers(self, workers):
+        """Return the pool parallel fetchers lease from and whether it is private"""
+        # A shared pool needs spare sessions next to the one the generator holds
+        if self.browser_pool and self.browser_pool.size > 1:
+            return self.browser_pool, False
+        return BrowserPool(size=workers, logger=self.logger), True
+
+    def _crawl_in_parallel(self, crawl, workers):
+        """Run a crawl loop per worker thread, each on a browser leased for the whole extraction"""
+        browser_pool, private = self._parallel_browsers(workers)
+
+        def run():
+            with browser_pool.lease() as driver:
+                crawl(lambda url: self._fetch_links(driver, url))
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="url-fetcher") as executor:
+                for future in [executor.submit(run) for _ in range(workers)]:
+                    future.result()
+        finally:
+            if private:
+                browser_pool.close()
+
+    def _crawl_hybrid(self, crawl, workers):
+        """
+        Run crawl loops reading links over HTTP, loading only JS-rendered pages in a browser
+
+        Args:
+            crawl (callable): Crawl loop taking the function returning a page's hrefs
+            workers (int): Number of pages rendered in browsers at once
+        """
+        threads = max(workers, HYBRID_FETCHERS)
+        fetcher = LinkFetcher(max_connections=threads, logger=self.logger)
+        browser_pool, private = self._parallel_browsers(workers) if workers > 1 else (None, False)
+        driver_lock = threading.Lock()
+        counts = {"http": 0, "browser": 0}
+        counts_lock = threading.Lock()
+
+        def render(url):
+            if browser_pool:
+                with browser_pool.lease() as driver:
+                    return self._fetch_links(driver, url)
+            with driver_lock:
+                return self._fetch_links(self.driver, url)
+
+        def fetch(url):
+            self.rate_limiter.acquire(urlparse(url).netloc)
+            hrefs = fetcher.fetch_links(url)
+            with counts_lock:
+                counts["http" if hrefs is not None else "browser"] += 1
+            return hrefs if hrefs is not None else render(url)
+
+        try:
+            with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="url-fetcher") as executor:
+                for future in [executor.submit(crawl, fetch) for _ in range(threads)]:
+                    future.result()
+        finally:
+            fetcher.close()
+            if private:
+                browser_pool.close()
+        self.logger.info(f"Read links of {counts['http']} pages over HTTP, rendered {counts['browser']} pages in the browser")
+
+    def _fetch_links(self, driver, url):
+        """
+        Load a page politely and read its anchors
+
+        Args:
+            driver: WebDriver to load the page in
+            url (str): Page URL
+
+        Returns:
+            list: href values of the page's anchors
+        """
+        self.rate_limiter.acquire(urlparse(url).netloc)
+        driver.get(url)
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.TAG_NAME, 'body'))
+        )
+        return driver.execute_script(ANCHOR_HREFS_SCRIPT) or []
+
+    def _internal_links(self, hrefs, page_url, base_domain):
+        """
+        Normalize the same-domain links of a page
+
+        Returns:
+            list: Unique normalized URLs in page order
+        """
+        urls = []
+        for href in hrefs:
+            if not href:
+                continue
+            parsed_url = urlparse(urljoin(page_url, href))
+            if parsed_url.netloc == base_domain:
+                # Normalize path and handle root URL
+                path = parsed_url.path.rstrip('/') or '/'
+                urls.append(f"{parsed_url.scheme}://{parsed_url.netloc}{path}")
+        return list(dict.fromkeys(urls))
     
     def extract_links_from_page(self, url):
         """
@@ -0,0 +1,120 @@
+"""
+Verdict module for classifying test script output without the LLM
+"""
+import re
+import threading
+
+from ..db.database import SessionLocal
+from ..tables.test_verdict import TestVerdict
+from ..utils.hashing import sha256_text
+
+# Line generated scripts print as their last output, see result_protocol in prompts4.yaml
+VERDICT_PATTERN = re.compile(r"^[^\n]*?(?<!\S)AUTOTEST_RESULT:[ \t]*(PASS|FAIL)\b", re.MULTILINE | re.IGNORECASE)
+
+_UNITTEST_FAILED = re.compile(r"^FAILED \((?:failures|errors)=\d+", re.MULTILINE)
+_UNITTEST_OK = re.compile(r"^Ran [1-9]\d* tests? in [\d.]+s\s*\n+OK\b", re.MULTILINE)
+_PYTEST_SUMMARY = re.compile(r"^=+ (.*\b(?:passed|failed|error|errors)\b.*) in [\d.]+s", re.MULTILINE)
+
+# Run-specific fragments removed before hashing, so identical results of repeated runs share a verdict
+_VOLATILE = [
+    (re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<time>"),
+    (re.compile(r"\b\d{2}:\d{2}:\d{2}(?:[.,]\d+)?\b"), "<time>"),
+    (re.compile(r"\bin \d+(?:\.\d+)?s\b"), "in <duration>"),
+    (re.compile(r"0x[0-9a-fA-F]+"), "<address>"),
+    (re.compile(r"/tmp[^\s'\"]*|[A-Za-z]:\\[^\s'\"]*\\Temp\\[^\s'\"]*"), "<tmpfile>"),
+    (re.compile(r"\b[0-9a-f]{32}\b"), "<session>"),
+]
+
+
+def classify_output(output, return_code):
+    """
+    Decide a test verdict from the script output and exit code
+
+    An AUTOTEST_RESULT line decides (the last one wins) unless it contradicts a
+    failing exit code; otherwise unittest/pytest summaries and a non-zero exit code
+    are used. Output of scripts that exit with 0 without any of these is ambiguous.
+
+    Args:
+        output (str): Combined stdout and stderr of the script
+        return_code (int): Exit code of the script
+
+    Returns:
+        tuple: (passed, reason) where passed is True, False or None when ambiguous
+    """
+    verdicts = VERDICT_PATTERN.findall(output or "")
+    if verdicts:
+        verdict = verdicts[-1].upper()
+        if verdict == "FAIL":
+            return False, "AUTOTEST_RESULT: FAIL"
+        if return_code == 0:
+            return True, "AUTOTEST_RESULT: PASS"
+        return None, f"AUTOTEST_RESULT: PASS but exit code {return_code}"
+
+    if _UNITTEST_FAILED.search(output or ""):
+        return False, "unittest reported failures"
+    pytest_summary = _PYTEST_SUMMARY.findall(output or "")
+    if pytest_summary and re.search(r"\b(?:failed|errors?)\b", pytest_summary[-1]):
+        return False, "pytest reported failures"
+
+    if return_code != 0:
+        return False, f"exit code {return_code}"
+
+    if _UNITTEST_OK.search(output or ""):
+        return True, "unittest reported OK"
+    if pytest_summary and "passed" in pytest_summary[-1]:
+        return True, "pytest reported passes"
+    return None, "no verdict line or test summary"
+
+
+def output_fingerprint(output, return_code):
+    """
+    Hash script output with timestamps, durations, addresses and temp paths masked
+
+    Args:
+        output (str): Combined stdout and stderr of the script
+        return_code (int): Exit code of the script
+
+    Returns:
+        str: Hex encoded hash used as the verdict cache key
+    """
+    normalized = output or ""
+    for pattern, replacement in _VOLATILE:
+        normalized = pattern.sub(replacement, normalized)
+    return sha256_text(f"{return_code}\n{normalized.strip()}")
+
+
+class VerdictCache:
+    """Stores LLM verdicts of ambiguous script output by output fingerprint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def get(self, output_hash):
+        """
+        Get a stored verdict
+
+        Args:
+            output_hash (str): Fingerprint returned by output_fingerprint
+
+        Returns:
+            bool: Stored verdict, or None if the output was not analyzed before
+        """
+        with SessionLocal() as db:
+            row = db.query(TestVerdict).filter(TestVerdict.output_hash == output_hash).first()
+            return row.passed if row else None
+
+    def set(self, output_hash, passed):
+        """
+        Store a verdict
+
+        Args:
+            output_hash (str): Fingerprint returned by output_fingerprint
+            passed (bool): Verdict of the output
+        """
+        with self._lock, SessionLocal() as db:
+            row = db.query(TestVerdict).filter(TestVerdict.output_hash == output_hash).first()
+            if not row:
+                row = TestVerdict(output_hash=output_hash)
+                db.add(row)
+            row.passed = passed
+            db.commit()
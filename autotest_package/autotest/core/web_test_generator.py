@@ -7,37 +7,47 @@ import json
 import re
 import subprocess
 import tempfile
-import tldextract
+import copy
 import time
+import threading
+import uuid
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import (TimeoutException,
                                       NoSuchElementException,
                                       ElementClickInterceptedException)
-from webdriver_manager.chrome import ChromeDriverManager
-import base64
-from io import BytesIO
-from PIL import Image
 from datetime import datetime
-from jsonschema import validate, ValidationError
 
 from .llm_wrapper import LLMWrapper
 from .prompt_manager import PromptManager
 from .url_extractor import URLExtractor
+from .rate_limiter import estimate_tokens
+from .dom_scripts import STATIC_METADATA_SCRIPT, DOM_FINGERPRINT_SCRIPT, LOGIN_FORM_SCRIPT
+from .browser import create_chrome_driver
+from .worker_pool import URLWorkerPool
+from .script_runner import run_script_process
+from .script_harness import ScriptHarness
+from .session_store import SessionStore, capture_session_state, apply_session_state
+from .auth_cache import AuthFormCache, observe_login_signal, evaluate_login_signal
+from .crawl_checkpoint import CrawlCheckpoint
+from .change_detector import PageChangeDetector, NOT_MODIFIED
+from .verdict import VerdictCache, classify_output, output_fingerprint
+from .selection_policy import SelectionPolicy
+from .html_minimizer import minimize_html, lxml_available
+from .page_chunker import split_into_regions, merge_page_analyses
 from ..utils.logging_utils import setup_logger
+from ..utils.hashing import canonical_json_hash
 
 from ..db.database import init_db, SessionLocal
 from sqlalchemy import func
-from ..tables.page import Page
+from ..tables.page import Page, get_local_time
 from ..tables.test_case_data import TestCase
 from ..tables.domain import Domain
-
-from bs4 import BeautifulSoup, Comment
+from ..tables.redirect import Redirect  # target of Page.redirect, needed to configure the mappers
 import sys
 
 # Load environment variables
@@ -100,7 +110,12 @@ class WebTestGenerator:
     """Main class for automated web test generation"""
     
     def __init__(self, log_level="INFO", selenium_version="4.15.2", 
-                 wait_time="", testing_tool="selenium", language="python", llm_provider_choice=1):
+                 wait_time="", testing_tool="selenium", language="python", llm_provider_choice=1,
+                 use_llm_cache=True, batch_scripts=False, script_workers=1,
+                 script_cpu_limit=None, script_memory_limit=None, interactive=True, selection_policy=None,
+                 analysis_chunk_tokens=None, browser_pool=None, execution_mode="subprocess", reuse_sessions=True,
+                 crawl_rate=1.0, discovery="hybrid", use_sitemaps=True, respect_robots=True,
+                 incremental=False):
         """
         Initialize WebTestGenerator
         
@@ -111,6 +126,23 @@ class WebTestGenerator:
             testing_tool (str): Testing framework to use
             language (str): Programming language for test scripts
             llm_provider_choice (int): LLM provider choice (1=OpenAI, 2=Groq, 3=Google-Gemini, 4=Anthropic, 5=Ollama)
+            use_llm_cache (bool): Whether to reuse persisted LLM responses for identical requests
+            batch_scripts (bool): Whether to pack several test cases of a page into one script generation request
+            script_workers (int): Number of generated test scripts executed in parallel
+            script_cpu_limit (int): CPU time limit in seconds for each test script process
+            script_memory_limit (int): Memory limit in MB for each test script process and its browsers
+            interactive (bool): Whether to prompt the user; batch runs answer prompts from the selection policy
+            selection_policy (SelectionPolicy): Policy selecting URLs and test cases when not interactive
+            analysis_chunk_tokens (int): Page HTML tokens above which pages are analyzed region by region (0 disables, None uses llm_config.yaml)
+            browser_pool (BrowserPool): Pool of warm browsers used for analysis, URL extraction and URL workers
+            execution_mode (str): 'subprocess' runs each test script in a new interpreter, 'in-process' runs it on a pooled browser
+            reuse_sessions (bool): Whether to store the login session per host and reuse it for later pages and test scripts
+            crawl_rate (float): Page loads per second and host allowed during recursive URL extraction
+            discovery (str): 'hybrid' reads page links over HTTP and renders only JS-driven pages, 'browser' renders every page
+            use_sitemaps (bool): Whether recursive URL extraction is seeded with the site's sitemap URLs
+            respect_robots (bool): Whether recursive URL extraction skips URLs disallowed by robots.txt and honours its Crawl-delay
+            incremental (bool): Whether pages the server reports unchanged (conditional requests) run their stored scripts
+                without being loaded and analyzed again
         """ 
         self.log_level = log_level.upper()
         self.selenium_version = selenium_version
@@ -131,7 +163,7 @@ class WebTestGenerator:
         self.language = language.lower()
         
         # Initialize components with provider choice
-        self.llm = LLMWrapper(llm_provider_choice=llm_provider_choice)
+        self.llm = LLMWrapper(llm_provider_choice=llm_provider_choice, use_cache=use_llm_cache)
         self.prompt_manager = PromptManager()
         self.driver = None
         self.visited_pages = set()
@@ -139,11 +171,34 @@ class WebTestGenerator:
         self.logger = setup_logger("WebTestGenerator", log_level)
         self.temperature = 0.3
         self.auth_data = {}
+        self.batch_scripts = batch_scripts
+        self.interactive = interactive
+        self.selection_policy = selection_policy or SelectionPolicy()
+        self.analysis_chunk_tokens = analysis_chunk_tokens
+        self.script_workers = max(1, script_workers)
+        self.script_cpu_limit = script_cpu_limit
+        self.script_memory_limit = script_memory_limit
+        if execution_mode not in ("subprocess", "in-process"):
+            raise ValueError(f"Unknown execution mode '{execution_mode}', use 'subprocess' or 'in-process'")
+        self.execution_mode = execution_mode
+        self._script_harness = None
+        self._script_harness_lock = threading.Lock()
+        self.session_store = SessionStore(self.logger) if reuse_sessions else None
+        self.auth_form_cache = AuthFormCache(self.logger)
+        self.verdict_cache = VerdictCache()
+        self.script_session_state = None  # Session loaded into the test scripts of the current page
+        self._session_key = None  # (host, username) whose stored session is loaded in self.driver
+        self.crawl_checkpoint = None  # Progress of the current recursive run, shared with URL workers
+        self.change_detector = PageChangeDetector(logger=self.logger) if incremental else None
         #self.extract_test_relevant_html()
         
         # Setup browser and URL extractor
+        self.browser_pool = browser_pool
+        self._pooled_browser = None
         self.setup_browser()
-        self.url_extractor = URLExtractor(self.driver, self.logger)
+        self.url_extractor = URLExtractor(self.driver, self.logger, browser_pool=browser_pool, requests_per_second=crawl_rate,
+                                          discovery=discovery, use_sitemaps=use_sitemaps, respect_robots=respect_robots,
+                                          find_unchanged=incremental)
 
         self._generation_interrupted = False
 
@@ -151,19 +206,80 @@ class WebTestGenerator:
         init_db()  # Create tables if they don’t exist 
 
     def setup_browser(self):
-        """Setup Chrome browser with headless configuration"""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        service = Service()
-        # service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        """Setup Chrome browser with headless configuration, leased from the browser pool if one is configured"""
+        if self.browser_pool:
+            self._pooled_browser = self.browser_pool.acquire()
+            self.driver = self._pooled_browser.driver
+        else:
+            self.driver = create_chrome_driver()
+
+    def spawn_worker(self, driver):
+        """
+        Create a non-interactive copy of this generator driving another browser
+
+        The copy shares the LLM wrapper and prompt manager but keeps its own driver,
+        results and visited pages, so it can process a URL on a worker thread.
+
+        Args:
+            driver (WebDriver): Browser the worker drives, owned by the caller
+
+        Returns:
+            WebTestGenerator: Worker generator instance
+        """
+        if self.execution_mode == "in-process":
+            # Create the harness up front so all workers share it
+            self._get_script_harness()
+        worker = copy.copy(self)
+        worker.driver = driver
+        worker._pooled_browser = None
+        worker.url_extractor = URLExtractor(worker.driver, self.logger)
+        worker.visited_pages = set()
+        worker.test_results = []
+        worker.auth_data = {}
+        worker.script_session_state = None
+        worker._session_key = None
+        worker.interactive = False
+        worker._generation_interrupted = False
+        return worker
+
+    def close_browser(self):
+        """Quit the browser driven by this generator, or return it to the browser pool"""
+        if self._script_harness:
+            self._script_harness.close()
+            self._script_harness = None
+        if self._pooled_browser:
+            self.browser_pool.release(self._pooled_browser)
+            self._pooled_browser = None
+            self.driver = None
+        elif self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                self.logger.debug(f"Failed to quit browser: {str(e)}")
+            self.driver = None
+
+    def _ask_user(self, prompt, default):
+        """
+        Read a line of user input, or fall back to the default answer in non-interactive mode
+
+        Args:
+            prompt (str): Prompt shown to the user
+            default (str): Answer used when the generator is not interactive
+
+        Returns:
+            str: User answer
+        """
+        if not self.interactive:
+            self.logger.debug(f"{prompt.strip()} [non-interactive: {default}]")
+            return default
+        return input(prompt)
 
     def capture_screenshot(self):
         """Capture and return base64 encoded screenshot"""
+        import base64
+        from io import BytesIO
+        from PIL import Image
+
         screenshot = self.driver.get_screenshot_as_png()
         img = Image.open(BytesIO(screenshot))
         buffered = BytesIO()
@@ -188,7 +304,27 @@ class WebTestGenerator:
     #     return relevant_html
 
     @staticmethod
-    def extract_test_relevant_html(page_source):
+    def extract_test_relevant_html(page_source, token_budget=None, backend="lxml", logger=None):
+        """
+        Reduce page source to the markup relevant for test generation
+        
+        Args:
+            page_source (str): Raw HTML of the page
+            token_budget (int): Maximum estimated tokens of the output (lxml backend only)
+            backend (str): 'lxml' for the single-pass minimizer, 'bs4' for the html.parser minimizer
+            logger (Logger): Optional logger
+            
+        Returns:
+            str: Minimized HTML
+        """
+        if backend == "lxml" and lxml_available():
+            return minimize_html(page_source, token_budget=token_budget, logger=logger)
+        return WebTestGenerator._extract_test_relevant_html_bs4(page_source)
+
+    @staticmethod
+    def _extract_test_relevant_html_bs4(page_source):
+        from bs4 import BeautifulSoup, Comment
+
         soup = BeautifulSoup(page_source, "html.parser")
 
         # Remove non-interactive and unnecessary tags
@@ -280,13 +416,31 @@ class WebTestGenerator:
         
         return cleaned_html
         
-    def analyze_page(self, regenerate, first_time, context="current", require_login=False, username=None, password=None):
+    def _get_html_token_budget(self):
+        """Get the token budget of minimized page sources, capped at half the model's context window"""
+        minimizer_config = self.llm.config.get("html_minimizer") or {}
+        token_budget = minimizer_config.get("token_budget")
+        context_budget = self.llm.get_context_limits()["context_window"] // 2
+        return min(token_budget, context_budget) if token_budget else context_budget
+
+    def _minimize_page_source(self, page_source):
+        """Minimize a page source with the configured backend and token budget"""
+        minimizer_config = self.llm.config.get("html_minimizer") or {}
+        return self.extract_test_relevant_html(
+            page_source,
+            token_budget=self._get_html_token_budget(),
+            backend=minimizer_config.get("backend", "lxml"),
+            logger=self.logger
+        )
+
+    def analyze_page(self, regenerate, first_time, context="current", require_login=False, username=None, password=None, dom_fingerprint=None):
         """
         Analyze current page and generate metadata
         
         Args:
             regenerate (bool): Whether to regenerate the test data
             context (str): Context description for logging
+            dom_fingerprint (str): Structural fingerprint of the page, computed if not given
             
         Returns:
             dict: Page analysis results with metadata, test cases, and scripts
@@ -299,16 +453,14 @@ class WebTestGenerator:
             static_metadata = {
                 "title": self.driver.title,
                 "url": self.driver.current_url,
-                "forms": self.extract_forms(),
-                "buttons": self.extract_interactive_elements(),
-                "tables": self.extract_data_tables(),
-                "key_flows": self.identify_key_flows()
+                **self.extract_static_metadata()
             }
             
             self.logger.debug(f"Static page metadata: {static_metadata}")
             
             # LLM-powered dynamic analysis
-            minimized_html = self.extract_test_relevant_html(page_source)
+            minimized_html = self._minimize_page_source(page_source)
+            self.logger.debug(f"Minimized page source from {len(page_source)} to {len(minimized_html)} characters")
             #minimized_html = page_source
             llm_metadata = self.llm_page_analysis(minimized_html)
             self.logger.debug(f"LLM extracted page metadata: {llm_metadata}")
@@ -320,6 +472,7 @@ class WebTestGenerator:
             
             # Generate test cases and scripts
             test_cases = self.generate_page_specific_tests(page_metadata, minimized_html)
+            import tldextract  # loads its suffix list on import, only needed when storing a page
             extracted = tldextract.extract(context)
             domain_name = f"{extracted.domain}.{extracted.suffix}"
             with SessionLocal() as db:
@@ -344,8 +497,10 @@ class WebTestGenerator:
                 page.page_title = self.driver.title   
                 page.page_source = minimized_html
                 page.page_metadata = page_metadata
+                page.dom_fingerprint = dom_fingerprint or self.compute_dom_fingerprint()
                 page.test_cases = test_cases
                 page.test_cases_count = len(test_cases)
+                page.analyzed_at = get_local_time()
                 
                 db.commit()
                 db.refresh(page)
@@ -368,7 +523,7 @@ class WebTestGenerator:
 
                 while True:
                     try:
-                        user_input = input("\nDo you want to add manual test cases? (y/n): ").strip().lower()
+                        user_input = self._ask_user("\nDo you want to add manual test cases? (y/n): ", "n").strip().lower()
                         self.logger.debug("Do you want to add manual test cases? (y/n): ")
                         self.logger.debug(f"User entered: {user_input}")
                         
@@ -481,7 +636,10 @@ class WebTestGenerator:
 
         while True:
             try:
-                user_input = input("Enter test case number(s), 'all', 'list' to show cases, 'delete' to remove a case, 'edit' to edit a case, or 'quit' to stop: ").strip()
+                user_input = self._ask_user(
+                    "Enter test case number(s), 'all', 'list' to show cases, 'delete' to remove a case, 'edit' to edit a case, or 'quit' to stop: ",
+                    SelectionPolicy.as_answer(self.selection_policy.select_test_cases(test_cases))
+                ).strip()
                 self.logger.debug("Enter test case number(s), 'all', 'list' to show cases, 'delete' to remove a case, 'edit' to edit a case, or 'quit' to stop: ")
                 self.logger.debug(f"User entered: {user_input}")
 
@@ -547,12 +705,13 @@ class WebTestGenerator:
                         continue
 
                 # Process each selected test case
+                pending_test_cases = []  # Test cases whose scripts need to be generated
                 for test_case_num in test_case_numbers:
                     selected_test_case = test_cases[test_case_num - 1]
                     
                     with SessionLocal() as db:
                         test_case = db.query(TestCase).filter(
-                            (TestCase.page_url == self.driver.current_url) & (TestCase.test_case_data == selected_test_case)
+                            (TestCase.page_url == self.driver.current_url) & (TestCase.test_case_hash == canonical_json_hash(selected_test_case))
                         ).first()
                         if test_case and not regenerate:
                             self.logger.debug(f"Test script already exists for test case {test_case_num}: '{selected_test_case.get('name', 'Unnamed Test Case')}' at {test_case.script_path}")
@@ -571,7 +730,7 @@ class WebTestGenerator:
                             else:
                                 # Single test case - ask user for regeneration
                                 while True:
-                                    regen_input = input("Do you want to regenerate the script for the selected test case? (y/n): ").strip()
+                                    regen_input = self._ask_user("Do you want to regenerate the script for the selected test case? (y/n): ", "n").strip()
                                     self.logger.debug("Do you want to regenerate the script for the selected test case? (y/n): ")
                                     self.logger.debug(f"User entered: {regen_input}")
                                     
@@ -608,36 +767,42 @@ class WebTestGenerator:
                                         self.logger.debug("Invalid input. Please enter 'y' or 'n'")
                                         continue
                         if not test_case or regenerate:
-                            if selected_test_case in selected_test_cases:
-                                self.logger.debug(f"Test script stored: {test_case.script_path}")
-                                self.logger.debug(f"✓ Script fetched successfully for test case {test_case_num} from the database")
-                            # Generate new script
+                            if selected_test_case in selected_test_cases or any(selected_test_case == pending for _, pending in pending_test_cases):
+                                self.logger.debug(f"✓ Script already available for test case {test_case_num}")
+                            # Queue new script for generation
                             else:
-                                self.logger.debug(f"Generating script for test case {test_case_num}: {selected_test_case.get('name', 'Unnamed Test Case')}")
-                                self.logger.debug("Please wait...")
-                                script, filename, script_path = self.generate_script_for_test_case(selected_test_case, page_metadata, minimized_html, require_login, username, password)
+                                self.logger.debug(f"Queueing script generation for test case {test_case_num}: {selected_test_case.get('name', 'Unnamed Test Case')}")
+                                pending_test_cases.append((test_case_num, selected_test_case))
+
+                # Generate all queued scripts in parallel, then store them in selection order
+                if pending_test_cases:
+                    self.logger.debug("Please wait...")
+                    generated = self.generate_scripts_for_test_cases(
+                        [pending for _, pending in pending_test_cases], page_metadata, minimized_html, require_login, username, password
+                    )
+                    with SessionLocal() as db:
+                        for (test_case_num, selected_test_case), (script, filename, script_path) in zip(pending_test_cases, generated):
+                            if script:
+                                test_case = TestCase(
+                                    page_url=self.driver.current_url,
+                                    test_case_title=selected_test_case.get('name', 'Unnamed Test Case'),
+                                    test_case_type=selected_test_case.get('type', 'N/A'),
+                                    test_case_data=selected_test_case,
+                                    test_script=script,
+                                    script_path=script_path
+                                )
                                 
-                                if script:
-                                    test_case = TestCase(
-                                        page_url=self.driver.current_url,
-                                        test_case_title=selected_test_case.get('name', 'Unnamed Test Case'),
-                                        test_case_type=selected_test_case.get('type', 'N/A'),
-                                        test_case_data=selected_test_case,
-                                        test_script=script,
-                                        script_path=script_path
-                                    )
-                                    
-                                    db.add(test_case)
-                                    db.commit()
-                                    db.refresh(test_case)
-                                    scripts.append({'script': script, 'filename': filename})
-                                    selected_test_cases.append(selected_test_case)
-                                    self.logger.debug(f"✓ Script generated successfully for test case {test_case_num}")
-                                else:
-                                    self.logger.debug(f"✗ Failed to generate script for test case {test_case_num}")
+                                db.add(test_case)
+                                db.commit()
+                                db.refresh(test_case)
+                                scripts.append({'script': script, 'filename': filename})
+                                selected_test_cases.append(selected_test_case)
+                                self.logger.debug(f"✓ Script generated successfully for test case {test_case_num}")
+                            else:
+                                self.logger.debug(f"✗ Failed to generate script for test case {test_case_num}")
 
                 # If processing multiple test cases, break the main loop after processing
-                if len(test_case_numbers) == len(test_cases):
+                if len(test_case_numbers) == len(test_cases) or not self.interactive:
                     break
 
             except KeyboardInterrupt:
@@ -647,6 +812,8 @@ class WebTestGenerator:
                 break
             except Exception as e:
                 self.logger.error(f"Error during script generation: {str(e)}")
+                if not self.interactive:
+                    break
                 continue
 
         return scripts, selected_test_cases
@@ -692,7 +859,7 @@ class WebTestGenerator:
                     # Find and delete matching TestCase record(s) for this page and test case data
                     test_case_db = db.query(TestCase).filter(
                         (TestCase.page_url == self.driver.current_url) &
-                        (TestCase.test_case_data == deleted_case)
+                        (TestCase.test_case_hash == canonical_json_hash(deleted_case))
                     ).first()
 
                     self.logger.debug(f"TestCase table url: {TestCase.page_url}")
@@ -780,7 +947,7 @@ class WebTestGenerator:
                         page_url_to_use = self.driver.current_url
 
                     test_case_db = db.query(TestCase).filter(
-                        (TestCase.page_url == page_url_to_use) & (TestCase.test_case_data == selected_test_case)
+                        (TestCase.page_url == page_url_to_use) & (TestCase.test_case_hash == canonical_json_hash(selected_test_case))
                     ).first()
 
                     script_exists = test_case_db is not None and test_case_db.test_script
@@ -862,6 +1029,11 @@ class WebTestGenerator:
             self.logger.debug(f"Test Data: {test_data}")
             self.logger.debug("Sending request to LLM for page metadata extraction...")
             user_prompt_template = self.prompt_manager.get_prompt("llm_page_analysis", "user")
+
+            chunk_tokens = self._get_analysis_chunk_tokens(system_prompt, user_prompt_template)
+            if chunk_tokens and estimate_tokens(minimized_html) > chunk_tokens:
+                return self._llm_page_analysis_chunked(minimized_html, system_prompt, user_prompt_template, chunk_tokens)
+
             user_prompt = user_prompt_template.format(page_source=minimized_html)
             # self.logger.debug(f"LLM analysis user prompt: {user_prompt}")
             
@@ -871,15 +1043,7 @@ class WebTestGenerator:
             # self.logger.debug(f"Raw LLM response: {result}")
             
             try:
-                # Parse JSON response
-                json_str = result
-                if "```json" in result:
-                    json_str = result.split("```json")[1].split("```")[0].strip()
-                elif "```" in result:
-                    json_str = result.split("```")[1].strip()
-
-                # self.logger.debug(f"Sanitized LLM response: {json_str}")
-                return json.loads(json_str)
+                return self._parse_analysis_response(result)
             
             except json.JSONDecodeError as e:
                 self.logger.error(f"Failed to parse LLM response: {str(e)}")
@@ -889,6 +1053,94 @@ class WebTestGenerator:
             self.logger.error(f"LLM page analysis failed: {str(e)}")
             return {}
 
+    def _parse_analysis_response(self, result):
+        """Parse the JSON object of an analysis response, stripping markdown code fences"""
+        json_str = result
+        if "```json" in result:
+            json_str = result.split("```json")[1].split("```")[0].strip()
+        elif "```" in result:
+            json_str = result.split("```")[1].strip()
+
+        # self.logger.debug(f"Sanitized LLM response: {json_str}")
+        return json.loads(json_str)
+
+    def _get_analysis_chunk_tokens(self, system_prompt, user_prompt_template):
+        """
+        Get the page HTML budget of one analysis request, or None if chunking is disabled
+        
+        Returns:
+            int: Maximum estimated tokens of page HTML per request
+        """
+        settings = self.llm.config.get("page_analysis") or {}
+        chunk_tokens = self.analysis_chunk_tokens
+        if chunk_tokens is None:
+            chunk_tokens = settings.get("chunk_tokens", 12000) if settings.get("chunked", True) else 0
+        if not chunk_tokens:
+            return None
+
+        # Never let one region request exceed the model's context window
+        limits = self.llm.get_context_limits()
+        prompt_tokens = estimate_tokens(system_prompt, user_prompt_template)
+        context_budget = limits["context_window"] - limits["max_output_tokens"] - prompt_tokens
+        return max(1, min(chunk_tokens, context_budget))
+
+    def _llm_page_analysis_chunked(self, minimized_html, system_prompt, user_prompt_template, chunk_tokens):
+        """
+        Analyze page regions concurrently and merge them into one page_metadata dict
+        
+        Args:
+            minimized_html (str): Minimized page HTML
+            system_prompt (str): llm_page_analysis system prompt
+            user_prompt_template (str): llm_page_analysis user prompt template
+            chunk_tokens (int): Maximum estimated tokens of page HTML per request
+            
+        Returns:
+            dict: Merged LLM analysis results
+        """
+        regions = split_into_regions(minimized_html, chunk_tokens)
+        self.logger.debug(f"Analyzing page in {len(regions)} regions: {', '.join(label for label, _ in regions)}")
+
+        prompts = [(system_prompt, user_prompt_template.format(page_source=html)) for _, html in regions]
+        results = self.llm.generate_many(prompts, model_type="analysis")
+
+        partials = []
+        for (label, _), result in zip(regions, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"LLM analysis of region '{label}' failed: {str(result)}")
+                continue
+            try:
+                partials.append(self._parse_analysis_response(result))
+            except json.JSONDecodeError as e:
+                self.logger.error(f"Failed to parse LLM response for region '{label}': {str(e)}")
+
+        self.logger.debug(f"LLM extraction of page metadata completed for {len(partials)}/{len(regions)} regions")
+        return merge_page_analyses(partials)
+
+    def extract_static_metadata(self):
+        """
+        Extract forms, interactive elements, tables and key flows from current page
+        
+        The DOM is walked inside the browser by a single execute_script call instead
+        of one WebDriver round trip per element and attribute. Falls back to the
+        per-element extractors if the script fails.
+        
+        Returns:
+            dict: 'forms', 'buttons', 'tables' and 'key_flows' metadata
+        """
+        try:
+            static_metadata = self.driver.execute_script(STATIC_METADATA_SCRIPT)
+            if static_metadata:
+                return static_metadata
+        except Exception as e:
+            self.logger.warning(f"In-browser metadata extraction failed: {str(e)}, falling back to element lookups")
+
+        return {
+            "forms": self.extract_forms(),
+            "buttons": self.extract_interactive_elements(),
+            "tables": self.extract_data_tables(),
+            "key_flows": self.identify_key_flows()
+        }
+
     def extract_forms(self):
         """Extract form information from current page"""
         forms = []
@@ -1011,7 +1263,8 @@ class WebTestGenerator:
             user_prompt = user_prompt_template.format(
                 page_metadata=json.dumps(page_metadata, indent=2),
                 prompt_suffix=prompt_suffix_new,
-                title=self.driver.title,
+                # Stored metadata may be for a page the browser isn't on (pipeline workers)
+                title=page_metadata.get('title') or self.driver.title,
                 forms=json.dumps(page_metadata['forms']),
                 buttons=json.dumps(page_metadata['buttons']),
                 interactive_elements=json.dumps(page_metadata.get('interactive_elements', [])),
@@ -1046,7 +1299,7 @@ class WebTestGenerator:
                 # Ask user if they want to add manual test cases
                 while True:
                     try:
-                        user_input = input("\nDo you want to add manual test cases? (y/n): ").strip().lower()
+                        user_input = self._ask_user("\nDo you want to add manual test cases? (y/n): ", "n").strip().lower()
                         self.logger.debug("Do you want to add manual test cases? (y/n): ")
                         self.logger.debug(f"User entered: {user_input}")
                         
@@ -1297,98 +1550,253 @@ class WebTestGenerator:
             minimized_html (str): HTML source of the page
             
         Returns:
-            tuple: (script_content, filename) - Generated test script code and saved filename
+            tuple: (script_content, filename, script_path) - Generated test script code, saved filename and path
         """
-        captcha_wait_time = self.wait_time or "2 minutes (120 seconds)"
-        
         try:
-            system_prompt_template = self.prompt_manager.get_prompt(
-                "generate_script", "system", tool=self.testing_tool)
-            system_prompt = system_prompt_template.format(
-                selenium_version=self.selenium_version, 
-                language=self.language
-            )
-            #self.logger.debug(f"system prompt for script generation: {system_prompt}")
-            user_prompt_template = self.prompt_manager.get_prompt(
-                "generate_script", "user", tool=self.testing_tool)
-            
-            if require_login and username and password:
-                login_instructions = "yes"
-            else:
-                login_instructions = "no"
-
-            user_prompt = user_prompt_template.format(
-                language=self.language,
-                selenium_version=self.selenium_version,
-                test_case=json.dumps(test_case, indent=2),
-                page_metadata=json.dumps(page_metadata, indent=2),
-                page_source=minimized_html,
-                captcha_wait_time=captcha_wait_time,
-                login_instructions=login_instructions,
-                username=username,
-                password=password,
-                auth_data=self.auth_data,
-                security_indicators=page_metadata.get('security_indicators', [])
-            )
-            
+            system_prompt, user_prompt = self._build_script_prompts(test_case, page_metadata, minimized_html, require_login, username, password)
             script_content = self.llm.generate(system_prompt, user_prompt, model_type="selenium")
             # self.logger.debug(f"Raw LLM response generated code: {script_content}")
+            return self._save_generated_script(script_content, test_case)
+            
+        except Exception as e:
+            self.logger.error(f"Script generation failed: {str(e)}")
+            return "", None, None
+
+    def generate_scripts_for_test_cases(self, test_cases, page_metadata, minimized_html, require_login, username, password):
+        """
+        Generate test scripts for several test cases concurrently
+        
+        Requests fan out through the LLM wrapper's bounded, rate limited async engine.
+        With batch_scripts enabled, test cases are packed into shared-context batch requests.
+        
+        Args:
+            test_cases (list): Test case specifications
+            page_metadata (dict): Page metadata
+            minimized_html (str): HTML source of the page
             
-            # Extract code from markdown blocks
-            #code = self._extract_code_from_response(script_content)
-
-            if "```python" in script_content:
-                code = script_content.split("```python")[1].split("```")[0].strip()
-            elif "```java" in script_content:
-                code = script_content.split("```java")[1].split("```")[0].strip()
-            elif "```" in script_content:
-                code = script_content.split("```")[1].strip()
+        Returns:
+            list: (script_content, filename, script_path) tuples in the same order as test_cases
+        """
+        if self.batch_scripts and len(test_cases) > 1:
+            return self._generate_scripts_batched(test_cases, page_metadata, minimized_html, require_login, username, password)
+        return self._generate_scripts_individually(test_cases, page_metadata, minimized_html, require_login, username, password)
+
+    def _generate_scripts_individually(self, test_cases, page_metadata, minimized_html, require_login, username, password):
+        """Generate one script per LLM request, running the requests concurrently"""
+        prompts = [
+            self._build_script_prompts(test_case, page_metadata, minimized_html, require_login, username, password)
+            for test_case in test_cases
+        ]
+        self.logger.debug(f"Generating {len(prompts)} scripts concurrently...")
+        responses = self.llm.generate_many(prompts, model_type="selenium")
+
+        results = []
+        for test_case, response in zip(test_cases, responses):
+            if isinstance(response, Exception):
+                self.logger.error(f"Script generation failed for '{test_case.get('name', 'Unnamed Test Case')}': {str(response)}")
+                results.append(("", None, None))
+                continue
+            try:
+                results.append(self._save_generated_script(response, test_case))
+            except Exception as e:
+                self.logger.error(f"Script generation failed: {str(e)}")
+                results.append(("", None, None))
+        return results
+
+    def _generate_scripts_batched(self, test_cases, page_metadata, minimized_html, require_login, username, password):
+        """
+        Generate scripts with several test cases per LLM request sharing one page context
+        
+        Test cases whose script cannot be recovered from a batch response fall back
+        to single-case requests.
+        """
+        batches = self._plan_script_batches(test_cases, page_metadata, minimized_html, require_login, username, password)
+        self.logger.debug(f"Generating {len(test_cases)} scripts in {len(batches)} batch request(s)...")
+
+        prompts = [
+            self._build_batch_script_prompts(batch, page_metadata, minimized_html, require_login, username, password)
+            for batch in batches
+        ]
+        responses = self.llm.generate_many(prompts, model_type="selenium")
+
+        results = [None] * len(test_cases)
+        offset = 0
+        for batch, response in zip(batches, responses):
+            if isinstance(response, Exception):
+                self.logger.error(f"Batch script generation failed: {str(response)}")
+                parts = [None] * len(batch)
             else:
-                code = script_content.strip()
+                parts = self._split_batched_response(response, len(batch))
 
-            filename = None
+            for position, (test_case, part) in enumerate(zip(batch, parts)):
+                if not part:
+                    continue
+                try:
+                    results[offset + position] = self._save_generated_script(part, test_case)
+                except Exception as e:
+                    self.logger.error(f"Script generation failed: {str(e)}")
+            offset += len(batch)
+
+        missing = [i for i, result in enumerate(results) if not result or not result[0]]
+        if missing:
+            self.logger.warning(f"Could not parse {len(missing)} script(s) from batch responses, falling back to single test case requests")
+            fallback = self._generate_scripts_individually(
+                [test_cases[i] for i in missing], page_metadata, minimized_html, require_login, username, password
+            )
+            for i, result in zip(missing, fallback):
+                results[i] = result
+        return results
+
+    def _plan_script_batches(self, test_cases, page_metadata, minimized_html, require_login, username, password):
+        """
+        Split test cases into batches that fit the model's context window and output limit
+        
+        Returns:
+            list: List of test case lists
+        """
+        settings = self.llm.config.get("script_generation") or {}
+        max_batch_size = settings.get("max_batch_size", 5)
+        output_tokens = settings.get("output_tokens_per_script", 2500)
+        limits = self.llm.get_context_limits()
+
+        # Page context, metadata and instructions are paid once per batch
+        shared_tokens = estimate_tokens(*self._build_script_prompts([], page_metadata, minimized_html, require_login, username, password))
+        token_budget = limits["context_window"] - shared_tokens
+
+        batches = []
+        current = []
+        current_tokens = 0
+        for test_case in test_cases:
+            case_tokens = estimate_tokens(json.dumps(test_case, indent=2)) + output_tokens
+            if current and (
+                len(current) >= max_batch_size
+                or (len(current) + 1) * output_tokens > limits["max_output_tokens"]
+                or current_tokens + case_tokens > token_budget
+            ):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(test_case)
+            current_tokens += case_tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _build_batch_script_prompts(self, batch, page_metadata, minimized_html, require_login, username, password):
+        """Build prompts for one batch; single test case batches use the regular prompt"""
+        if len(batch) == 1:
+            return self._build_script_prompts(batch[0], page_metadata, minimized_html, require_login, username, password)
+
+        system_prompt, user_prompt = self._build_script_prompts(batch, page_metadata, minimized_html, require_login, username, password)
+        batch_suffix = self.prompt_manager.get_prompt("generate_script_batch", "user_suffix")
+        user_prompt += batch_suffix.format(count=len(batch), language=self.language)
+        return system_prompt, user_prompt
+
+    @staticmethod
+    def _split_batched_response(response, count):
+        """
+        Split a multi-script batch response into per-test-case responses
+        
+        Args:
+            response (str): Raw LLM response with '### TEST_CASE <n>' marker lines
+            count (int): Number of test cases in the batch
             
-            # Save script to file
-            # if code:
-            #     self._save_script_to_file(code, test_case, script_content)
-
-            if code:  
-                script_dir = "test_scripts"
-                if not os.path.exists(script_dir):
-                    os.makedirs(script_dir)
-                
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        Returns:
+            list: Response section (marker stripped) per test case, None where missing
+        """
+        sections = re.split(r'^[ \t]*(?:#{1,6}[ \t]*)?\**[ \t]*TEST_CASE[ \t]*#?(\d+)[ \t]*\**[ \t]*:?[ \t]*$', response, flags=re.MULTILINE)
+        parts = [None] * count
+        for number, content in zip(sections[1::2], sections[2::2]):
+            index = int(number) - 1
+            if 0 <= index < count and parts[index] is None and "```" in content:
+                parts[index] = content.strip()
+        return parts
+
+    def _build_script_prompts(self, test_case, page_metadata, minimized_html, require_login, username, password):
+        """
+        Build system and user prompts for script generation
+        
+        Returns:
+            tuple: (system_prompt, user_prompt)
+        """
+        captcha_wait_time = self.wait_time or "2 minutes (120 seconds)"
 
-                # Sanitize the test case name
-                # Replace any character that's not alphanumeric, hyphen, or underscore with underscore
-                sanitized_name = re.sub(r'[^a-zA-Z0-9\-_]', '_', test_case['name'])
-                # Optional: Remove multiple consecutive underscores
-                sanitized_name = re.sub(r'_+', '_', sanitized_name)
-                # Optional: Remove leading/trailing underscores
-                sanitized_name = sanitized_name.strip('_')
+        system_prompt_template = self.prompt_manager.get_prompt(
+            "generate_script", "system", tool=self.testing_tool)
+        system_prompt = system_prompt_template.format(
+            selenium_version=self.selenium_version, 
+            language=self.language
+        )
+        #self.logger.debug(f"system prompt for script generation: {system_prompt}")
+        user_prompt_template = self.prompt_manager.get_prompt(
+            "generate_script", "user", tool=self.testing_tool)
+        
+        if require_login and username and password:
+            login_instructions = "yes"
+        else:
+            login_instructions = "no"
+
+        user_prompt = user_prompt_template.format(
+            language=self.language,
+            selenium_version=self.selenium_version,
+            test_case=json.dumps(test_case, indent=2),
+            page_metadata=json.dumps(page_metadata, indent=2),
+            page_source=minimized_html,
+            captcha_wait_time=captcha_wait_time,
+            login_instructions=login_instructions,
+            username=username,
+            password=password,
+            auth_data=self.auth_data,
+            security_indicators=page_metadata.get('security_indicators', [])
+        )
+        if self.language == "python":
+            # Machine-readable verdict read by verdict.classify_output
+            user_prompt += self.prompt_manager.get_prompt("result_protocol", "user_suffix")
+        return system_prompt, user_prompt
+
+    def _save_generated_script(self, script_content, test_case):
+        """
+        Extract code from an LLM response and save it under test_scripts/
+        
+        Returns:
+            tuple: (script_content, filename, script_path)
+        """
+        # Extract code from markdown blocks
+        #code = self._extract_code_from_response(script_content)
 
-                if "```python" in script_content:
-                    #script_name = f"{script_dir}/test_{timestamp}_{sanitized_name}.py"
-                    filename = f"test_{timestamp}_{sanitized_name}.py"
-                else:
-                    #script_name = f"{script_dir}/test_{timestamp}_{sanitized_name}.java"
-                    filename = f"test_{timestamp}_{sanitized_name}.java"
+        if "```python" in script_content:
+            code = script_content.split("```python")[1].split("```")[0].strip()
+        elif "```java" in script_content:
+            code = script_content.split("```java")[1].split("```")[0].strip()
+        elif "```" in script_content:
+            code = script_content.split("```")[1].strip()
+        else:
+            code = script_content.strip()
 
-                script_path = f"{script_dir}/{filename}"
+        filename = None
+        script_path = None
+        
+        # Save script to file
+        # if code:
+        #     self._save_script_to_file(code, test_case, script_content)
+
+        if code:  
+            script_dir = "test_scripts"
+            if not os.path.exists(script_dir):
+                os.makedirs(script_dir, exist_ok=True)
+            
+            extension = ".py" if "```python" in script_content else ".java"
+            filename = self._script_filename(test_case, extension)
+            script_path = f"{script_dir}/{filename}"
 
-                # with open(script_name, 'w') as f:
-                #     f.write(code)
-                with open(script_path, 'w') as f:
-                    f.write(code)
+            # 'x' never overwrites: parallel workers may name scripts of same-named test cases in the same second
+            with open(script_path, 'x') as f:
+                f.write(code)
 
-                self.logger.debug(f"LLM generated test script:\n{code}")   
-                self.logger.debug(f"Saved test script: {script_path}")
-                
-            return code, filename, script_path
+            self.logger.debug(f"LLM generated test script:\n{code}")   
+            self.logger.debug(f"Saved test script: {script_path}")
             
-        except Exception as e:
-            self.logger.error(f"Script generation failed: {str(e)}")
-            return "", None
+        return code, filename, script_path
 
     def _extract_code_from_response(self, script_content):
         """Extract code from LLM response, handling markdown blocks"""
@@ -1407,20 +1815,31 @@ class WebTestGenerator:
         if not os.path.exists(script_dir):
             os.makedirs(script_dir)
             
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        sanitized_name = re.sub(r'[^a-zA-Z0-9\-_]', '_', test_case['name'])
-        sanitized_name = re.sub(r'_+', '_', sanitized_name).strip('_')
-        
-        if "```python" in script_content:
-            extension = ".py"
-        else:
-            extension = ".java"
-        script_name = f"{script_dir}/test_{timestamp}_{sanitized_name}{extension}"
+        extension = ".py" if "```python" in script_content else ".java"
+        script_name = f"{script_dir}/{self._script_filename(test_case, extension)}"
         
-        with open(script_name, 'w') as f:
+        with open(script_name, 'x') as f:
             f.write(code)
         self.logger.debug(f"Saved test script: {script_name}")
 
+    @staticmethod
+    def _script_filename(test_case, extension):
+        """
+        Build a unique file name for a generated test script
+
+        Args:
+            test_case (dict): Test case the script implements
+            extension (str): File extension including the dot
+
+        Returns:
+            str: Name with timestamp, sanitized test case name and a random suffix
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Replace any character that's not alphanumeric, hyphen, or underscore, then collapse underscores
+        sanitized_name = re.sub(r'[^a-zA-Z0-9\-_]', '_', test_case.get('name', 'test_case'))
+        sanitized_name = re.sub(r'_+', '_', sanitized_name).strip('_')
+        return f"test_{timestamp}_{sanitized_name}_{uuid.uuid4().hex[:8]}{extension}"
+
     def execute_test_cycle(self, analysis):
         """Execute test cycle for page analysis results"""
         # Check if generation was interrupted
@@ -1450,6 +1869,7 @@ class WebTestGenerator:
         #     result = self.execute_test_script(script)
         #     self._log_test_result(result, test_name, file_name)
 
+        runnable = []  # (test_name, filename, script_content) in script order
         for i, script_info in enumerate(scripts):
             script_content = script_info['script'] if isinstance(script_info, dict) else script_info
             filename = script_info.get('filename') if isinstance(script_info, dict) else None
@@ -1467,9 +1887,47 @@ class WebTestGenerator:
                 sanitized_name = sanitized_name.strip('_')
                 filename = f"test_{timestamp}_{sanitized_name}.py"
 
+            runnable.append((test_name, filename, script_content))
+
+        if self.script_workers > 1 and len(runnable) > 1:
+            self._execute_scripts_in_parallel(runnable)
+            return
+
+        for test_name, filename, script_content in runnable:
             result = self.execute_test_script(script_content)
             self._log_test_result(result, test_name, filename)
 
+    def _execute_scripts_in_parallel(self, runnable):
+        """
+        Execute test scripts concurrently, each in its own resource-limited process
+
+        Results are logged as scripts complete, then reordered so the report
+        follows the script order regardless of completion order.
+
+        Args:
+            runnable (list): (test_name, filename, script_content) tuples in script order
+        """
+        workers = min(self.script_workers, len(runnable))
+        self.logger.debug(f"Executing {len(runnable)} test scripts with {workers} parallel processes")
+        first_entry = len(self.test_results)
+        entry_order = {}
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="script-runner") as executor:
+            futures = {
+                executor.submit(self.execute_test_script, script_content): index
+                for index, (_, _, script_content) in enumerate(runnable)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                test_name, filename, _ = runnable[index]
+                entry = self._log_test_result(future.result(), test_name, filename)
+                entry_order[id(entry)] = index
+                self.logger.debug(f"✓ Finished test script {index + 1}/{len(runnable)}: {test_name}")
+
+        self.test_results[first_entry:] = sorted(
+            self.test_results[first_entry:], key=lambda entry: entry_order.get(id(entry), len(runnable))
+        )
+
     def validate_script_structure(self, script):
         """Validate basic script structure"""
         required_imports = ['from selenium import webdriver', 'By']
@@ -1480,30 +1938,31 @@ class WebTestGenerator:
         try:
             if not script.strip():
                 return {'success': False, 'error': 'Empty test script'}
-                
+
+            session_state = self.script_session_state
+            if self.execution_mode == "in-process":
+                return self._build_script_result(
+                    self._get_script_harness().run(script, timeout=30, session_state=session_state)
+                )
+
             with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.py') as f:
                 f.write(script)
                 temp_file = f.name
+
+            if session_state:
+                # Only readable by the current user, it holds session cookies
+                with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as f:
+                    json.dump(session_state, f)
+                    state_file = f.name
                 
-            result = subprocess.run(
-                [sys.executable, temp_file],
-                capture_output=True,
-                text=True,
-                timeout=30
+            result = run_script_process(
+                temp_file,
+                timeout=30,
+                cpu_limit_seconds=self.script_cpu_limit,
+                memory_limit_mb=self.script_memory_limit,
+                session_state_path=state_file if session_state else None
             )
-
-            # Combine stdout and stderr for comprehensive analysis
-            combined_output = result.stdout + result.stderr
-
-            # Analyze output for test failure indicators
-            test_passed = self._analyze_test_output(combined_output, result.returncode)
-            
-            return {
-                #'success': result.returncode == 0,
-                'success': test_passed,
-                'output': result.stdout,
-                'error': result.stderr
-            }
+            return self._build_script_result(result)
             
         except subprocess.TimeoutExpired:
             return {'success': False, 'error': 'Test execution timed out'}
@@ -1512,10 +1971,46 @@ class WebTestGenerator:
         finally:
             if 'temp_file' in locals() and os.path.exists(temp_file):
                 os.remove(temp_file)
+            if 'state_file' in locals() and os.path.exists(state_file):
+                os.remove(state_file)
+
+    def _build_script_result(self, result):
+        """Turn a finished script run (subprocess or in-process) into a test result"""
+        # Combine stdout and stderr for comprehensive analysis
+        combined_output = result.stdout + result.stderr
+
+        # Analyze output for test failure indicators
+        test_passed = self._analyze_test_output(combined_output, result.returncode)
+
+        return {
+            #'success': result.returncode == 0,
+            'success': test_passed,
+            'output': result.stdout,
+            'error': result.stderr
+        }
+
+    def _get_script_harness(self):
+        """
+        Get the in-process script harness, creating it on first use
+
+        The harness has its own browser pool with one session per script worker:
+        leasing from the shared pool could deadlock while URL workers hold its sessions.
+
+        Returns:
+            ScriptHarness: Harness shared by this generator and its workers
+        """
+        with self._script_harness_lock:
+            if self._script_harness is None:
+                self._script_harness = ScriptHarness(size=self.script_workers, logger=self.logger)
+            return self._script_harness
 
     def _analyze_test_output(self, combined_output, return_code):
         """
-        Analyze test output to determine if test actually passed or failed using LLM with fallback
+        Analyze test output to determine if test actually passed or failed
+
+        The AUTOTEST_RESULT line, test runner summaries and the exit code decide most
+        results locally. Only ambiguous output goes to the LLM, whose verdicts are
+        cached by output fingerprint; keyword analysis is the last fallback.
         
         Args:
             combined_output (str): Combined stdout and stderr
@@ -1524,12 +2019,28 @@ class WebTestGenerator:
         Returns:
             bool: True if test passed, False if failed
         """
+        test_passed, reason = classify_output(combined_output, return_code)
+        if test_passed is not None:
+            self.logger.debug(f"Test {'passed' if test_passed else 'failed'}: {reason}")
+            return test_passed
 
-        # First try LLM analysis
+        output_hash = output_fingerprint(combined_output, return_code)
+        try:
+            cached = self.verdict_cache.get(output_hash)
+        except Exception as e:
+            self.logger.warning(f"Failed to read cached test verdict: {str(e)}")
+            cached = None
+        if cached is not None:
+            self.logger.debug(f"Reusing cached verdict for identical output: {'passed' if cached else 'failed'}")
+            return cached
+
+        # Ambiguous output: try LLM analysis
+        self.logger.debug(f"Ambiguous test output ({reason}), asking the LLM")
         try:
             llm_result = self._analyze_test_output_with_llm(combined_output, return_code)
             if llm_result is not None:
                 self.logger.debug(f"LLM determined test result: {'passed' if llm_result else 'failed'}")
+                self.verdict_cache.set(output_hash, bool(llm_result))
                 return llm_result
         except Exception as e:
             self.logger.warning(f"LLM test output analysis failed: {str(e)}, falling back to keyword analysis")
@@ -1663,7 +2174,7 @@ class WebTestGenerator:
     #         if self.driver:
     #             self.driver.quit()
 
-    def run_workflow(self, url, username=None, password=None, no_cache=False, recursive=False, max_depth=1):
+    def run_workflow(self, url, username=None, password=None, no_cache=False, recursive=False, max_depth=1, workers=1, resume=False):
         """
         Main workflow execution with optional recursive URL discovery
         
@@ -1674,6 +2185,8 @@ class WebTestGenerator:
             no_cache (bool): Whether to use cache memory (database) or not
             recursive (bool): Whether to perform recursive URL extraction
             max_depth (int): Maximum depth for recursive extraction
+            workers (int): Number of parallel browsers used for URL extraction and for the selected URLs
+            resume (bool): Whether to continue the last unfinished recursive run of this URL from its checkpoint
             
         Returns:
             list or str: List of paths to generated report files when recursive=True, 
@@ -1681,8 +2194,11 @@ class WebTestGenerator:
         """
         try:
             if recursive:
-                # Enhanced workflow with recursive URL discovery
-                all_urls = self.url_extractor.extract_urls(url, max_depth=max_depth)
+                # Enhanced workflow with recursive URL discovery, checkpointed so an interrupted run can resume
+                self.crawl_checkpoint = CrawlCheckpoint.open(url, max_depth, resume=resume, logger=self.logger)
+                all_urls = self.url_extractor.extract_urls(url, max_depth=max_depth, checkpoint=self.crawl_checkpoint, workers=workers)
+                if self.change_detector:
+                    self.change_detector.mark_unchanged(self.url_extractor.unchanged_urls)
                 if not all_urls:
                     self.logger.warning("No URLs found to test")
                     return self.generate_report()
@@ -1696,6 +2212,8 @@ class WebTestGenerator:
                 print()
 
                 reports = []
+                processed_urls = []
+                interrupted = False
                 # Process each URL
                 # for discovered_url in all_urls:
                 #     self.process_single_url(discovered_url, username, password, no_cache)
@@ -1705,7 +2223,10 @@ class WebTestGenerator:
 
                 while True:
                     try:
-                        user_input = input("Enter URL number(s), 'all', 'list' to show URLs, or 'quit' to stop: ").strip()
+                        user_input = self._ask_user(
+                            "Enter URL number(s), 'all', 'list' to show URLs, or 'quit' to stop: ",
+                            SelectionPolicy.as_answer(self.selection_policy.select_urls(all_urls))
+                        ).strip()
                         self.logger.debug("Enter URL number(s), 'all', 'list' to show URLs, or 'quit' to stop: ")
                         self.logger.debug(f"User entered: {user_input}")
                         
@@ -1741,9 +2262,24 @@ class WebTestGenerator:
                                 self.logger.debug("Invalid input. Please enter valid numbers separated by commas, 'all', 'list', or 'quit'")
                                 continue
                         
+                        # Process selected URLs in parallel browsers and merge into one report
+                        if workers > 1 and len(url_numbers) > 1:
+                            selected_urls = [all_urls[url_num - 1] for url_num in url_numbers]
+                            processed_urls.extend(selected_urls)
+                            # A shared pool needs a spare session next to the one this generator holds
+                            shared_pool = self.browser_pool if self.browser_pool and self.browser_pool.size > 1 else None
+                            URLWorkerPool(self, workers=workers, browser_pool=shared_pool).run(selected_urls, username, password, no_cache)
+                            report_path = self.generate_report()
+                            reports.append(report_path)
+                            self.logger.debug(f"✓ {len(selected_urls)} URLs processed with {workers} workers")
+                            if len(url_numbers) == len(all_urls) or not self.interactive:
+                                break
+                            continue
+
                         # Process each selected URL
                         for url_num in url_numbers:
                             selected_url = all_urls[url_num - 1]
+                            processed_urls.append(selected_url)
                             self.logger.debug(f"Processing URL {url_num}: {selected_url}")
                             self.process_single_url(selected_url, username, password, no_cache)
                             report_path = self.generate_report()
@@ -1751,56 +2287,46 @@ class WebTestGenerator:
                             self.logger.debug(f"✓ URL {url_num} processed successfully")
                         
                         # If processing multiple URLs, break the main loop after processing
-                        if len(url_numbers) == len(all_urls):
+                        if len(url_numbers) == len(all_urls) or not self.interactive:
                             break
                             
                     except KeyboardInterrupt:
                         self.logger.debug("\n\nURL processing interrupted by user.")
+                        interrupted = True
                         break
                     except Exception as e:
                         self.logger.error(f"Error during URL processing: {str(e)}")
+                        if not self.interactive:
+                            break
                         continue
                     
+                # Selected URLs that failed stay open for --resume
+                if not interrupted and all(self.crawl_checkpoint.stage_of(u) == "done" for u in processed_urls):
+                    self.crawl_checkpoint.complete()
+                self._log_skipped_work()
                 #return self.generate_report()
                 return reports  # Return list of all report paths
             else:
                 # Original single-page workflow
-                self.driver.get(url)
-                if not no_cache:
-                    with SessionLocal() as db:
-                        page = db.query(Page).filter(Page.page_url == url and Page.page_source == self.driver.page_source).first()
-                        if page:
-                            self.logger.debug(f"Provided webpage: '{url}' is already tested and validated...!!!")
-                            regenerate = False
-                            first_time = False
-                        else:
-                            self.logger.debug("Detected a new webpage. Proceeding with the analysis...")
-                            regenerate = False
-                            first_time = True
-                else:
-                    self.logger.debug("Cache is disabled. Proceeding with the analysis...")
-                    regenerate = True  
-                    first_time = False
                 # Optional authentication check and handling
-                require_login=False
-        
-                if self.driver.current_url != url:
-                    if self._requires_login():
-                        self.logger.debug(f"Authentication required for page '{url}'")
-                        if not username or not password:
-                            self.logger.warning(f"Skipping {url} - authentication required but credentials not provided")
-                            return
-                        self.login_to_website(url, username, password) 
-                        require_login = True
+                if self._run_unchanged_page(url, username, no_cache):
+                    self._log_skipped_work()
+                    return self.generate_report()
+
+                require_login = self._open_page(url, username, password)
+                if require_login is None:
+                    return
                     
-                initial_analysis = self.analyze_page(regenerate=regenerate, first_time=first_time, context=url, require_login=require_login, username=username, password=password)
+                regenerate, first_time, dom_fingerprint = self._resolve_cache_state(url, no_cache)
+                initial_analysis = self.analyze_page(regenerate=regenerate, first_time=first_time, context=url, require_login=require_login, username=username, password=password, dom_fingerprint=dom_fingerprint)
+                self._record_change(url, regenerate or first_time)
                 self.execute_test_cycle(initial_analysis)
                 self.track_navigation(url)
+                self._log_skipped_work()
                 return self.generate_report()
                 
         finally:
-            if self.driver:
-                self.driver.quit()
+            self.close_browser()
 
     def process_single_url(self, url, username, password, no_cache):
         """
@@ -1815,44 +2341,213 @@ class WebTestGenerator:
         self.logger.debug(f"\n{'='*50}")
         self.logger.debug(f"Processing URL: {url}")
         
+        checkpoint = self.crawl_checkpoint
+        stage = checkpoint.stage_of(url) if checkpoint else None
+        if stage == "done":
+            # Processed before the run was interrupted, report its stored results
+            self.test_results.extend(checkpoint.results_of(url))
+            self.logger.info(f"Skipping {url}, already processed in this crawl run")
+            return
+        if stage == "analyzed" and no_cache:
+            # The analysis stored before the interruption is reused instead of spending LLM calls again
+            self.logger.debug(f"Reusing stored analysis of {url} from this crawl run")
+            no_cache = False
+        first_result = len(self.test_results)
+        
         try:
-            self.driver.get(url)
-            require_login=False
-            if not no_cache:
-                with SessionLocal() as db:
-                    page = db.query(Page).filter(Page.page_url == url and Page.page_source == self.driver.page_source).first()
-                    if page:
-                        self.logger.debug(f"Provided webpage: '{url}' is already tested and validated...!!!")
-                        regenerate = False
-                        first_time = False
-                        #return 
-                    else:
-                        self.logger.debug("Detected a new webpage. Proceeding with the analysis...")
-                        regenerate = False
-                        first_time = True
-            else:
-                self.logger.debug("Cache is disabled. Proceeding with the analysis...")
-                regenerate = True 
-                first_time = False
+            if self._run_unchanged_page(url, username, no_cache):
+                if checkpoint:
+                    checkpoint.mark_done(url, self.test_results[first_result:])
+                return
+
             # Optional authentication check and handling
-            require_login=False
-  
-            if self.driver.current_url != url:
-                if self._requires_login():
-                    self.logger.debug(f"Authentication required for page '{self.driver.current_url}'")
-                    if not username or not password:
-                        self.logger.warning(f"Skipping {url} - authentication required but credentials not provided")
-                        return
-                    self.login_to_website(url, username, password) 
-                    require_login = True
+            require_login = self._open_page(url, username, password)
+            if require_login is None:
+                return
             
-            analysis = self.analyze_page(regenerate=regenerate, first_time=first_time, context=url, require_login=require_login, username=username, password=password)
+            regenerate, first_time, dom_fingerprint = self._resolve_cache_state(url, no_cache)
+            analysis = self.analyze_page(regenerate=regenerate, first_time=first_time, context=url, require_login=require_login, username=username, password=password, dom_fingerprint=dom_fingerprint)
+            self._record_change(url, regenerate or first_time)
+            if checkpoint:
+                checkpoint.mark_analyzed(url)
             self.execute_test_cycle(analysis)
             self.track_navigation(url)
+            if checkpoint:
+                checkpoint.mark_done(url, self.test_results[first_result:])
             
         except Exception as e:
             self.logger.error(f"Failed to process URL {url}: {str(e)}")
 
+    def _run_unchanged_page(self, url, username, no_cache):
+        """
+        In incremental mode, run the stored scripts of a page the server reports unchanged, without loading or analyzing it
+
+        Args:
+            url (str): URL of the page
+            username (str): Optional username, selects the stored login session
+            no_cache (bool): Whether to use cache memory (database) or not
+
+        Returns:
+            bool: True if the page was handled, False if it goes through the full workflow
+        """
+        if not self.change_detector or no_cache:
+            return False
+        session_state = self.session_store.get(url, username) if self.session_store else None
+        if self.change_detector.check(url, session_state) != NOT_MODIFIED:
+            return False
+        analysis = self.change_detector.stored_analysis(url, self.selection_policy)
+        if analysis is None:
+            return False
+
+        self.logger.info(f"'{url}' not modified since its last analysis, running its {len(analysis['scripts'])} stored scripts")
+        self.script_session_state = session_state
+        first_result = len(self.test_results)
+        self.execute_test_cycle(analysis)
+        for entry in self.test_results[first_result:]:
+            entry['url'] = url  # the browser was not navigated to the page
+        self.change_detector.record(url, NOT_MODIFIED)
+        return True
+
+    def _record_change(self, url, analyzed):
+        """Count a page processed by the full workflow in incremental mode and store its HTTP validators"""
+        if self.change_detector:
+            self.change_detector.record(url, "analyzed" if analyzed else "structure_unchanged")
+
+    def _log_skipped_work(self):
+        """Log how much work the incremental run skipped"""
+        if not self.change_detector:
+            return
+        stats = self.change_detector.get_stats()
+        self.logger.info(
+            f"Incremental run: {stats['not_modified']} of {stats['pages']} pages not modified (page load, analysis and "
+            f"script generation skipped), {stats['structure_unchanged']} with unchanged structure (analysis and script "
+            f"generation skipped), {stats['analyzed']} analyzed"
+        )
+
+    def _open_page(self, url, username, password):
+        """
+        Load a page, reusing the stored login session of its host or logging in
+
+        A stored session is loaded into the browser before the page is opened. If the
+        site still asks to log in, the session expired: it is dropped and the login flow
+        runs again, and the new session is stored for the following pages and scripts.
+
+        Args:
+            url (str): URL to open
+            username (str): Optional username for authentication
+            password (str): Optional password for authentication
+
+        Returns:
+            bool: Whether the login flow ran on this page, or None if credentials are required but missing
+        """
+        state = self._restore_session(url, username)
+        self.driver.get(url)
+        self.script_session_state = None
+
+        if self.driver.current_url != url:
+            if self._requires_login():
+                self.logger.debug(f"Authentication required for page '{self.driver.current_url}'")
+                if state:
+                    self.logger.debug("Stored session is no longer accepted, logging in again")
+                    self.session_store.invalidate(url, username)
+                    self._session_key = None
+                if not username or not password:
+                    self.logger.warning(f"Skipping {url} - authentication required but credentials not provided")
+                    return None
+                if self.login_to_website(url, username, password) is True:
+                    self._store_session(url, username)
+                return True
+
+        # Generated scripts for this page don't log in themselves, they start from the stored session
+        self.script_session_state = state
+        return False
+
+    def _restore_session(self, url, username):
+        """
+        Load the stored login session of the account on a URL's host into the browser
+
+        Args:
+            url (str): URL about to be opened
+            username (str): Account of the run; without credentials no session is restored
+
+        Returns:
+            dict: Stored session state, or None if there is none
+        """
+        if not self.session_store:
+            return None
+        state = self.session_store.get(url, username)
+        host = SessionStore.host_of(url)
+        if state and self._session_key != (host, username):
+            try:
+                apply_session_state(self.driver, state, self.logger)
+                self._session_key = (host, username)
+                self.logger.debug(f"Restored stored session for '{host}'")
+            except Exception as e:
+                self.logger.warning(f"Failed to restore stored session for '{host}': {str(e)}")
+                return None
+        return state
+
+    def _store_session(self, url, username):
+        """Store cookies and localStorage after a successful login on a URL"""
+        if not self.session_store:
+            return
+        try:
+            self.session_store.save(url, username, capture_session_state(self.driver))
+            self._session_key = (SessionStore.host_of(url), username)
+        except Exception as e:
+            self.logger.warning(f"Failed to store login session: {str(e)}")
+
+    def compute_dom_fingerprint(self):
+        """
+        Compute a structural fingerprint of the current page
+
+        Forms, interactive elements and their test-relevant attributes are collected
+        in the browser with one execute_script call and hashed in canonical form.
+
+        Returns:
+            str: Hex encoded fingerprint, or None if it could not be computed
+        """
+        try:
+            return canonical_json_hash(self.driver.execute_script(DOM_FINGERPRINT_SCRIPT))
+        except Exception as e:
+            self.logger.warning(f"Failed to compute DOM fingerprint: {str(e)}")
+            return None
+
+    def _resolve_cache_state(self, url, no_cache):
+        """
+        Decide whether a page has to be analyzed again
+
+        The stored page is reused only while its DOM fingerprint matches the current one.
+
+        Args:
+            url (str): URL of the page
+            no_cache (bool): Whether to use cache memory (database) or not
+
+        Returns:
+            tuple: (regenerate, first_time, dom_fingerprint) for analyze_page
+        """
+        dom_fingerprint = self.compute_dom_fingerprint()
+        if no_cache:
+            self.logger.debug("Cache is disabled. Proceeding with the analysis...")
+            return True, False, dom_fingerprint
+
+        with SessionLocal() as db:
+            page = db.query(Page).filter(Page.page_url == url).first()
+            if not page or page.test_cases is None:
+                self.logger.debug("Detected a new webpage. Proceeding with the analysis...")
+                return False, True, dom_fingerprint
+
+            if page.dom_fingerprint is None and dom_fingerprint:
+                # Page stored before fingerprints existed: adopt the current structure
+                page.dom_fingerprint = dom_fingerprint
+                db.commit()
+            elif dom_fingerprint is None or page.dom_fingerprint != dom_fingerprint:
+                self.logger.debug(f"Structure of '{url}' changed since the last analysis. Proceeding with the analysis...")
+                return False, True, dom_fingerprint
+
+        self.logger.debug(f"Provided webpage: '{url}' is already tested and validated...!!!")
+        return False, False, dom_fingerprint
+
     def _requires_login(self):
         """Use LLM to check if login/registration is required"""
         try:
@@ -1900,7 +2595,13 @@ class WebTestGenerator:
         
     ## Dynamic with LLM Analysis
     def login_to_website(self, url, username=None, password=None):
-        """Perform dynamic login/registration with user input for additional fields"""
+        """
+        Perform dynamic login/registration with user input for additional fields
+
+        Auth form selectors and the browser's behaviour after a successful login are
+        cached per host and login form fingerprint. The LLM is asked for the selectors
+        of unknown forms only, and checks the login state only when the outcome is ambiguous.
+        """
         if not username or not password:
             raise ValueError("Credentials required for authentication")
            
@@ -1909,30 +2610,20 @@ class WebTestGenerator:
             WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.TAG_NAME, 'body'))
             )
-           
-            #page_html = self.driver.page_source[:10000]
-            page_html = self.driver.page_source
-            system_prompt = self.prompt_manager.get_prompt("auth_form_selectors", "system")
-            user_prompt_template = self.prompt_manager.get_prompt("auth_form_selectors", "user")
-            # Format prompt with dynamic values
-            user_prompt = user_prompt_template.format(
-                page_html=page_html
-            )
-            result = self.llm.generate(system_prompt, user_prompt, model_type="analysis")
-            # Parse LLM response
-            try:
-                json_str = result
-                if "```json" in result:
-                    json_str = result.split("```json")[1].split("```")[0].strip()
-                elif "```" in result:
-                    json_str = result.split("```")[1].strip()
-                   
-                auth_data = json.loads(json_str)
-                self.auth_data = auth_data
-            except json.JSONDecodeError as e:
-                self.logger.error(f"Failed to parse LLM response: {str(e)}")
-                return {}
-            #auth_data = json.loads(result)
+
+            login_url = self.driver.current_url
+            host = urlparse(login_url).netloc
+            form_fingerprint = self._login_form_fingerprint()
+            cached = self.auth_form_cache.get(host, form_fingerprint)
+            if cached and cached["selectors"] and self._auth_selectors_present(cached["selectors"]):
+                self.logger.debug(f"Reusing cached auth form selectors for '{host}'")
+                auth_data = cached["selectors"]
+            else:
+                cached = None  # Unknown form, or the page changed under the same structure
+                auth_data = self._detect_auth_form()
+                if not auth_data:
+                    return {}
+            self.auth_data = auth_data
             self.logger.debug(f"Auth form structure: {json.dumps(auth_data, indent=2)}")
  
             # Fill credentials
@@ -1942,6 +2633,8 @@ class WebTestGenerator:
             if 'additional_fields' in auth_data:
                 field_values = {}
                 for field_name, field_info in auth_data['additional_fields'].items():
+                    if not self.interactive:
+                        raise RuntimeError(f"Login field '{field_name}' requires interactive input")
                     while True:
                         value = input(f"Enter {field_name} ({field_info.get('type', 'text')}): ")
                         if self.validate_field_input(value, field_info.get('type')):
@@ -1950,6 +2643,7 @@ class WebTestGenerator:
                         self.logger.debug(f"Invalid format for {field_name}. Please try again.")
                    
                     self.driver.find_element(By.CSS_SELECTOR, field_info['selector']).send_keys(field_values[field_name])
+            cookies_before = {cookie['name'] for cookie in self.driver.get_cookies()}
             # Submit form
             submit_button = self.driver.find_element(By.CSS_SELECTOR, auth_data['submit_selector'])
             try:
@@ -1958,10 +2652,29 @@ class WebTestGenerator:
                 self.logger.debug("Click intercepted, attempting JavaScript click...")
                 self.driver.execute_script("arguments[0].click();", submit_button)
             # Wait for potential redirection (up to 10 seconds)
-            page_html_after = self.driver.page_source
- 
-            if not self.llm_is_logged_in(page_html_after):
-                raise RuntimeError("LLM indicates login did not succeed")
+            password_selector = auth_data['password_selector']
+            try:
+                WebDriverWait(self.driver, 10).until(
+                    lambda d: d.current_url != login_url or not self._password_field_displayed(password_selector)
+                )
+            except TimeoutException:
+                self.logger.debug("No redirection after submitting the login form")
+
+            observed = observe_login_signal(
+                url_changed=self.driver.current_url != login_url,
+                form_present=self._password_field_displayed(password_selector),
+                cookies_before=cookies_before,
+                cookies_after=[cookie['name'] for cookie in self.driver.get_cookies()]
+            )
+            learned = cached["success_signal"] if cached else None
+            logged_in = evaluate_login_signal(observed, learned)
+            self.logger.debug(f"Login signal {observed}, learned {learned}: {logged_in}")
+            if logged_in is None:
+                logged_in = self.llm_is_logged_in(self._minimize_page_source(self.driver.page_source))
+            if not logged_in:
+                raise RuntimeError("Login did not succeed")
+
+            self.auth_form_cache.save(host, form_fingerprint, selectors=auth_data, success_signal=learned or observed)
             return True
         except json.JSONDecodeError as e:
             self.logger.error(f"Failed to parse auth selectors: {str(e)}")
@@ -1975,6 +2688,64 @@ class WebTestGenerator:
         except Exception as e:
             self.logger.error(f"Authentication failed: {str(e)}")
             raise
+
+    def _detect_auth_form(self):
+        """
+        Ask the LLM for the auth form selectors of the current page
+
+        Returns:
+            dict: Parsed auth_form_selectors result, or an empty dict if it couldn't be parsed
+        """
+        page_html = self._minimize_page_source(self.driver.page_source)
+        system_prompt = self.prompt_manager.get_prompt("auth_form_selectors", "system")
+        user_prompt_template = self.prompt_manager.get_prompt("auth_form_selectors", "user")
+        # Format prompt with dynamic values
+        user_prompt = user_prompt_template.format(
+            page_html=page_html
+        )
+        result = self.llm.generate(system_prompt, user_prompt, model_type="analysis")
+        # Parse LLM response
+        try:
+            json_str = result
+            if "```json" in result:
+                json_str = result.split("```json")[1].split("```")[0].strip()
+            elif "```" in result:
+                json_str = result.split("```")[1].strip()
+            return json.loads(json_str)
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Failed to parse LLM response: {str(e)}")
+            return {}
+
+    def _login_form_fingerprint(self):
+        """
+        Compute the fingerprint of the login form on the current page
+
+        Returns:
+            str: Hex encoded fingerprint, or None if the page has no form or it could not be computed
+        """
+        try:
+            structure = self.driver.execute_script(LOGIN_FORM_SCRIPT)
+        except Exception as e:
+            self.logger.debug(f"Failed to fingerprint login form: {str(e)}")
+            return None
+        return canonical_json_hash(structure) if structure else None
+
+    def _auth_selectors_present(self, auth_data):
+        """Check that the cached username, password and submit selectors still match the page"""
+        try:
+            return all(
+                self.driver.find_elements(By.CSS_SELECTOR, auth_data[key])
+                for key in ('username_selector', 'password_selector', 'submit_selector')
+            )
+        except Exception:
+            return False
+
+    def _password_field_displayed(self, password_selector):
+        try:
+            return any(element.is_displayed() for element in self.driver.find_elements(By.CSS_SELECTOR, password_selector))
+        except Exception:
+            # The page is navigating or the field went stale
+            return False
  
  
     def llm_is_logged_in(self, page_html):
@@ -2036,6 +2807,8 @@ class WebTestGenerator:
             'test_results': self.test_results,
             'success_rate': (len([r for r in self.test_results if r['result']['success']]) / 
                            len(self.test_results) if self.test_results else 0),
+            'llm_cache': self.llm.get_cache_stats(),
+            'incremental': self.change_detector.get_stats() if self.change_detector else None,
             # 'generated_scripts': [f for f in os.listdir('test_scripts') 
             #                     if f.endswith(('.py', '.java'))] if os.path.exists('test_scripts') else [],
             'generated_scripts': list(set([r['file_name'] for r in self.test_results if r['file_name']])),
@@ -2071,14 +2844,16 @@ class WebTestGenerator:
         except Exception:
             current_url = "Unknown (Driver connection lost)"
 
-        self.test_results.append({
+        entry = {
             'timestamp': datetime.now().isoformat(),
             #'url': self.driver.current_url,
             'url': current_url,
             'test_name': test_name,
             'file_name': file_name,
             'result': result
-        })
+        }
+        self.test_results.append(entry)
+        return entry
 
     def _validate_auth_test_data_usage(self, test_cases, test_data):
         """Validate that generated auth tests use provided test data"""
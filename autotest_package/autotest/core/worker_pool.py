@@ -0,0 +1,72 @@
+"""
+Worker pool module for processing multiple URLs in parallel browsers
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from .browser_pool import BrowserPool
+
+
+class URLWorkerPool:
+    """Processes URLs concurrently, each worker driving a browser leased from a BrowserPool"""
+
+    def __init__(self, generator, workers=2, browser_pool=None):
+        """
+        Initialize URL worker pool
+
+        Args:
+            generator (WebTestGenerator): Parent generator whose configuration workers inherit
+            workers (int): Number of parallel browser workers
+            browser_pool (BrowserPool): Pool to lease browsers from, a private pool is used if not given
+        """
+        self.generator = generator
+        self.workers = max(1, workers)
+        self.browser_pool = browser_pool
+        self.logger = generator.logger
+
+    def run(self, urls, username=None, password=None, no_cache=False):
+        """
+        Process URLs with the worker pool and merge results into the parent generator
+
+        Args:
+            urls (list): URLs to process
+            username (str): Optional username for authentication
+            password (str): Optional password for authentication
+            no_cache (bool): Whether to use cache memory (database) or not
+
+        Returns:
+            list: Per-URL (url, test_results, visited_pages) tuples in input order
+        """
+        if not urls:
+            return []
+
+        worker_count = min(self.workers, len(urls))
+        self.logger.info(f"Processing {len(urls)} URLs with {worker_count} browser workers")
+
+        # Browsers are started lazily so a short URL list doesn't pay for unused sessions
+        browser_pool = self.browser_pool or BrowserPool(size=worker_count, logger=self.logger)
+
+        def process(url):
+            # A failing URL (e.g., a browser that won't start) must not discard the results of the others
+            try:
+                with browser_pool.lease() as driver:
+                    worker = self.generator.spawn_worker(driver)
+                    worker.process_single_url(url, username, password, no_cache)
+                    return url, worker.test_results, worker.visited_pages
+            except Exception as e:
+                self.logger.error(f"Failed to process URL {url}: {str(e)}")
+                return url, [], set()
+
+        try:
+            with ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="url-worker") as executor:
+                outcomes = list(executor.map(process, urls))
+        finally:
+            if browser_pool is not self.browser_pool:
+                browser_pool.close()
+
+        # Merge in URL order so the combined report is deterministic
+        for url, test_results, visited_pages in outcomes:
+            self.generator.test_results.extend(test_results)
+            self.generator.visited_pages.update(visited_pages)
+            self.logger.debug(f"✓ Merged {len(test_results)} test results for {url}")
+
+        return outcomes
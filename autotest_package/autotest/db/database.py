@@ -7,9 +7,11 @@ DB_PATH = os.path.join(BASE_DIR, "autotest.db")
 
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False, "timeout": 30})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    from .migrations import run_migrations
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+Migrations module for upgrading existing SQLite databases in place
+"""
+import json
+from sqlalchemy import inspect, text
+from ..utils.hashing import canonical_json_hash
+
+
+def _add_missing_column(connection, table, column, column_type):
+    """
+    Add a column to an existing table if it is not there yet
+
+    Args:
+        connection (Connection): Open SQLAlchemy connection
+        table (str): Table name
+        column (str): Column name
+        column_type (str): SQL type of the column
+
+    Returns:
+        bool: True if the column was added
+    """
+    inspector = inspect(connection)
+    if not inspector.has_table(table):
+        return False
+    if column in {c["name"] for c in inspector.get_columns(table)}:
+        return False
+    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+    return True
+
+
+def backfill_test_case_hashes(connection):
+    """
+    Compute test_case_hash for rows created before the column existed
+
+    Args:
+        connection (Connection): Open SQLAlchemy connection
+
+    Returns:
+        int: Number of rows updated
+    """
+    rows = connection.execute(
+        text("SELECT id, test_case_data FROM test_case_data WHERE test_case_hash IS NULL AND test_case_data IS NOT NULL")
+    ).fetchall()
+    for row_id, data in rows:
+        value = json.loads(data) if isinstance(data, str) else data
+        connection.execute(
+            text("UPDATE test_case_data SET test_case_hash = :hash WHERE id = :id"),
+            {"hash": canonical_json_hash(value), "id": row_id}
+        )
+    return len(rows)
+
+
+def run_migrations(engine):
+    """
+    Bring tables created by older versions up to the current schema
+
+    Args:
+        engine (Engine): SQLAlchemy engine of the database
+    """
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        if inspector.has_table("test_case_data"):
+            _add_missing_column(connection, "test_case_data", "test_case_hash", "VARCHAR(64)")
+            connection.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_test_case_data_page_url_hash ON test_case_data (page_url, test_case_hash)"
+            ))
+            backfill_test_case_hashes(connection)
+
+        if inspector.has_table("page"):
+            # Fingerprints of existing pages are recorded on their next visit
+            _add_missing_column(connection, "page", "dom_fingerprint", "VARCHAR(64)")
+            connection.execute(text("CREATE INDEX IF NOT EXISTS ix_page_dom_fingerprint ON page (dom_fingerprint)"))
+            # Validators are recorded when incremental runs next fetch the pages
+            _add_missing_column(connection, "page", "etag", "VARCHAR(255)")
+            _add_missing_column(connection, "page", "last_modified", "VARCHAR(64)")
+            _add_missing_column(connection, "page", "analyzed_at", "DATETIME")
+
+        if inspector.has_table("auth_session") and "username" not in {c["name"] for c in inspector.get_columns("auth_session")}:
+            # Sessions were keyed by host alone and can't be told apart by account; drop them, the next login stores them again
+            from ..tables.auth_session import AuthSession
+            connection.execute(text("DROP TABLE auth_session"))
+            AuthSession.__table__.create(connection)
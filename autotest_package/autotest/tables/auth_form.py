@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, JSON, DateTime, Index
+from ..db.database import Base
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+def get_local_time():
+    return datetime.now(ZoneInfo("Asia/Kolkata"))
+
+class AuthForm(Base):
+    __tablename__ = "auth_form"
+    id = Column(Integer, primary_key=True, index=True)
+    host = Column(String)  # e.g., "app.example.com"
+    form_fingerprint = Column(String(64))  # hash of the login form structure
+    selectors = Column(JSON)  # auth_form_selectors result: username/password/submit/additional fields
+    success_signal = Column(JSON)  # observed after a verified login: url_changed, form_present, cookies
+    timestamp = Column(DateTime, default=get_local_time, onupdate=get_local_time)
+
+    __table_args__ = (Index("ix_auth_form_host_fingerprint", "host", "form_fingerprint", unique=True),)
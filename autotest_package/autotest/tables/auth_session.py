@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, JSON, DateTime, UniqueConstraint
+from ..db.database import Base
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+def get_local_time():
+    return datetime.now(ZoneInfo("Asia/Kolkata"))
+
+class AuthSession(Base):
+    __tablename__ = "auth_session"
+    __table_args__ = (
+        UniqueConstraint("host", "username", name="uq_auth_session_host_username"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    host = Column(String, index=True)  # e.g., "app.example.com"
+    username = Column(String)  # account the session belongs to
+    origin = Column(String)  # e.g., "https://app.example.com"
+    cookies = Column(JSON)
+    local_storage = Column(JSON)
+    expires_at = Column(DateTime)  # latest cookie expiry (UTC), None when session cookies are involved
+    timestamp = Column(DateTime, default=get_local_time, onupdate=get_local_time)
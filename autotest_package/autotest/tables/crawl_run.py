@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from ..db.database import Base
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+def get_local_time():
+    return datetime.now(ZoneInfo("Asia/Kolkata"))
+
+class CrawlRun(Base):
+    __tablename__ = "crawl_run"
+    id = Column(Integer, primary_key=True, index=True)
+    start_url = Column(String, index=True)
+    max_depth = Column(Integer)
+    status = Column(String, default="crawling")  # crawling -> extracted -> completed
+    created_at = Column(DateTime, default=get_local_time)
+    timestamp = Column(DateTime, default=get_local_time, onupdate=get_local_time)
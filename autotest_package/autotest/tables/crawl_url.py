@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, Index
+from ..db.database import Base
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+def get_local_time():
+    return datetime.now(ZoneInfo("Asia/Kolkata"))
+
+class CrawlURL(Base):
+    __tablename__ = "crawl_url"
+    id = Column(Integer, primary_key=True, index=True)  # insertion order is the BFS frontier order
+    run_id = Column(Integer, ForeignKey("crawl_run.id"), index=True)
+    url = Column(String)
+    depth = Column(Integer)
+    state = Column(String, default="queued")  # queued | visited | failed (retried on resume)
+    stage = Column(String)  # None | analyzed | done
+    results = Column(JSON)  # test results of the URL once done, restored into the report on resume
+    timestamp = Column(DateTime, default=get_local_time, onupdate=get_local_time)
+
+    __table_args__ = (Index("ix_crawl_url_run_url", "run_id", "url", unique=True),)
@@ -17,6 +17,10 @@ class Page(Base):
     page_metadata = Column(JSON) 
     test_cases = Column(JSON)
     test_cases_count = Column(Integer, default=0)
+    dom_fingerprint = Column(String(64), index=True)  # hash of the page's interactive structure
+    etag = Column(String(255))  # HTTP validators of the analyzed version, sent back in conditional requests
+    last_modified = Column(String(64))
+    analyzed_at = Column(DateTime)  # set by analyze_page only, unlike timestamp which any update bumps
     timestamp = Column(DateTime, default=get_local_time , onupdate=get_local_time)
 
     domain = relationship("Domain", back_populates="page")
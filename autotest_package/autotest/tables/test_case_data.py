@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, ForeignKey, Text, String, JSON, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Text, String, JSON, DateTime, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from ..db.database import Base
+from ..utils.hashing import canonical_json_hash
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
@@ -10,13 +11,22 @@ def get_local_time():
 
 class TestCase(Base):
     __tablename__ = "test_case_data"
+    __table_args__ = (
+        Index("ix_test_case_data_page_url_hash", "page_url", "test_case_hash"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     page_url = Column(String, ForeignKey("page.page_url"))
     test_case_title = Column(String)
     test_case_type = Column(String)
     test_case_data = Column(JSON)  # JSON string
+    test_case_hash = Column(String(64))  # canonical JSON hash of test_case_data, used for lookups
     test_script = Column(Text)
     script_path = Column(String)
     timestamp = Column(DateTime, default=get_local_time, onupdate=get_local_time)
 
-    page = relationship("Page", back_populates="test_case")
\ No newline at end of file
+    page = relationship("Page", back_populates="test_case")
+
+    @validates("test_case_data")
+    def _hash_test_case_data(self, key, value):
+        self.test_case_hash = canonical_json_hash(value) if value is not None else None
+        return value
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Boolean, DateTime
+from ..db.database import Base
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+def get_local_time():
+    return datetime.now(ZoneInfo("Asia/Kolkata"))
+
+class TestVerdict(Base):
+    __tablename__ = "test_verdict"
+    output_hash = Column(String(64), primary_key=True)  # verdict.output_fingerprint of the script output
+    passed = Column(Boolean)
+    timestamp = Column(DateTime, default=get_local_time, onupdate=get_local_time)
@@ -0,0 +1,34 @@
+"""
+Hashing utilities for content-addressed lookups
+"""
+import hashlib
+import json
+
+
+def sha256_text(text):
+    """
+    Compute the SHA-256 hex digest of a text value
+
+    Args:
+        text (str): Text to hash (None is treated as an empty string)
+
+    Returns:
+        str: Hex encoded SHA-256 digest
+    """
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def canonical_json_hash(value):
+    """
+    Compute the SHA-256 hex digest of a JSON-serializable value in canonical form
+
+    Keys are sorted and separators fixed, so equal values hash equally
+    regardless of key order or formatting.
+
+    Args:
+        value: JSON-serializable value
+
+    Returns:
+        str: Hex encoded SHA-256 digest
+    """
+    return sha256_text(json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False))
@@ -0,0 +1,93 @@
+"""
+Process memory utilities reading /proc for process groups and process trees
+"""
+import os
+
+
+def _processes():
+    """
+    List the running processes
+
+    Returns:
+        dict: pid -> (parent pid, process group id), empty where /proc is not available
+    """
+    processes = {}
+    if not os.path.isdir("/proc"):
+        return processes
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Fields after the parenthesized command name: state, ppid, pgrp, ...
+                fields = f.read().rsplit(")", 1)[1].split()
+            processes[int(entry)] = (int(fields[1]), int(fields[2]))
+        except (OSError, IndexError, ValueError):
+            continue  # The process exited while being read
+    return processes
+
+
+def process_memory(pid):
+    """
+    Get the memory of one process
+
+    Uses the proportional set size so pages shared between processes (e.g., Chrome's)
+    are counted once, and falls back to the resident set size on kernels without smaps_rollup.
+
+    Args:
+        pid (int): Process id
+
+    Returns:
+        int: Memory in bytes, 0 if the process is gone
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def process_group_memory(pgid):
+    """
+    Sum the memory of all processes in a process group
+
+    Args:
+        pgid (int): Process group id
+
+    Returns:
+        int: Memory in bytes, or None where /proc is not available
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    return sum(process_memory(pid) for pid, (_, group) in _processes().items() if group == pgid)
+
+
+def process_tree_memory(pid):
+    """
+    Sum the memory of a process and all its descendants
+
+    Args:
+        pid (int): Root process id
+
+    Returns:
+        int: Memory in bytes, or None where /proc is not available
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    children = {}
+    for child, (parent, _) in _processes().items():
+        children.setdefault(parent, []).append(child)
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        total += process_memory(current)
+        pending.extend(children.get(current, []))
+    return total
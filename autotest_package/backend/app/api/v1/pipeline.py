@@ -0,0 +1,71 @@
+from collections import Counter
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from app.api.deps import get_db, get_current_user_claims
+from app.schemas.pipeline import PipelineStart, PipelineStartOut, PipelineStatusOut, PipelineFailedPage
+from app.models.site import Site
+from app.models.page import Page
+from app.pipeline.stages import STAGE_BY_NAME, STAGE_BY_STATUS, REVIEW_STATUS
+from app.pipeline.publisher import publish_jobs
+from app.pipeline.claims import is_failed
+
+router = APIRouter(prefix="/api/v1/pipeline", tags=["pipeline"])
+
+@router.post("/sites/{site_id}/start", response_model=PipelineStartOut)
+async def start_site(site_id: int, payload: PipelineStart, claims: dict = Depends(get_current_user_claims), db: Session = Depends(get_db)):
+    """Queue the site's new pages, and requeue unclaimed pages stopped mid-pipeline or failed (resume)."""
+    if not db.get(Site, site_id):
+        raise HTTPException(status_code=404, detail="Site not found")
+    startable = ["new", *STAGE_BY_STATUS] + ([REVIEW_STATUS] if payload.generate_scripts else [])
+    pages = db.execute(
+        select(Page)
+        .where(Page.site_id == site_id, Page.status.in_(startable), Page.claimed_by.is_(None))
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+
+    options = {"generate_scripts": payload.generate_scripts, "user_id": claims.get("user_id")}
+    now = datetime.now()
+    jobs = []
+    for page in pages:
+        if page.status == "new":
+            page.status = STAGE_BY_NAME["metadata"].status
+        elif page.status == REVIEW_STATUS:
+            page.status = STAGE_BY_NAME["test_scripts"].status
+        page.pipeline_options = options
+        # Failed pages get a fresh set of attempts, e.g. when resubmitted with credentials
+        page.stage_attempts = 0
+        page.last_error = None
+        page.published_at = None
+        page.updated_on = now
+        page.updated_by = claims.get("user_id")
+        jobs.append((STAGE_BY_STATUS[page.status], page.id, {**options, "username": payload.username, "password": payload.password}))
+    db.commit()
+
+    try:
+        published = await publish_jobs(jobs) if jobs else 0
+    except Exception as e:
+        # Pages stay at their stage unclaimed; a worker's reaper publishes them once the lease passes
+        raise HTTPException(status_code=503, detail=f"Pages queued but publishing failed: {str(e)}")
+    return PipelineStartOut(site_id=site_id, published=published,
+                            by_stage=dict(Counter(stage.name for stage, _, _ in jobs)))
+
+@router.get("/sites/{site_id}/status", response_model=PipelineStatusOut)
+def site_status(site_id: int, claims: dict = Depends(get_current_user_claims), db: Session = Depends(get_db)):
+    rows = db.execute(
+        select(Page.status, func.count(Page.id), func.count(Page.claimed_by))
+        .where(Page.site_id == site_id)
+        .group_by(Page.status)
+    ).all()
+    failed = db.execute(
+        select(Page).where(Page.site_id == site_id, Page.status.in_(list(STAGE_BY_STATUS)), is_failed())
+    ).scalars().all()
+    return PipelineStatusOut(
+        site_id=site_id,
+        total=sum(count for _, count, _ in rows),
+        by_status={status: count for status, count, _ in rows},
+        claimed=sum(claimed for _, _, claimed in rows),
+        failed=[PipelineFailedPage(id=page.id, page_url=page.page_url, stage=STAGE_BY_STATUS[page.status].name,
+                                   attempts=page.stage_attempts, last_error=page.last_error) for page in failed],
+    )
@@ -0,0 +1,23 @@
+from sqlalchemy import inspect, text
+
+# create_all only creates missing tables; columns added to existing tables are listed here
+# as (table, column, column DDL, index name or None)
+ADDED_COLUMNS = [
+    ("page", "claimed_by", "VARCHAR(100) NULL", "ix_page_claimed_by"),
+    ("page", "claimed_at", "DATETIME NULL", None),
+    ("page", "pipeline_options", "JSON NULL", None),
+    ("page", "stage_attempts", "INT NOT NULL DEFAULT 0", None),
+    ("page", "last_error", "TEXT NULL", None),
+    ("page", "published_at", "DATETIME NULL", None),
+]
+
+def run_migrations(engine):
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table, column, ddl, index in ADDED_COLUMNS:
+            if not inspector.has_table(table):
+                continue
+            if column not in {c["name"] for c in inspector.get_columns(table)}:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+            if index and index not in {i["name"] for i in inspector.get_indexes(table)}:
+                connection.execute(text(f"CREATE INDEX {index} ON {table} ({column})"))
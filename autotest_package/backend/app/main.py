@@ -1,8 +1,10 @@
 from fastapi import FastAPI
 from app.db.session import engine, SessionLocal
 from app.db.base import Base
+from app.db.migrations import run_migrations
 from app.api.v1.auth import router as auth_router
 from app.api.v1.users import router as users_router
+from app.api.v1.pipeline import router as pipeline_router
 from app.db.seed import seed_roles, seed_admin_user, seed_settings, seed_prompt_setting
 
 # IMPORTANT: import models before create_all
@@ -16,6 +18,7 @@ def root():
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 # Seed roles and admin on startup
 @app.on_event("startup")
@@ -32,3 +35,4 @@ def startup_seed():
 # Routers
 app.include_router(auth_router)
 app.include_router(users_router)
+app.include_router(pipeline_router)
@@ -21,5 +21,14 @@ class Page(Base):
     created_by: Mapped[int | None] = mapped_column(ForeignKey("user.id"), nullable=True)
     updated_on: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     updated_by: Mapped[int | None] = mapped_column(ForeignKey("user.id"), nullable=True)
+    # Pipeline worker processing the page's current stage; stale claims are released by the reaper
+    claimed_by: Mapped[str | None] = mapped_column(String(100), nullable=True, index=True)
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    pipeline_options: Mapped[dict | None] = mapped_column(JSON, nullable=True)  # run options, to republish stalled stages
+    # Failed runs of the current stage; at MAX_STAGE_ATTEMPTS the page is failed and waits for a restart
+    stage_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # When the broker confirmed the job of the current stage; None until it is published
+    published_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     site: Mapped["Site | None"] = relationship("Site", back_populates="pages")
@@ -0,0 +1 @@
+from app.pipeline.stages import Stage, STAGES, STAGE_BY_NAME, STAGE_BY_STATUS, REVIEW_STATUS
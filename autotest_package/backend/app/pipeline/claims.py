@@ -0,0 +1,131 @@
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Callable
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.orm import Session
+from app.models.page import Page
+from app.pipeline.stages import Stage, STAGE_BY_STATUS
+
+WORKER_ID = os.getenv("PIPELINE_WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+# A claim older than this is treated as abandoned by a crashed worker
+CLAIM_LEASE = timedelta(seconds=int(os.getenv("PIPELINE_CLAIM_LEASE", "1800")))
+# Runs of a stage before the page is failed; permanent errors fail it at once
+MAX_STAGE_ATTEMPTS = int(os.getenv("PIPELINE_MAX_STAGE_ATTEMPTS", "3"))
+
+def is_failed():
+    """Filter matching pages whose stage failed for good; the reaper and workers leave them alone."""
+    return Page.stage_attempts >= MAX_STAGE_ATTEMPTS
+
+def claim_page(db: Session, page_id: int, stage: Stage, worker_id: str = WORKER_ID) -> Page | None:
+    """Claim a page waiting at `stage`; returns None if another worker holds it or it moved on."""
+    now = datetime.now()
+    # SKIP LOCKED: a row being claimed or completed elsewhere is treated as taken instead of waited on
+    page = db.execute(
+        select(Page)
+        .where(
+            Page.id == page_id,
+            Page.status == stage.status,
+            ~is_failed(),
+            or_(Page.claimed_by.is_(None), Page.claimed_at < now - CLAIM_LEASE),
+        )
+        .with_for_update(skip_locked=True)
+    ).scalar_one_or_none()
+    if page is None:
+        db.rollback()
+        return None
+    page.claimed_by = worker_id
+    page.claimed_at = now
+    page.updated_on = now
+    db.commit()
+    return page
+
+def complete_stage(db: Session, page_id: int, stage: Stage, status: str,
+                   apply: Callable[[Session, Page], None] | None = None, worker_id: str = WORKER_ID) -> bool:
+    """Write a stage's results and advance the page in one transaction, if the claim is still ours."""
+    page = db.execute(
+        select(Page)
+        .where(Page.id == page_id, Page.status == stage.status, Page.claimed_by == worker_id)
+        .with_for_update()
+    ).scalar_one_or_none()
+    if page is None:
+        # The lease expired and the reaper handed the page to another worker
+        db.rollback()
+        return False
+    if apply:
+        apply(db, page)
+    page.status = status
+    page.claimed_by = None
+    page.claimed_at = None
+    page.stage_attempts = 0
+    page.last_error = None
+    # The next stage's job isn't published yet
+    page.published_at = None
+    page.updated_on = datetime.now()
+    db.commit()
+    return True
+
+def mark_published(db: Session, page_ids: list[int]) -> None:
+    """Record that the broker confirmed the jobs of these pages' current stages."""
+    if not page_ids:
+        return
+    db.execute(update(Page).where(Page.id.in_(page_ids)).values(published_at=datetime.now()))
+    db.commit()
+
+def record_failure(db: Session, page_id: int, error: str, permanent: bool, worker_id: str = WORKER_ID) -> bool:
+    """Release a failed stage's claim and count the attempt; returns True if the page is now failed."""
+    page = db.execute(
+        select(Page).where(Page.id == page_id, Page.claimed_by == worker_id).with_for_update()
+    ).scalar_one_or_none()
+    if page is None:
+        db.rollback()
+        return False
+    page.stage_attempts = MAX_STAGE_ATTEMPTS if permanent else page.stage_attempts + 1
+    page.last_error = error[:2000]
+    page.claimed_by = None
+    page.claimed_at = None
+    page.updated_on = datetime.now()
+    db.commit()
+    return page.stage_attempts >= MAX_STAGE_ATTEMPTS
+
+def reap_stalled_pages(db: Session, queued_statuses: set[str], limit: int = 500) -> list[tuple[int, Stage, dict]]:
+    """
+    Release pages whose stage made no progress within the lease so their jobs can be published again:
+    claims held by crashed workers, unclaimed pages whose job was never published (e.g., a crash between
+    commit and publish), and unclaimed pages published longer than a lease ago whose stage queue is drained
+    (the job was dropped). Pages at a stage in `queued_statuses`, whose queue still holds ready messages,
+    may still have their job waiting, so they aren't republished; a long backlog doesn't pile up duplicates.
+    An expired claim counts as a failed attempt, so a page that keeps killing workers ends up failed.
+    """
+    now = datetime.now()
+    stale_before = now - CLAIM_LEASE
+    drained = [status for status in STAGE_BY_STATUS if status not in queued_statuses]
+    pages = db.execute(
+        select(Page)
+        .where(
+            Page.status.in_(list(STAGE_BY_STATUS)),
+            ~is_failed(),
+            or_(
+                and_(Page.claimed_by.is_not(None), Page.claimed_at < stale_before),
+                and_(Page.claimed_by.is_(None), Page.published_at.is_(None),
+                     or_(Page.updated_on.is_(None), Page.updated_on < stale_before)),
+                and_(Page.claimed_by.is_(None), Page.published_at < stale_before, Page.status.in_(drained)),
+            ),
+        )
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    stalled = []
+    for page in pages:
+        if page.claimed_by is not None:
+            page.stage_attempts += 1
+            page.last_error = f"Claim of worker {page.claimed_by} expired"
+        page.claimed_by = None
+        page.claimed_at = None
+        # Restart the lease so the page isn't republished on every pass if publishing fails
+        page.updated_on = now
+        page.published_at = None
+        if page.stage_attempts < MAX_STAGE_ATTEMPTS:
+            stalled.append((page.id, STAGE_BY_STATUS[page.status], page.pipeline_options or {}))
+    db.commit()
+    return stalled
@@ -0,0 +1,143 @@
+from datetime import datetime
+from functools import partial
+from sqlalchemy import select
+from handlers import register_handler, get_generator, PermanentJobError
+from app.db.session import SessionLocal
+from app.models.page import Page
+from app.models.test_scenario import TestScenario
+from app.models.test_case import TestCase
+from app.pipeline.stages import STAGES, STAGE_BY_STATUS, Stage, next_status
+from app.pipeline.claims import claim_page, complete_stage, record_failure
+from app.pipeline.publisher import publish_job_threadsafe
+
+# Each stage function does the slow work outside any transaction and returns apply(db, page),
+# which writes the results in the transaction that advances the page.
+
+def _credentials(options: dict) -> tuple[str | None, str | None]:
+    return options.get("username"), options.get("password")
+
+def generate_metadata(page: dict, options: dict):
+    generator = get_generator()
+    username, password = _credentials(options)
+    require_login = generator._open_page(page["page_url"], username, password)
+    if require_login is None:
+        raise PermanentJobError(f"'{page['page_url']}' requires authentication, resubmit the run with credentials")
+    driver = generator.driver
+    static_metadata = {"title": driver.title, "url": driver.current_url, **generator.extract_static_metadata()}
+    minimized_html = generator._minimize_page_source(driver.page_source)
+    page_metadata = {**static_metadata, **generator.llm_page_analysis(minimized_html), "require_login": require_login}
+
+    def apply(db, row: Page):
+        row.page_title = (static_metadata["title"] or "")[:200] or None
+        row.page_source = minimized_html
+        row.page_metadata = page_metadata
+    return apply
+
+def generate_test_scenarios(page: dict, options: dict):
+    test_cases = get_generator().generate_page_specific_tests(page["page_metadata"], page["page_source"])
+    if not test_cases:
+        raise RuntimeError(f"No test cases generated for '{page['page_url']}'")
+    now = datetime.now()
+
+    def apply(db, row: Page):
+        # Replace scenarios of an earlier run of this stage (cascades to their test cases)
+        for scenario in db.execute(select(TestScenario).where(
+                TestScenario.page_id == row.id, TestScenario.type == "auto-generated")).scalars():
+            db.delete(scenario)
+        for number, test_case in enumerate(test_cases, start=1):
+            db.add(TestScenario(
+                page_id=row.id,
+                title=(test_case.get("name") or f"Test case {number}")[:200],
+                data=test_case,
+                type="auto-generated",
+                created_on=now,
+                created_by=options.get("user_id"),
+            ))
+    return apply
+
+def generate_test_cases(page: dict, options: dict):
+    if not options.get("user_id"):
+        raise PermanentJobError("Test cases need the user_id of the run")
+    now = datetime.now()
+
+    def apply(db, row: Page):
+        scenarios = db.execute(select(TestScenario).where(
+            TestScenario.page_id == row.id, TestScenario.type == "auto-generated")).scalars().all()
+        # ORM deletes so the cases' executions cascade
+        for test_case in db.execute(select(TestCase).where(
+                TestCase.page_id == row.id, TestCase.type == "auto-generated")).scalars():
+            db.delete(test_case)
+        db.flush()
+        for scenario in scenarios:
+            data = scenario.data or {}
+            db.add(TestCase(
+                page_id=row.id,
+                test_scenario_id=scenario.id,
+                title=scenario.title,
+                type="auto-generated",
+                data=data,
+                expected_outcome={"expected_results": data.get("expected_results")} if data.get("expected_results") else None,
+                created_on=now,
+                created_by=options["user_id"],
+            ))
+    return apply
+
+def generate_test_scripts(page: dict, options: dict):
+    with SessionLocal() as db:
+        scenarios = [(scenario.id, scenario.data) for scenario in db.execute(select(TestScenario).where(
+            TestScenario.page_id == page["id"], TestScenario.type == "auto-generated")).scalars()]
+    username, password = _credentials(options)
+    require_login = bool((page["page_metadata"] or {}).get("require_login") and username and password)
+    scripts = get_generator().generate_scripts_for_test_cases(
+        [data for _, data in scenarios], page["page_metadata"], page["page_source"], require_login, username, password
+    )
+
+    def apply(db, row: Page):
+        for (scenario_id, _), (script, _, script_path) in zip(scenarios, scripts):
+            scenario = db.get(TestScenario, scenario_id)
+            if scenario is not None and script:
+                scenario.script = script
+                scenario.script_path = script_path
+    return apply
+
+STAGE_WORK = {
+    "metadata": generate_metadata,
+    "test_scenarios": generate_test_scenarios,
+    "test_cases": generate_test_cases,
+    "test_scripts": generate_test_scripts,
+}
+
+def run_stage(stage: Stage, payload: dict) -> dict:
+    """Claim the page, run the stage, advance the page and publish its next stage."""
+    page_id = payload.get("page_id")
+    if not page_id:
+        raise PermanentJobError("Job payload is missing 'page_id'")
+    with SessionLocal() as db:
+        row = claim_page(db, page_id, stage)
+        if row is None:
+            # Duplicate or stale job: the page is claimed elsewhere or already past this stage
+            return {"page_id": page_id, "stage": stage.name, "skipped": True}
+        page = {"id": row.id, "page_url": row.page_url, "page_source": row.page_source, "page_metadata": row.page_metadata}
+
+    try:
+        apply = STAGE_WORK[stage.name](page, payload)
+    except Exception as e:
+        with SessionLocal() as db:
+            if record_failure(db, page_id, f"{stage.name}: {str(e)}", isinstance(e, PermanentJobError)):
+                # Retrying can't help now; reject instead of requeueing, the page waits for /start
+                raise PermanentJobError(f"Page {page_id} failed at {stage.name}: {str(e)}") from e
+        raise
+
+    status = next_status(stage, payload)
+    with SessionLocal() as db:
+        if not complete_stage(db, page_id, stage, status, apply):
+            return {"page_id": page_id, "stage": stage.name, "lost_claim": True}
+
+    # A crash before this publish leaves the page unclaimed at the next stage; the reaper republishes it
+    next_stage = STAGE_BY_STATUS.get(status)
+    if next_stage:
+        publish_job_threadsafe(next_stage, page_id, {k: v for k, v in payload.items() if k != "page_id"})
+    return {"page_id": page_id, "stage": stage.name, "status": status}
+
+for _stage in STAGES:
+    register_handler(_stage.job_type)(partial(run_stage, _stage))
@@ -0,0 +1,63 @@
+import asyncio
+import os
+from collections import defaultdict
+from messaging import RabbitMQPublisher
+from app.db.session import SessionLocal
+from app.pipeline.claims import mark_published
+from app.pipeline.stages import Stage, STAGES, build_job
+
+RABBITMQ_URL = os.getenv("RABBITMQ_URL")
+
+publisher = RabbitMQPublisher(RABBITMQ_URL) if RABBITMQ_URL else None
+_loop: asyncio.AbstractEventLoop | None = None
+_connect_lock = asyncio.Lock()
+
+async def get_publisher() -> RabbitMQPublisher:
+    global _loop
+    if not publisher:
+        raise RuntimeError("RABBITMQ_URL not configured")
+    if not publisher.is_connected:
+        async with _connect_lock:
+            # Re-check: a concurrent caller may have connected while this one waited
+            if not publisher.is_connected:
+                await publisher.connect()
+    _loop = asyncio.get_running_loop()
+    return publisher
+
+async def publish_jobs(jobs: list[tuple[Stage, int, dict]]) -> int:
+    """Publish (stage, page_id, options) jobs, one confirmed batch per stage queue."""
+    rabbitmq = await get_publisher()
+    by_queue = defaultdict(list)
+    page_ids = defaultdict(list)
+    for stage, page_id, options in jobs:
+        by_queue[stage.queue].append(build_job(stage, page_id, options))
+        page_ids[stage.queue].append(page_id)
+    published = 0
+    for queue_name, bodies in by_queue.items():
+        published += await rabbitmq.publish_batch(queue_name, bodies)
+        # Confirmed jobs are only republished by the reaper once their queue drained without running them
+        await asyncio.to_thread(_mark_published, page_ids[queue_name])
+    return published
+
+def _mark_published(page_ids: list[int]) -> None:
+    with SessionLocal() as db:
+        mark_published(db, page_ids)
+
+async def queued_statuses() -> set[str]:
+    """Statuses of the stages whose queue holds ready messages (all of them if the broker can't tell)."""
+    rabbitmq = await get_publisher()
+    statuses = set()
+    for stage in STAGES:
+        try:
+            queue = await rabbitmq.declare_queue(stage.queue, durable=True)
+            if queue.declaration_result.message_count:
+                statuses.add(stage.status)
+        except Exception:
+            statuses.add(stage.status)
+    return statuses
+
+def publish_job_threadsafe(stage: Stage, page_id: int, options: dict) -> None:
+    """Publish from a consumer worker thread on the event loop owning the connection."""
+    if _loop is None:
+        raise RuntimeError("Pipeline publisher is not connected")
+    asyncio.run_coroutine_threadsafe(publish_jobs([(stage, page_id, options)]), _loop).result()
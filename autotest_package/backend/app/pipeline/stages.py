@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+
+# Page.status while a page waits for or runs a stage; a worker claims the page before running it
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    status: str
+    next_status: str
+
+    @property
+    def job_type(self) -> str:
+        return f"pipeline.{self.name}"
+
+    @property
+    def queue(self) -> str:
+        return f"autotest.pipeline.{self.name}"
+
+STAGES = [
+    Stage("metadata", "generating_metadata", "generating_test_scenarios"),
+    Stage("test_scenarios", "generating_test_scenarios", "generating_test_cases"),
+    Stage("test_cases", "generating_test_cases", "generating_test_scripts"),
+    Stage("test_scripts", "generating_test_scripts", "done"),
+]
+STAGE_BY_NAME = {stage.name: stage for stage in STAGES}
+STAGE_BY_STATUS = {stage.status: stage for stage in STAGES}
+
+# Pages rest here instead of moving on to script generation when a run doesn't generate scripts
+REVIEW_STATUS = "test_cases_generated"
+
+def next_status(stage: Stage, options: dict) -> str:
+    if stage.next_status == "generating_test_scripts" and not options.get("generate_scripts", True):
+        return REVIEW_STATUS
+    return stage.next_status
+
+def build_job(stage: Stage, page_id: int, options: dict) -> dict:
+    # Run options (credentials, generate_scripts, user_id) travel with the page from stage to stage
+    return {"job_type": stage.job_type, "payload": {**options, "page_id": page_id}}
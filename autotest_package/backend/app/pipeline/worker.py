@@ -0,0 +1,83 @@
+"""
+Pipeline worker: consumes stage queues and runs page stages with autotest.
+Start one per node from the backend directory, e.g.
+
+    python -m app.pipeline.worker --stages metadata,test_scenarios --workers 2
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import handlers
+from consumers import ConsumerManager
+from app.db.session import SessionLocal
+from app.pipeline import jobs  # noqa: F401  <- registers the stage handlers
+from app.pipeline.claims import WORKER_ID, reap_stalled_pages
+from app.pipeline.publisher import get_publisher, publish_jobs, queued_statuses
+from app.pipeline.stages import STAGES, STAGE_BY_NAME
+
+logger = logging.getLogger(__name__)
+
+REAP_INTERVAL = int(os.getenv("PIPELINE_REAP_INTERVAL", "60"))
+
+async def reap_forever(stop: asyncio.Event):
+    # Every worker reaps; SKIP LOCKED keeps two reapers from republishing the same page
+    while not stop.is_set():
+        try:
+            # Jobs of stages with a backlog may still be waiting in their queue
+            busy = await queued_statuses()
+            with SessionLocal() as db:
+                stalled = await asyncio.to_thread(reap_stalled_pages, db, busy)
+            if stalled:
+                await publish_jobs(stalled)
+                logger.info(f"Republished {len(stalled)} stalled pipeline jobs")
+        except Exception as e:
+            logger.error(f"Pipeline reaper failed: {str(e)}")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=REAP_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+async def run(stage_names: list[str], prefetch: int, workers: int, reap: bool):
+    rabbitmq = await get_publisher()
+    manager = ConsumerManager()
+    for name in stage_names:
+        stage = STAGE_BY_NAME[name]
+        await manager.start(rabbitmq.connection, stage.queue, WORKER_ID, prefetch, workers)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    reaper = asyncio.create_task(reap_forever(stop)) if reap else None
+    logger.info(f"Pipeline worker {WORKER_ID} consuming {', '.join(stage_names)}")
+
+    await stop.wait()
+    logger.info("Stopping pipeline worker, waiting for in-flight stages")
+    if reaper:
+        await reaper
+    await manager.stop_all()
+    handlers.close_generators()
+    await rabbitmq.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run distributed pipeline stages")
+    parser.add_argument("--stages", default="all",
+                        help=f"Comma-separated stages to consume ({', '.join(STAGE_BY_NAME)}) or 'all'")
+    parser.add_argument("--prefetch", type=int, default=int(os.getenv("CONSUMER_PREFETCH", "2")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("CONSUMER_WORKERS", "1")),
+                        help="Pages processed at once per stage, each on its own browser")
+    parser.add_argument("--no-reaper", action="store_true", help="Don't republish stalled pages from this worker")
+    args = parser.parse_args()
+
+    stage_names = [stage.name for stage in STAGES] if args.stages == "all" else [name.strip() for name in args.stages.split(",")]
+    unknown = [name for name in stage_names if name not in STAGE_BY_NAME]
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(unknown)}")
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    asyncio.run(run(stage_names, args.prefetch, args.workers, not args.no_reaper))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+
+class PipelineStart(BaseModel):
+    generate_scripts: bool = True
+    # Credentials travel with the jobs only; they are never stored
+    username: str | None = None
+    password: str | None = None
+
+class PipelineStartOut(BaseModel):
+    site_id: int
+    published: int
+    by_stage: dict[str, int]
+
+class PipelineFailedPage(BaseModel):
+    id: int
+    page_url: str
+    stage: str
+    attempts: int
+    last_error: str | None = None
+
+class PipelineStatusOut(BaseModel):
+    site_id: int
+    total: int
+    by_status: dict[str, int]
+    claimed: int
+    # Pages whose stage failed for good; /start retries them
+    failed: list[PipelineFailedPage] = []
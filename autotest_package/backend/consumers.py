@@ -0,0 +1,213 @@
+"""
+Consumers module for processing queued jobs with bounded worker pools
+"""
+import asyncio
+import json
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import aio_pika
+
+import handlers
+
+logger = logging.getLogger(__name__)
+
+
+class QueueConsumer:
+    """Consumes one queue: the broker delivers up to `prefetch` unacked messages, `workers` threads run handlers"""
+
+    def __init__(self, connection: aio_pika.abc.AbstractRobustConnection, queue_name: str,
+                 consumer_name: str = "default", prefetch: int = 10, workers: int = 4):
+        """
+        Initialize consumer
+
+        Args:
+            connection (AbstractRobustConnection): Connection to open the consumer channel on
+            queue_name (str): Queue to consume, declared durable
+            consumer_name (str): Name reported by the consumer endpoints
+            prefetch (int): Maximum number of unacknowledged messages delivered to this consumer
+            workers (int): Number of handler threads (jobs processed at once)
+        """
+        if prefetch < 1 or workers < 1:
+            raise ValueError("prefetch and workers must be at least 1")
+        self.connection = connection
+        self.queue_name = queue_name
+        self.consumer_name = consumer_name
+        # More workers than prefetched messages would never be busy
+        self.prefetch = max(prefetch, workers)
+        self.workers = workers
+        self.status = "starting"
+        self.started_at = datetime.now().isoformat()
+        self.stopped_at: Optional[str] = None
+        self.processed = 0
+        self.failed = 0
+        self.error: Optional[str] = None
+        self._channel = None
+        self._queue = None
+        self._consumer_tag = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"consumer-{queue_name}")
+        self._slots = asyncio.Semaphore(workers)
+        self._in_flight = set()
+        self._stopping = False
+
+    async def start(self):
+        """Open a channel with the prefetch limit and start consuming"""
+        try:
+            self._channel = await self.connection.channel()
+            await self._channel.set_qos(prefetch_count=self.prefetch)
+            self._queue = await self._channel.declare_queue(self.queue_name, durable=True)
+            self._consumer_tag = await self._queue.consume(self._on_message)
+            self.status = "running"
+            logger.info(f"Consumer '{self.consumer_name}' on '{self.queue_name}' started "
+                        f"(prefetch={self.prefetch}, workers={self.workers})")
+        except Exception as e:
+            self.status = "error"
+            self.error = str(e)
+            self._executor.shutdown(wait=False)
+            raise
+
+    async def _on_message(self, message: aio_pika.abc.AbstractIncomingMessage):
+        task = asyncio.current_task()
+        self._in_flight.add(task)
+        try:
+            async with self._slots:
+                if self._stopping:
+                    # Delivered before the consumer was cancelled, hand it back to another consumer
+                    await message.nack(requeue=True)
+                    return
+                await self._process(message)
+        finally:
+            self._in_flight.discard(task)
+
+    async def _process(self, message: aio_pika.abc.AbstractIncomingMessage):
+        try:
+            job = json.loads(message.body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            logger.error(f"Rejecting undecodable message {message.message_id} on '{self.queue_name}': {str(e)}")
+            self.failed += 1
+            await message.reject(requeue=False)
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            # Handlers block (browser, LLM), so run them off the event loop; ack/nack stay on it
+            result = await loop.run_in_executor(self._executor, handlers.dispatch, job)
+        except handlers.PermanentJobError as e:
+            logger.error(f"Rejecting message {message.message_id} on '{self.queue_name}': {str(e)}")
+            self.failed += 1
+            await message.reject(requeue=False)
+        except Exception as e:
+            # Retry once on another delivery, then give up so a poison message can't loop forever
+            requeue = not message.redelivered
+            logger.error(f"Job from message {message.message_id} on '{self.queue_name}' failed "
+                         f"({'requeued' if requeue else 'dropped'}): {str(e)}")
+            self.failed += 1
+            await message.nack(requeue=requeue)
+        else:
+            logger.debug(f"Message {message.message_id} on '{self.queue_name}' processed: {result}")
+            self.processed += 1
+            await message.ack()
+
+    async def stop(self, timeout: Optional[float] = None):
+        """
+        Stop consuming, let in-flight jobs finish and close the channel
+
+        Args:
+            timeout (float): Seconds to wait for in-flight jobs, unbounded if None
+        """
+        if self.status in ("stopping", "stopped"):
+            return
+        self.status = "stopping"
+        self._stopping = True
+        try:
+            if self._queue is not None and self._consumer_tag is not None:
+                await self._queue.cancel(self._consumer_tag)
+            if self._in_flight:
+                done, pending = await asyncio.wait(list(self._in_flight), timeout=timeout)
+                if pending:
+                    logger.warning(f"{len(pending)} jobs still running on '{self.queue_name}' after {timeout}s")
+            if self._channel is not None and not self._channel.is_closed:
+                await self._channel.close()
+        finally:
+            self._executor.shutdown(wait=False)
+            self.status = "stopped"
+            self.stopped_at = datetime.now().isoformat()
+            logger.info(f"Consumer '{self.consumer_name}' on '{self.queue_name}' stopped "
+                        f"(processed {self.processed} messages, {self.failed} failed)")
+
+    def get_info(self) -> Dict[str, Any]:
+        """Consumer state for the consumer endpoints"""
+        return {
+            "queue": self.queue_name,
+            "name": self.consumer_name,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "status": self.status,
+            "messages_processed": self.processed,
+            "prefetch": self.prefetch,
+            "workers": self.workers,
+            "in_flight": len(self._in_flight),
+            "messages_failed": self.failed,
+            "error": self.error
+        }
+
+
+class ConsumerManager:
+    """Registry of queue consumers keyed by consumer id"""
+
+    def __init__(self):
+        self.consumers: Dict[str, QueueConsumer] = {}
+
+    @staticmethod
+    def create_consumer_id(queue_name: str, consumer_name: str) -> str:
+        return f"{queue_name}_{consumer_name}_{uuid.uuid4().hex[:8]}"
+
+    async def start(self, connection, queue_name: str, consumer_name: str, prefetch: int, workers: int):
+        """
+        Start a consumer and register it
+
+        Returns:
+            tuple: (consumer_id, QueueConsumer)
+        """
+        consumer_id = self.create_consumer_id(queue_name, consumer_name)
+        consumer = QueueConsumer(connection, queue_name, consumer_name, prefetch, workers)
+        self.consumers[consumer_id] = consumer
+        await consumer.start()
+        return consumer_id, consumer
+
+    def find(self, queue_name: str, consumer_name: str, statuses=("starting", "running")) -> Optional[str]:
+        """Return the id of a consumer of the queue with the given name and status, or None"""
+        for consumer_id, consumer in self.consumers.items():
+            if consumer.queue_name == queue_name and consumer.consumer_name == consumer_name and consumer.status in statuses:
+                return consumer_id
+        return None
+
+    def active(self) -> Dict[str, QueueConsumer]:
+        return {consumer_id: consumer for consumer_id, consumer in self.consumers.items()
+                if consumer.status in ("starting", "running")}
+
+    async def stop(self, consumer_id: str, timeout: Optional[float] = None) -> bool:
+        consumer = self.consumers.get(consumer_id)
+        if consumer is None:
+            return False
+        await consumer.stop(timeout)
+        return True
+
+    async def stop_all(self, timeout: Optional[float] = None) -> Dict[str, QueueConsumer]:
+        active = self.active()
+        await asyncio.gather(*(consumer.stop(timeout) for consumer in active.values()))
+        return active
+
+    def get_consumers(self) -> Dict[str, Dict[str, Any]]:
+        # Return JSON-serializable data only
+        return {consumer_id: consumer.get_info() for consumer_id, consumer in self.consumers.items()}
+
+    def cleanup(self) -> int:
+        """Remove stopped or failed consumers from the registry"""
+        finished = [consumer_id for consumer_id, consumer in self.consumers.items() if consumer.status in ("stopped", "error")]
+        for consumer_id in finished:
+            del self.consumers[consumer_id]
+        return len(finished)
@@ -0,0 +1,184 @@
+"""
+Handlers module mapping queued job types to autotest pipeline work
+
+A job message is JSON of the form {"job_type": "page_analysis", "payload": {...}}.
+Handlers run on consumer worker threads and may block (Selenium, LLM calls);
+each worker thread drives its own WebTestGenerator and browser.
+"""
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+HANDLERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+
+# Messages without a job_type (e.g., sent through /send-message) are only logged
+DEFAULT_JOB_TYPE = "log"
+
+
+class PermanentJobError(Exception):
+    """The job can never succeed (unknown type, invalid payload); it is rejected instead of retried"""
+
+
+def register_handler(job_type: str):
+    """
+    Register a function as the handler of a job type
+
+    Args:
+        job_type (str): Value of the message's job_type field
+
+    Returns:
+        callable: Decorator registering the handler
+    """
+    def decorator(func):
+        HANDLERS[job_type] = func
+        return func
+    return decorator
+
+
+def dispatch(job: Dict[str, Any]) -> Any:
+    """
+    Run the handler of a decoded job message
+
+    Args:
+        job (dict): Decoded message body
+
+    Returns:
+        Any: Result of the handler
+
+    Raises:
+        PermanentJobError: If the message can't be handled
+    """
+    if not isinstance(job, dict):
+        raise PermanentJobError("Job message must be a JSON object")
+    job_type = job.get("job_type", DEFAULT_JOB_TYPE)
+    handler = HANDLERS.get(job_type)
+    if handler is None:
+        raise PermanentJobError(f"No handler registered for job type '{job_type}'")
+    payload = job.get("payload", job if job_type == DEFAULT_JOB_TYPE else {})
+    return handler(payload)
+
+
+def _require(payload: Dict[str, Any], key: str) -> Any:
+    if not payload.get(key):
+        raise PermanentJobError(f"Job payload is missing '{key}'")
+    return payload[key]
+
+
+# One generator (and browser) per worker thread, reused across jobs
+_local = threading.local()
+_generators = []
+_generators_lock = threading.Lock()
+
+
+def get_generator():
+    """Return the WebTestGenerator of the current worker thread, creating it on first use"""
+    generator = getattr(_local, "generator", None)
+    if generator is None:
+        from autotest import WebTestGenerator
+        generator = WebTestGenerator(
+            log_level=os.getenv("AUTOTEST_LOG_LEVEL", "INFO"),
+            llm_provider_choice=int(os.getenv("AUTOTEST_LLM_PROVIDER", "1")),
+            interactive=False
+        )
+        _local.generator = generator
+        with _generators_lock:
+            _generators.append(generator)
+    return generator
+
+
+def close_generators():
+    """Quit the browsers of all worker thread generators"""
+    with _generators_lock:
+        generators = list(_generators)
+        _generators.clear()
+    for generator in generators:
+        try:
+            generator.close_browser()
+        except Exception as e:
+            logger.warning(f"Failed to close generator browser: {str(e)}")
+
+
+@register_handler(DEFAULT_JOB_TYPE)
+def log_message(payload: Dict[str, Any]) -> None:
+    logger.info(f"Received message: {json.dumps(payload, default=str)[:500]}")
+
+
+@register_handler("page_analysis")
+def analyze_page(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Analyze a page, generate its test cases and the scripts of the selected test cases
+
+    Payload:
+        url (str): Page URL
+        username (str), password (str): Optional credentials
+        no_cache (bool): Whether to ignore stored analysis results
+    """
+    url = _require(payload, "url")
+    generator = get_generator()
+    username, password = payload.get("username"), payload.get("password")
+    require_login = generator._open_page(url, username, password)
+    if require_login is None:
+        raise PermanentJobError(f"'{url}' requires authentication but no credentials were provided")
+    regenerate, first_time, dom_fingerprint = generator._resolve_cache_state(url, payload.get("no_cache", False))
+    analysis = generator.analyze_page(
+        regenerate=regenerate, first_time=first_time, context=url, require_login=require_login,
+        username=username, password=password, dom_fingerprint=dom_fingerprint
+    )
+    return {
+        "url": url,
+        "test_cases": len(analysis["test_cases"] or []),
+        "scripts": len(analysis["scripts"] or [])
+    }
+
+
+@register_handler("script_generation")
+def generate_scripts(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate scripts for stored test cases of an analyzed page
+
+    Payload:
+        url (str): Page URL, analyzed before
+        test_case_numbers (list): Optional 1-based test case numbers, all test cases by default
+        username (str), password (str): Optional credentials used in login steps
+    """
+    from autotest.db.database import SessionLocal
+    from autotest.tables.page import Page
+
+    url = _require(payload, "url")
+    with SessionLocal() as db:
+        page = db.query(Page).filter(Page.page_url == url).first()
+        if not page or not page.test_cases:
+            raise PermanentJobError(f"No stored test cases for '{url}', run page_analysis first")
+        test_cases, page_metadata, minimized_html = page.test_cases, page.page_metadata, page.page_source
+
+    numbers = payload.get("test_case_numbers") or range(1, len(test_cases) + 1)
+    selected = [test_cases[number - 1] for number in numbers if 1 <= number <= len(test_cases)]
+    username, password = payload.get("username"), payload.get("password")
+    scripts = get_generator().generate_scripts_for_test_cases(
+        selected, page_metadata, minimized_html, bool(username and password), username, password
+    )
+    return {"url": url, "script_paths": [script_path for _, _, script_path in scripts if script_path]}
+
+
+@register_handler("script_execution")
+def execute_scripts(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Execute generated test scripts
+
+    Payload:
+        script_paths (list): Paths of generated scripts
+    """
+    generator = get_generator()
+    results = []
+    for script_path in _require(payload, "script_paths"):
+        if not os.path.exists(script_path):
+            results.append({"script_path": script_path, "success": False, "error": "Script not found"})
+            continue
+        with open(script_path, "r") as f:
+            result = generator.execute_test_script(f.read())
+        results.append({"script_path": script_path, "success": result.get("success", False)})
+    return {"results": results}
@@ -35,12 +35,14 @@ from sqlalchemy import create_engine, text, MetaData, Table, Column, Integer, St
 from pydantic import BaseModel
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
-import pika
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import asyncio
 import aio_pika
 import logging
+from messaging import RabbitMQPublisher
+from consumers import ConsumerManager
+import handlers
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -54,6 +56,40 @@ engine = create_engine(DATABASE_URL, echo=True) if DATABASE_URL else None
 
 # RabbitMQ connection
 RABBITMQ_URL = os.getenv("RABBITMQ_URL")
+RABBITMQ_CHANNEL_POOL_SIZE = int(os.getenv("RABBITMQ_CHANNEL_POOL_SIZE", "8"))
+
+# One robust connection for the app lifetime, shared by all publishing endpoints
+publisher = RabbitMQPublisher(RABBITMQ_URL, channel_pool_size=RABBITMQ_CHANNEL_POOL_SIZE) if RABBITMQ_URL else None
+# Serializes reconnects so concurrent requests don't each open (and leak) a connection
+publisher_connect_lock = asyncio.Lock()
+
+@app.on_event("startup")
+async def connect_rabbitmq():
+    if publisher:
+        try:
+            await publisher.connect()
+        except Exception as e:
+            # Endpoints report the error; connect_robust is retried on the next request
+            logger.error(f"Failed to connect to RabbitMQ: {str(e)}")
+
+@app.on_event("shutdown")
+async def close_rabbitmq():
+    # Let consumers finish their in-flight jobs before the connection goes away
+    await consumer_manager.stop_all(CONSUMER_STOP_TIMEOUT)
+    handlers.close_generators()
+    if publisher:
+        await publisher.close()
+
+async def get_publisher() -> RabbitMQPublisher:
+    """Return the connected publisher, connecting first if startup failed"""
+    if not publisher:
+        raise HTTPException(status_code=500, detail="RabbitMQ URL not configured")
+    if not publisher.is_connected:
+        async with publisher_connect_lock:
+            # Another request may have connected while this one waited
+            if not publisher.is_connected:
+                await publisher.connect()
+    return publisher
 
 # Pydantic models
 class QueueCreateRequest(BaseModel):
@@ -68,6 +104,12 @@ class MessageRequest(BaseModel):
     exchange: str = ""
     persistent: bool = True
 
+class BatchMessageRequest(BaseModel):
+    messages: List[Dict[Any, Any]]
+    routing_key: str = ""
+    exchange: str = ""
+    persistent: bool = True
+
 class ConsumeRequest(BaseModel):
     queue_name: str
     max_messages: int = 10
@@ -89,16 +131,11 @@ async def health_check():
 # RabbitMQ connection test
 @app.get("/rabbitmq-test")
 async def test_rabbitmq():
-    if not RABBITMQ_URL:
-        raise HTTPException(status_code=500, detail="RabbitMQ URL not configured")
-    
     try:
-        connection = pika.BlockingConnection(pika.URLParameters(RABBITMQ_URL))
-        channel = connection.channel()
+        rabbitmq = await get_publisher()
         
-        # Test queue creation
+        # Declare a test queue
         test_queue = "test_queue"
-        channel.queue_declare(queue=test_queue, durable=True)
         
         # Send a test message
         test_message = {
@@ -106,14 +143,7 @@ async def test_rabbitmq():
             "timestamp": datetime.now().isoformat()
         }
         
-        channel.basic_publish(
-            exchange='',
-            routing_key=test_queue,
-            body=json.dumps(test_message),
-            properties=pika.BasicProperties(delivery_mode=2)  # Make message persistent
-        )
-        
-        connection.close()
+        await rabbitmq.publish(test_queue, test_message)
         
         return {
             "rabbitmq": "connected",
@@ -122,21 +152,16 @@ async def test_rabbitmq():
             "message_sent": test_message
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"RabbitMQ connection failed: {str(e)}")
 
 @app.post("/send-message")
 async def send_message(queue_name: str, message: Dict[Any, Any]):
     """Send a message to a RabbitMQ queue"""
-    if not RABBITMQ_URL:
-        raise HTTPException(status_code=500, detail="RabbitMQ URL not configured")
-    
     try:
-        connection = pika.BlockingConnection(pika.URLParameters(RABBITMQ_URL))
-        channel = connection.channel()
-        
-        # Declare queue
-        channel.queue_declare(queue=queue_name, durable=True)
+        rabbitmq = await get_publisher()
         
         # Add timestamp to message
         message_with_timestamp = {
@@ -145,15 +170,8 @@ async def send_message(queue_name: str, message: Dict[Any, Any]):
             "sent_from": "fastapi_backend"
         }
         
-        # Send message
-        channel.basic_publish(
-            exchange='',
-            routing_key=queue_name,
-            body=json.dumps(message_with_timestamp),
-            properties=pika.BasicProperties(delivery_mode=2)
-        )
-        
-        connection.close()
+        # Publish on a pooled channel and wait for the broker's confirmation
+        await rabbitmq.publish(queue_name, message_with_timestamp)
         
         return {
             "status": "success",
@@ -161,33 +179,31 @@ async def send_message(queue_name: str, message: Dict[Any, Any]):
             "message_sent": message_with_timestamp
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to send message: {str(e)}")
 
 @app.get("/queue-info/{queue_name}")
 async def get_queue_info(queue_name: str):
     """Get information about a RabbitMQ queue"""
-    if not RABBITMQ_URL:
-        raise HTTPException(status_code=500, detail="RabbitMQ URL not configured")
-    
     try:
-        connection = pika.BlockingConnection(pika.URLParameters(RABBITMQ_URL))
-        channel = connection.channel()
+        rabbitmq = await get_publisher()
         
-        # Get queue information
-        method = channel.queue_declare(queue=queue_name, durable=True, passive=True)
-        message_count = method.method.message_count
-        consumer_count = method.method.consumer_count
-        
-        connection.close()
+        # Get queue info without creating it
+        queue = await rabbitmq.queue_exists(queue_name)
+        if queue is None:
+            raise LookupError(f"Queue '{queue_name}' does not exist")
         
         return {
             "queue_name": queue_name,
-            "message_count": message_count,
-            "consumer_count": consumer_count,
+            "message_count": queue.declaration_result.message_count,
+            "consumer_count": queue.declaration_result.consumer_count,
             "status": "active"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         return {
             "queue_name": queue_name,
@@ -404,51 +420,30 @@ async def reset_database():
 @app.post("/create-queue")
 async def create_or_get_queue(request: QueueCreateRequest):
     """Create a new queue or get existing queue information"""
-    if not RABBITMQ_URL:
-        raise HTTPException(status_code=500, detail="RabbitMQ URL not configured")
-    
     try:
-        connection = pika.BlockingConnection(pika.URLParameters(RABBITMQ_URL))
-        channel = connection.channel()
+        rabbitmq = await get_publisher()
         
-        # Check if queue exists by trying to declare it passively
-        queue_exists = False
-        try:
-            method = channel.queue_declare(
-                queue=request.queue_name, 
-                passive=True  # This will raise an exception if queue doesn't exist
-            )
-            queue_exists = True
-            existing_message_count = method.method.message_count
-            existing_consumer_count = method.method.consumer_count
-        except pika.exceptions.ChannelClosedByBroker:
-            # Queue doesn't exist, need to recreate connection and channel
-            connection.close()
-            connection = pika.BlockingConnection(pika.URLParameters(RABBITMQ_URL))
-            channel = connection.channel()
-            queue_exists = False
+        # Check if queue exists
+        queue = await rabbitmq.queue_exists(request.queue_name)
         
-        if queue_exists:
-            connection.close()
+        if queue is not None:
             return {
                 "status": "exists",
                 "queue_name": request.queue_name,
                 "message": f"Queue '{request.queue_name}' already exists",
-                "message_count": existing_message_count,
-                "consumer_count": existing_consumer_count,
+                "message_count": queue.declaration_result.message_count,
+                "consumer_count": queue.declaration_result.consumer_count,
                 "durable": True  # Existing queues are assumed durable
             }
         else:
             # Create new queue
-            method = channel.queue_declare(
-                queue=request.queue_name,
+            await rabbitmq.declare_queue(
+                request.queue_name,
                 durable=request.durable,
                 auto_delete=request.auto_delete,
-                arguments=request.arguments or {}
+                arguments=request.arguments
             )
             
-            connection.close()
-            
             return {
                 "status": "created",
                 "queue_name": request.queue_name,
@@ -460,6 +455,8 @@ async def create_or_get_queue(request: QueueCreateRequest):
                 "consumer_count": 0
             }
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating/checking queue: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to create/check queue: {str(e)}")
@@ -548,88 +545,67 @@ async def create_or_get_queue(request: QueueCreateRequest):
 #         logger.error(f"Error consuming messages: {str(e)}")
 #         raise HTTPException(status_code=500, detail=f"Failed to consume messages: {str(e)}")
     
+def _message_info(message: aio_pika.abc.AbstractIncomingMessage) -> Dict[str, Any]:
+    """Describe a consumed message with its delivery details and properties"""
+    try:
+        # Try to decode as JSON
+        message_data = json.loads(message.body.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        # If not JSON, treat as plain text
+        message_data = message.body.decode('utf-8', errors='ignore')
+    return {
+        "delivery_tag": message.delivery_tag,
+        "exchange": message.exchange,
+        "routing_key": message.routing_key,
+        "message_count": message.message_count,
+        "body": message_data,
+        "properties": {
+            "content_type": message.content_type,
+            "delivery_mode": int(message.delivery_mode) if message.delivery_mode else None,
+            "timestamp": message.timestamp.isoformat() if message.timestamp else None,
+            "message_id": message.message_id,
+            "user_id": message.user_id
+        },
+        "consumed_at": datetime.now().isoformat()
+    }
+
+async def _declare_existing_queue(channel: aio_pika.abc.AbstractChannel, queue_name: str) -> aio_pika.abc.AbstractQueue:
+    try:
+        return await channel.declare_queue(queue_name, passive=True)
+    except aio_pika.exceptions.ChannelClosed:
+        raise HTTPException(status_code=404, detail=f"Queue '{queue_name}' does not exist")
+
 @app.post("/consume-messages")
 async def consume_messages(request: ConsumeRequest):
     """Consume messages from a queue"""
-    if not RABBITMQ_URL:
-        raise HTTPException(status_code=500, detail="RabbitMQ URL not configured")
-    
     try:
-        connection = pika.BlockingConnection(pika.URLParameters(RABBITMQ_URL))
-        channel = connection.channel()
-        
-        # Check if queue exists
-        try:
-            method = channel.queue_declare(queue=request.queue_name, passive=True)
-            total_messages = method.method.message_count
-        except pika.exceptions.ChannelClosedByBroker:
-            connection.close()
-            raise HTTPException(status_code=404, detail=f"Queue '{request.queue_name}' does not exist")
-        
-        messages = []
-        messages_consumed = 0
-        
-        # Consume messages
-        while messages_consumed < request.max_messages:
-            method_frame, header_frame, body = channel.basic_get(
-                queue=request.queue_name,
-                auto_ack=request.auto_ack
-            )
-            
-            if method_frame is None:
-                # No more messages
-                break
+        rabbitmq = await get_publisher()
+        # A channel of its own on the shared connection; a missing queue closes it
+        async with rabbitmq.dedicated_channel() as channel:
+            queue = await _declare_existing_queue(channel, request.queue_name)
+            total_messages = queue.declaration_result.message_count
+            
+            messages = []
+            
+            # Consume messages
+            while len(messages) < request.max_messages:
+                message = await queue.get(no_ack=request.auto_ack, fail=False)
+                if message is None:
+                    # No more messages
+                    break
+                messages.append(_message_info(message))
                 
-            try:
-                # Try to decode as JSON
-                message_data = json.loads(body.decode('utf-8'))
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                # If not JSON, treat as plain text
-                message_data = body.decode('utf-8', errors='ignore')
-            
-            # Fix timestamp handling
-            timestamp_str = None
-            if header_frame.timestamp:
-                if isinstance(header_frame.timestamp, int):
-                    # Convert Unix timestamp to ISO format
-                    timestamp_str = datetime.fromtimestamp(header_frame.timestamp).isoformat()
-                else:
-                    # Assume it's already a datetime object
-                    timestamp_str = header_frame.timestamp.isoformat()
-            
-            message_info = {
-                "delivery_tag": method_frame.delivery_tag,
-                "exchange": method_frame.exchange,
-                "routing_key": method_frame.routing_key,
-                "message_count": method_frame.message_count,
-                "body": message_data,
-                "properties": {
-                    "content_type": header_frame.content_type,
-                    "delivery_mode": header_frame.delivery_mode,
-                    "timestamp": timestamp_str,  # ← Fixed line
-                    "message_id": header_frame.message_id,
-                    "user_id": header_frame.user_id
-                },
-                "consumed_at": datetime.now().isoformat()
-            }
+                # If auto_ack is False, manually acknowledge the message
+                if not request.auto_ack:
+                    await message.ack()
             
-            messages.append(message_info)
-            messages_consumed += 1
-            
-            # If auto_ack is False, manually acknowledge the message
-            if not request.auto_ack:
-                channel.basic_ack(delivery_tag=method_frame.delivery_tag)
-        
-        # Get updated queue info
-        final_method = channel.queue_declare(queue=request.queue_name, passive=True)
-        remaining_messages = final_method.method.message_count
-        
-        connection.close()
+            # Get updated queue info
+            remaining_messages = (await _declare_existing_queue(channel, request.queue_name)).declaration_result.message_count
         
         return {
             "status": "success",
             "queue_name": request.queue_name,
-            "messages_consumed": messages_consumed,
+            "messages_consumed": len(messages),
             "messages_before": total_messages,
             "messages_remaining": remaining_messages,
             "auto_ack": request.auto_ack,
@@ -643,9 +619,6 @@ async def consume_messages(request: ConsumeRequest):
         raise HTTPException(status_code=500, detail=f"Failed to consume messages: {str(e)}")
 
 
-import time
-from typing import Dict, Any, List, Optional
-
 # Add this new endpoint after your existing consume-messages endpoint
 @app.post("/consume-messages-with-delay")
 async def consume_messages_with_delay(
@@ -663,111 +636,58 @@ async def consume_messages_with_delay(
         delay_seconds: Seconds to wait before acknowledging messages
         auto_ack: If True, messages are auto-acknowledged (no delay effect)
     """
-    if not RABBITMQ_URL:
-        raise HTTPException(status_code=500, detail="RabbitMQ URL not configured")
-    
     try:
-        connection = pika.BlockingConnection(pika.URLParameters(RABBITMQ_URL))
-        channel = connection.channel()
-        
-        # Check if queue exists
-        try:
-            method = channel.queue_declare(queue=queue_name, passive=True)
-            total_messages = method.method.message_count
-        except pika.exceptions.ChannelClosedByBroker:
-            connection.close()
-            raise HTTPException(status_code=404, detail=f"Queue '{queue_name}' does not exist")
-        
-        messages = []
-        messages_consumed = 0
-        delivery_tags = []  # Store delivery tags for delayed acknowledgment
-        
-        print(f"🚀 Starting consumption of {max_messages} messages from '{queue_name}'")
-        print(f"⏰ Will wait {delay_seconds} seconds before acknowledging")
-        
-        # Step 1: Consume messages WITHOUT acknowledging them
-        while messages_consumed < max_messages:
-            method_frame, header_frame, body = channel.basic_get(
-                queue=queue_name,
-                auto_ack=auto_ack  # Only auto-ack if explicitly requested
-            )
-            
-            if method_frame is None:
-                # No more messages available
-                print(f"📭 No more messages available after consuming {messages_consumed}")
-                break
+        rabbitmq = await get_publisher()
+        async with rabbitmq.dedicated_channel() as channel:
+            queue = await _declare_existing_queue(channel, queue_name)
+            total_messages = queue.declaration_result.message_count
+            
+            messages = []
+            unacked = []  # Messages acknowledged after the delay
+            
+            print(f"🚀 Starting consumption of {max_messages} messages from '{queue_name}'")
+            print(f"⏰ Will wait {delay_seconds} seconds before acknowledging")
+            
+            # Step 1: Consume messages WITHOUT acknowledging them
+            while len(messages) < max_messages:
+                message = await queue.get(no_ack=auto_ack, fail=False)  # Only auto-ack if explicitly requested
+                if message is None:
+                    # No more messages available
+                    print(f"📭 No more messages available after consuming {len(messages)}")
+                    break
+                messages.append(_message_info(message))
                 
-            try:
-                # Try to decode as JSON
-                message_data = json.loads(body.decode('utf-8'))
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                # If not JSON, treat as plain text
-                message_data = body.decode('utf-8', errors='ignore')
-            
-            # Fix timestamp handling (same as fixed consume-messages endpoint)
-            timestamp_str = None
-            if header_frame.timestamp:
-                if isinstance(header_frame.timestamp, int):
-                    # Convert Unix timestamp to ISO format
-                    timestamp_str = datetime.fromtimestamp(header_frame.timestamp).isoformat()
-                else:
-                    # Assume it's already a datetime object
-                    timestamp_str = header_frame.timestamp.isoformat()
-            
-            message_info = {
-                "delivery_tag": method_frame.delivery_tag,
-                "exchange": method_frame.exchange,
-                "routing_key": method_frame.routing_key,
-                "message_count": method_frame.message_count,
-                "body": message_data,
-                "properties": {
-                    "content_type": header_frame.content_type,
-                    "delivery_mode": header_frame.delivery_mode,
-                    "timestamp": timestamp_str,
-                    "message_id": header_frame.message_id,
-                    "user_id": header_frame.user_id
-                },
-                "consumed_at": datetime.now().isoformat()
-            }
-            
-            messages.append(message_info)
-            
-            # Store delivery tag for later acknowledgment (only if not auto-ack)
-            if not auto_ack:
-                delivery_tags.append(method_frame.delivery_tag)
-            
-            messages_consumed += 1
-            print(f"✅ Consumed message {messages_consumed}: delivery_tag={method_frame.delivery_tag}")
-        
-        # At this point: messages are consumed but NOT acknowledged (if auto_ack=False)
-        if not auto_ack and delivery_tags:
-            print(f"🔍 CHECK NOW! {len(delivery_tags)} messages should be UNACKNOWLEDGED")
-            print(f"🕐 Use '/list-queues' endpoint to see messages_unacknowledged count")
-            print(f"⏳ Waiting {delay_seconds} seconds before acknowledgment...")
-            
-            # Wait for the specified delay
-            time.sleep(delay_seconds)
-            
-            print("🔄 Now acknowledging all consumed messages...")
+                # Keep the message for later acknowledgment (only if not auto-ack)
+                if not auto_ack:
+                    unacked.append(message)
+                print(f"✅ Consumed message {len(messages)}: delivery_tag={message.delivery_tag}")
+            
+            # At this point: messages are consumed but NOT acknowledged (if auto_ack=False)
+            if unacked:
+                print(f"🔍 CHECK NOW! {len(unacked)} messages should be UNACKNOWLEDGED")
+                print(f"🕐 Use '/list-queues' endpoint to see messages_unacknowledged count")
+                print(f"⏳ Waiting {delay_seconds} seconds before acknowledgment...")
+                
+                # Wait without blocking the event loop the publisher and other requests share
+                await asyncio.sleep(delay_seconds)
+                
+                print("🔄 Now acknowledging all consumed messages...")
+                
+                # Step 2: Acknowledge all consumed messages
+                for i, message in enumerate(unacked, 1):
+                    await message.ack()
+                    print(f"✅ Acknowledged message {i}/{len(unacked)} (delivery_tag={message.delivery_tag})")
             
-            # Step 2: Acknowledge all consumed messages
-            for i, delivery_tag in enumerate(delivery_tags, 1):
-                channel.basic_ack(delivery_tag=delivery_tag)
-                print(f"✅ Acknowledged message {i}/{len(delivery_tags)} (delivery_tag={delivery_tag})")
-        
-        # Get final queue statistics
-        try:
-            final_method = channel.queue_declare(queue=queue_name, passive=True)
-            remaining_messages = final_method.method.message_count
-        except:
-            remaining_messages = "unknown"
-        
-        connection.close()
+            # Get final queue statistics
+            try:
+                remaining_messages = (await channel.declare_queue(queue_name, passive=True)).declaration_result.message_count
+            except Exception:
+                remaining_messages = "unknown"
         
         return {
             "status": "success",
             "queue_name": queue_name,
-            "messages_consumed": messages_consumed,
+            "messages_consumed": len(messages),
             "messages_before": total_messages,
             "messages_remaining": remaining_messages,
             "auto_ack": auto_ack,
@@ -787,17 +707,10 @@ async def consume_messages_with_delay(
 @app.post("/send-message-to-queue")
 async def send_message_to_queue(queue_name: str, request: MessageRequest):
     """Send a message to a specific queue with enhanced options"""
-    if not RABBITMQ_URL:
-        raise HTTPException(status_code=500, detail="RabbitMQ URL not configured")
-    
     try:
-        connection = pika.BlockingConnection(pika.URLParameters(RABBITMQ_URL))
-        channel = connection.channel()
-        
-        # Ensure queue exists
-        channel.queue_declare(queue=queue_name, durable=True)
+        rabbitmq = await get_publisher()
         
-        # Prepare message
+        # Add metadata to message
         message_with_metadata = {
             **request.message,
             "timestamp": datetime.now().isoformat(),
@@ -805,27 +718,18 @@ async def send_message_to_queue(queue_name: str, request: MessageRequest):
             "queue_name": queue_name
         }
         
-        # Set message properties
-        properties = pika.BasicProperties(
-            delivery_mode=2 if request.persistent else 1,  # 2 = persistent, 1 = transient
-            timestamp=int(datetime.now().timestamp()),
-            message_id=f"msg_{datetime.now().timestamp()}",
-            content_type="application/json"
-        )
-        
-        # Send message
-        channel.basic_publish(
+        # Persistent/transient delivery, timestamp, message id and JSON content type are set by the publisher
+        await rabbitmq.publish(
+            queue_name,
+            message_with_metadata,
             exchange=request.exchange,
-            routing_key=request.routing_key or queue_name,
-            body=json.dumps(message_with_metadata),
-            properties=properties
+            routing_key=request.routing_key,
+            persistent=request.persistent
         )
         
-        # Get queue info after sending
-        method = channel.queue_declare(queue=queue_name, passive=True)
-        message_count = method.method.message_count
-        
-        connection.close()
+        # Get updated queue info
+        queue = await rabbitmq.queue_exists(queue_name)
+        message_count = queue.declaration_result.message_count if queue else 0
         
         return {
             "status": "success",
@@ -836,9 +740,44 @@ async def send_message_to_queue(queue_name: str, request: MessageRequest):
             "sent_at": datetime.now().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error sending message: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to send message: {str(e)}")
+
+@app.post("/send-messages-batch")
+async def send_messages_batch(queue_name: str, request: BatchMessageRequest):
+    """Send many messages to a queue in one request, with pipelined publisher confirms"""
+    try:
+        rabbitmq = await get_publisher()
+        
+        sent_at = datetime.now().isoformat()
+        messages = [
+            {**message, "timestamp": sent_at, "sent_from": "fastapi_backend", "queue_name": queue_name}
+            for message in request.messages
+        ]
+        confirmed = await rabbitmq.publish_batch(
+            queue_name,
+            messages,
+            exchange=request.exchange,
+            routing_key=request.routing_key,
+            persistent=request.persistent
+        )
+        
+        return {
+            "status": "success",
+            "queue_name": queue_name,
+            "messages_confirmed": confirmed,
+            "persistent": request.persistent,
+            "sent_at": sent_at
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error sending message batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to send message batch: {str(e)}")
     
 @app.get("/list-queues")
 async def list_all_queues():
@@ -900,76 +839,28 @@ async def list_all_queues():
 @app.get("/health/rabbitmq")
 async def rabbitmq_health():
     try:
-        connection = pika.BlockingConnection(pika.URLParameters(RABBITMQ_URL))
-        connection.close()
-        return {"status": "healthy", "service": "rabbitmq"}
+        rabbitmq = await get_publisher()
+        return {"status": "healthy", "service": "rabbitmq", **rabbitmq.get_stats()}
+    except HTTPException as e:
+        return {"status": "unhealthy", "service": "rabbitmq", "error": e.detail}
     except Exception as e:
         return {"status": "unhealthy", "service": "rabbitmq", "error": str(e)}
     
-import threading
-import time
-from datetime import datetime
-from typing import Dict, Any
-import uuid
-
-# Global storage for active consumers with proper stop mechanism
-active_consumers = {}
-consumer_stop_flags = {}  # Flags to signal consumers to stop
-
-class ConsumerManager:
-    def __init__(self):
-        self.consumers = {}
-        self.stop_flags = {}
-    
-    def create_consumer_id(self, queue_name: str, consumer_name: str) -> str:
-        return f"{queue_name}_{consumer_name}_{uuid.uuid4().hex[:8]}"
-    
-    def add_consumer(self, consumer_id: str, consumer_info: dict):
-        self.consumers[consumer_id] = consumer_info
-    
-    def remove_consumer(self, consumer_id: str):
-        if consumer_id in self.consumers:
-            del self.consumers[consumer_id]
-        if consumer_id in self.stop_flags:
-            del self.stop_flags[consumer_id]
-    
-    def get_consumers(self):
-        # Return JSON-serializable data only
-        result = {}
-        for consumer_id, info in self.consumers.items():
-            result[consumer_id] = {
-                "queue": info["queue"],
-                "name": info["name"], 
-                "started_at": info["started_at"],
-                "status": info["status"],
-                "messages_processed": info.get("messages_processed", 0)
-            }
-        return result
-    
-    def stop_consumer(self, consumer_id: str):
-        if consumer_id in self.consumers:
-            self.consumers[consumer_id]["status"] = "stopping"
-            self.stop_flags[consumer_id] = True
-            return True
-        return False
-    
-    def should_stop(self, consumer_id: str) -> bool:
-        return self.stop_flags.get(consumer_id, False)
+# Consumers share the publisher's robust connection, each on its own channel
+CONSUMER_PREFETCH = int(os.getenv("CONSUMER_PREFETCH", "10"))
+CONSUMER_WORKERS = int(os.getenv("CONSUMER_WORKERS", "4"))
+CONSUMER_STOP_TIMEOUT = float(os.getenv("CONSUMER_STOP_TIMEOUT", "300"))
 
 # Global consumer manager
 consumer_manager = ConsumerManager()
 
 @app.post("/start-consumer")
-async def start_persistent_consumer(queue_name: str, consumer_name: str = "default"):
-    """Start a persistent consumer that stays connected"""
+async def start_persistent_consumer(queue_name: str, consumer_name: str = "default",
+                                    prefetch: int = CONSUMER_PREFETCH, workers: int = CONSUMER_WORKERS):
+    """Start a persistent consumer running queued jobs on a bounded pool of worker threads"""
     
     # Check if consumer already exists for this queue/name combo
-    existing_consumer = None
-    for consumer_id, info in consumer_manager.consumers.items():
-        if info["queue"] == queue_name and info["name"] == consumer_name and info["status"] == "running":
-            existing_consumer = consumer_id
-            break
-    
+    existing_consumer = consumer_manager.find(queue_name, consumer_name)
     if existing_consumer:
         return {
             "status": "already_running",
@@ -977,164 +868,67 @@ async def start_persistent_consumer(queue_name: str, consumer_name: str = "defau
             "message": f"Consumer '{consumer_name}' already running for queue '{queue_name}'"
         }
     
-    # Create unique consumer ID
-    consumer_id = consumer_manager.create_consumer_id(queue_name, consumer_name)
-    
-    def consumer_worker():
-        messages_processed = 0
-        connection = None
-        channel = None
-        
-        try:
-            connection = pika.BlockingConnection(pika.URLParameters(RABBITMQ_URL))
-            channel = connection.channel()
-            
-            # Declare queue to ensure it exists
-            channel.queue_declare(queue=queue_name, durable=True)
-            
-            def callback(ch, method, properties, body):
-                nonlocal messages_processed
-                
-                # Check if we should stop
-                if consumer_manager.should_stop(consumer_id):
-                    print(f"🛑 Consumer '{consumer_name}' received stop signal")
-                    ch.stop_consuming()
-                    return
-                
-                try:
-                    # Process message
-                    message_data = json.loads(body.decode('utf-8'))
-                    print(f"🔄 Consumer '{consumer_name}' processing: {message_data}")
-                    
-                    # Simulate processing time
-                    time.sleep(0.5)
-                    
-                    # Acknowledge message
-                    ch.basic_ack(delivery_tag=method.delivery_tag)
-                    messages_processed += 1
-                    
-                    # Update processed count
-                    if consumer_id in consumer_manager.consumers:
-                        consumer_manager.consumers[consumer_id]["messages_processed"] = messages_processed
-                    
-                    print(f"✅ Consumer '{consumer_name}' processed message {messages_processed}")
-                    
-                except Exception as e:
-                    print(f"❌ Error processing message: {e}")
-                    ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
-            
-            # Start consuming
-            channel.basic_qos(prefetch_count=1)
-            channel.basic_consume(queue=queue_name, on_message_callback=callback)
-            
-            print(f"🚀 Consumer '{consumer_name}' started for queue '{queue_name}'")
-            
-            # Update status to running
-            if consumer_id in consumer_manager.consumers:
-                consumer_manager.consumers[consumer_id]["status"] = "running"
-            
-            # Start consuming (blocking call)
-            channel.start_consuming()
-            
-        except Exception as e:
-            print(f"💥 Consumer error: {e}")
-            if consumer_id in consumer_manager.consumers:
-                consumer_manager.consumers[consumer_id]["status"] = "error"
-        finally:
-            # Clean shutdown
-            print(f"🧹 Cleaning up consumer '{consumer_name}'...")
-            
-            try:
-                if channel and channel.is_open:
-                    channel.stop_consuming()
-                    channel.close()
-                if connection and not connection.is_closed:
-                    connection.close()
-            except Exception as e:
-                print(f"Error during cleanup: {e}")
-            
-            # Update final status
-            if consumer_id in consumer_manager.consumers:
-                consumer_manager.consumers[consumer_id]["status"] = "stopped"
-                consumer_manager.consumers[consumer_id]["stopped_at"] = datetime.now().isoformat()
-            
-            print(f"🛑 Consumer '{consumer_name}' stopped (processed {messages_processed} messages)")
-    
-    # Create consumer info
-    consumer_info = {
-        "queue": queue_name,
-        "name": consumer_name,
-        "started_at": datetime.now().isoformat(),
-        "status": "starting",
-        "messages_processed": 0
-    }
-    
-    # Add to manager
-    consumer_manager.add_consumer(consumer_id, consumer_info)
+    if prefetch < 1 or workers < 1:
+        raise HTTPException(status_code=400, detail="prefetch and workers must be at least 1")
     
-    # Start consumer in background thread
-    consumer_thread = threading.Thread(target=consumer_worker, daemon=True)
-    consumer_thread.start()
+    rabbitmq = await get_publisher()
+    try:
+        consumer_id, consumer = await consumer_manager.start(rabbitmq.connection, queue_name, consumer_name, prefetch, workers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start consumer: {str(e)}")
     
     return {
         "status": "started",
         "consumer_id": consumer_id,
         "consumer_name": consumer_name,
         "queue_name": queue_name,
+        "prefetch": consumer.prefetch,
+        "workers": consumer.workers,
         "message": f"Persistent consumer started for queue '{queue_name}'"
     }
 
 @app.post("/stop-consumer")
-async def stop_persistent_consumer(queue_name: str, consumer_name: str = "default"):
-    """Stop a specific persistent consumer"""
+async def stop_persistent_consumer(queue_name: str, consumer_name: str = "default",
+                                   timeout: float = CONSUMER_STOP_TIMEOUT):
+    """Stop a specific persistent consumer after its in-flight jobs finish"""
     
     # Find the consumer
-    target_consumer_id = None
-    for consumer_id, info in consumer_manager.consumers.items():
-        if info["queue"] == queue_name and info["name"] == consumer_name and info["status"] in ["running", "starting"]:
-            target_consumer_id = consumer_id
-            break
-    
+    target_consumer_id = consumer_manager.find(queue_name, consumer_name)
     if not target_consumer_id:
         raise HTTPException(
             status_code=404, 
             detail=f"No active consumer found for queue '{queue_name}' with name '{consumer_name}'"
         )
     
-    # Signal consumer to stop
-    success = consumer_manager.stop_consumer(target_consumer_id)
+    success = await consumer_manager.stop(target_consumer_id, timeout)
     
     if success:
         return {
-            "status": "stopping",
+            "status": "stopped",
             "consumer_id": target_consumer_id,
             "consumer_name": consumer_name,
             "queue_name": queue_name,
-            "message": f"Stop signal sent to consumer '{consumer_name}' for queue '{queue_name}'"
+            "messages_processed": consumer_manager.consumers[target_consumer_id].processed,
+            "message": f"Consumer '{consumer_name}' for queue '{queue_name}' stopped"
         }
     else:
         raise HTTPException(status_code=404, detail="Consumer not found")
 
 @app.post("/stop-all-consumers")
-async def stop_all_consumers():
+async def stop_all_consumers(timeout: float = CONSUMER_STOP_TIMEOUT):
     """Stop all active consumers"""
     
-    stopped_consumers = []
-    
-    for consumer_id, info in list(consumer_manager.consumers.items()):
-        if info["status"] in ["running", "starting"]:
-            consumer_manager.stop_consumer(consumer_id)
-            stopped_consumers.append({
-                "consumer_id": consumer_id,
-                "queue": info["queue"],
-                "name": info["name"]
-            })
+    stopped = await consumer_manager.stop_all(timeout)
+    stopped_consumers = [
+        {"consumer_id": consumer_id, "queue": consumer.queue_name, "name": consumer.consumer_name}
+        for consumer_id, consumer in stopped.items()
+    ]
     
     return {
-        "status": "stopping_all",
+        "status": "stopped_all",
         "stopped_count": len(stopped_consumers),
         "stopped_consumers": stopped_consumers,
-        "message": f"Stop signal sent to {len(stopped_consumers)} consumers"
+        "message": f"Stopped {len(stopped_consumers)} consumers"
     }
 
 @app.get("/active-consumers")
@@ -1153,6 +947,7 @@ async def list_active_consumers():
     return {
         "total_consumers": len(consumers_data),
         "status_summary": status_counts,
+        "job_types": sorted(handlers.HANDLERS),
         "consumers": consumers_data
     }
 
@@ -1160,23 +955,10 @@ async def list_active_consumers():
 async def cleanup_stopped_consumers():
     """Remove stopped/error consumers from the list"""
     
-    removed_count = 0
-    consumers_to_remove = []
-    
-    for consumer_id, info in list(consumer_manager.consumers.items()):
-        if info["status"] in ["stopped", "error"]:
-            consumers_to_remove.append(consumer_id)
-    
-    for consumer_id in consumers_to_remove:
-        consumer_manager.remove_consumer(consumer_id)
-        removed_count += 1
+    removed_count = consumer_manager.cleanup()
     
     return {
         "status": "cleaned",
         "removed_count": removed_count,
         "message": f"Removed {removed_count} stopped/error consumers"
     }
-
-
-
-
@@ -0,0 +1,213 @@
+"""
+Messaging module for publishing to RabbitMQ over one app-lifetime aio_pika connection
+"""
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import aio_pika
+from aio_pika.pool import Pool
+
+logger = logging.getLogger(__name__)
+
+
+class RabbitMQPublisher:
+    """Robust RabbitMQ connection with a pool of publisher-confirm channels"""
+
+    def __init__(self, url: str, channel_pool_size: int = 8, batch_size: int = 500):
+        """
+        Initialize publisher
+
+        Args:
+            url (str): AMQP URL of the broker
+            channel_pool_size (int): Maximum number of channels publishing concurrently
+            batch_size (int): Maximum number of unconfirmed messages per batch on one channel
+        """
+        self.url = url
+        self.channel_pool_size = channel_pool_size
+        self.batch_size = batch_size
+        self.connection: Optional[aio_pika.abc.AbstractRobustConnection] = None
+        self.channel_pool: Optional[Pool] = None
+        self._declared_queues = set()
+
+    @property
+    def is_connected(self) -> bool:
+        return self.connection is not None and not self.connection.is_closed
+
+    async def connect(self):
+        """Open the connection; it reconnects and restores its channels after broker restarts"""
+        self.connection = await aio_pika.connect_robust(self.url)
+        self.channel_pool = Pool(self._open_channel, max_size=self.channel_pool_size)
+        logger.info(f"Connected to RabbitMQ with a pool of {self.channel_pool_size} channels")
+
+    async def close(self):
+        """Close the channel pool and the connection"""
+        if self.channel_pool:
+            await self.channel_pool.close()
+            self.channel_pool = None
+        if self.connection:
+            await self.connection.close()
+            self.connection = None
+        self._declared_queues.clear()
+
+    async def _open_channel(self) -> aio_pika.abc.AbstractChannel:
+        # With publisher confirms each publish returns once the broker has taken the message;
+        # mandatory publishes nobody could route (e.g., to a deleted queue) raise DeliveryError
+        return await self.connection.channel(publisher_confirms=True, on_return_raises=True)
+
+    @asynccontextmanager
+    async def channel(self):
+        """Borrow a pooled channel, reopening it if the broker closed it (e.g., after a failed declare)"""
+        if not self.channel_pool:
+            raise RuntimeError("RabbitMQ publisher is not connected")
+        async with self.channel_pool.acquire() as channel:
+            if channel.is_closed:
+                await channel.reopen()
+            yield channel
+
+    @asynccontextmanager
+    async def dedicated_channel(self):
+        """Open a channel outside the pool, for consumers and operations that may close it (passive declares)"""
+        if not self.is_connected:
+            raise RuntimeError("RabbitMQ publisher is not connected")
+        channel = await self.connection.channel()
+        try:
+            yield channel
+        finally:
+            if not channel.is_closed:
+                await channel.close()
+
+    async def declare_queue(self, queue_name: str, durable: bool = True, auto_delete: bool = False,
+                            arguments: Optional[Dict[str, Any]] = None) -> aio_pika.abc.AbstractQueue:
+        """
+        Declare a queue (idempotent for identical arguments)
+
+        Returns:
+            AbstractQueue: Declared queue; declaration_result holds message and consumer counts
+        """
+        async with self.channel() as channel:
+            queue = await channel.declare_queue(queue_name, durable=durable, auto_delete=auto_delete,
+                                                arguments=arguments or None)
+        self._declared_queues.add(queue_name)
+        return queue
+
+    async def queue_exists(self, queue_name: str) -> Optional[aio_pika.abc.AbstractQueue]:
+        """
+        Look up a queue without creating it
+
+        Returns:
+            AbstractQueue: Existing queue, or None if it doesn't exist
+        """
+        # A failed passive declare closes the channel, so don't use a pooled one
+        async with self.dedicated_channel() as channel:
+            try:
+                return await channel.declare_queue(queue_name, passive=True)
+            except aio_pika.exceptions.ChannelClosed:
+                return None
+
+    async def _ensure_queue(self, queue_name: str):
+        # Declare each queue once per process instead of once per message
+        if queue_name and queue_name not in self._declared_queues:
+            await self.declare_queue(queue_name, durable=True)
+
+    @staticmethod
+    def build_message(body: Dict[Any, Any], persistent: bool = True, message_id: Optional[str] = None) -> aio_pika.Message:
+        """Build a JSON message with the properties the synchronous endpoints used to set"""
+        now = datetime.now()
+        return aio_pika.Message(
+            body=json.dumps(body).encode("utf-8"),
+            content_type="application/json",
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT if persistent else aio_pika.DeliveryMode.NOT_PERSISTENT,
+            timestamp=now,
+            message_id=message_id or f"msg_{now.timestamp()}"
+        )
+
+    async def _exchange(self, channel, exchange: str):
+        if not exchange:
+            return channel.default_exchange
+        return await channel.get_exchange(exchange, ensure=False)
+
+    async def publish(self, queue_name: str, body: Dict[Any, Any], exchange: str = "", routing_key: str = "",
+                      persistent: bool = True, declare: bool = True):
+        """
+        Publish one JSON message and wait for the broker's confirmation
+
+        Args:
+            queue_name (str): Queue the message is for, declared durable on first use
+            body (dict): Message body
+            exchange (str): Exchange name, '' for the default exchange
+            routing_key (str): Routing key, defaults to the queue name
+            persistent (bool): Whether the broker writes the message to disk
+            declare (bool): Whether to declare the queue first
+
+        Raises:
+            RuntimeError: If the broker returned the message as unroutable, even after declaring the queue again
+        """
+        await self._publish_all(queue_name, [self.build_message(body, persistent)], exchange, routing_key, declare)
+
+    async def publish_batch(self, queue_name: str, bodies: Iterable[Dict[Any, Any]], exchange: str = "",
+                            routing_key: str = "", persistent: bool = True, declare: bool = True) -> int:
+        """
+        Publish many JSON messages with pipelined publisher confirms
+
+        Messages are sent on one channel without waiting for each confirmation;
+        the call returns once the broker confirmed all of them (up to batch_size
+        outstanding at a time).
+
+        Messages are mandatory: if the queue was deleted behind the publisher's back the
+        broker returns them instead of dropping them, and they are retried once after
+        declaring the queue again.
+
+        Returns:
+            int: Number of confirmed messages
+
+        Raises:
+            RuntimeError: If messages stay unroutable
+        """
+        messages = [self.build_message(body, persistent) for body in bodies]
+        return await self._publish_all(queue_name, messages, exchange, routing_key, declare)
+
+    async def _publish_on_channel(self, messages: List[aio_pika.Message], exchange: str, routing_key: str) -> List[aio_pika.Message]:
+        """Publish messages on one pooled channel, up to batch_size unconfirmed; returns the messages the broker returned"""
+        returned = []
+        async with self.channel() as channel:
+            target = await self._exchange(channel, exchange)
+            for start in range(0, len(messages), self.batch_size):
+                batch = messages[start:start + self.batch_size]
+                results = await asyncio.gather(
+                    *(target.publish(message, routing_key=routing_key, mandatory=True) for message in batch),
+                    return_exceptions=True
+                )
+                for message, result in zip(batch, results):
+                    if isinstance(result, aio_pika.exceptions.DeliveryError):
+                        returned.append(message)
+                    elif isinstance(result, BaseException):
+                        raise result
+        return returned
+
+    async def _publish_all(self, queue_name: str, messages: List[aio_pika.Message], exchange: str,
+                           routing_key: str, declare: bool) -> int:
+        if declare:
+            await self._ensure_queue(queue_name)
+        routing_key = routing_key or queue_name
+        returned = await self._publish_on_channel(messages, exchange, routing_key)
+        if returned and declare and not exchange:
+            # The queue was deleted after it was declared; declare it again and retry the returned messages
+            logger.warning(f"{len(returned)} messages to '{queue_name}' were returned, declaring the queue again")
+            self._declared_queues.discard(queue_name)
+            await self._ensure_queue(queue_name)
+            returned = await self._publish_on_channel(returned, exchange, routing_key)
+        if returned:
+            raise RuntimeError(f"{len(returned)} messages to '{routing_key}' could not be routed to any queue")
+        return len(messages)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Connection state for health endpoints"""
+        return {
+            "connected": self.is_connected,
+            "channel_pool_size": self.channel_pool_size,
+            "declared_queues": sorted(self._declared_queues)
+        }
@@ -0,0 +1,125 @@
+"""
+Benchmark: WebDriver round trips for static page metadata extraction
+
+Compares the per-element extractors (extract_forms, extract_interactive_elements,
+extract_data_tables, identify_key_flows) with the single execute_script payload
+used by WebTestGenerator.extract_static_metadata.
+
+Usage:
+    python benchmarks/dom_extraction_roundtrips.py --url https://example.com
+    python benchmarks/dom_extraction_roundtrips.py --synthetic 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from autotest.core.web_test_generator import WebTestGenerator
+
+
+class CommandCounter:
+    """Wraps WebDriver.execute to count wire protocol commands"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.count = 0
+        self._execute = driver.execute
+        driver.execute = self._counting_execute
+
+    def _counting_execute(self, *args, **kwargs):
+        self.count += 1
+        return self._execute(*args, **kwargs)
+
+    def reset(self):
+        self.count = 0
+
+
+class _ExtractorHost:
+    """Minimal stand-in for WebTestGenerator exposing only the driver and a logger"""
+
+    def __init__(self, driver):
+        import logging
+        self.driver = driver
+        self.logger = logging.getLogger(__name__)
+
+
+def build_synthetic_page(element_count):
+    """Write a content-heavy HTML page with links, buttons, a form and a table"""
+    links = "\n".join(f'<a href="/page/{i}" id="link-{i}">Link number {i}</a>' for i in range(element_count))
+    nav_links = "\n".join(f'<a href="/section/{i}">Section {i}</a>' for i in range(10))
+    buttons = "\n".join(f'<button type="button" id="btn-{i}">Button {i}</button>' for i in range(element_count // 5))
+    rows = "\n".join(f"<tr><td>{i}</td><td>Row {i}</td></tr>" for i in range(50))
+    html = f"""<html><body>
+    <nav class="menu">{nav_links}</nav>
+    <form id="search" action="/search" method="get">
+        <input type="text" name="q" id="q"><input type="hidden" name="csrf">
+        <button type="submit" id="go">Search</button>
+    </form>
+    {links}
+    {buttons}
+    <a class="cta-button" href="/signup">Sign up</a>
+    <table id="data"><tr><th>Id</th><th>Name</th></tr>{rows}</table>
+    </body></html>"""
+    handle, path = tempfile.mkstemp(suffix=".html")
+    with os.fdopen(handle, "w") as f:
+        f.write(html)
+    return f"file://{path}"
+
+
+def run(url):
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    driver = webdriver.Chrome(options=chrome_options)
+    try:
+        driver.get(url)
+        counter = CommandCounter(driver)
+        host = _ExtractorHost(driver)
+
+        counter.reset()
+        start = time.perf_counter()
+        per_element = {
+            "forms": WebTestGenerator.extract_forms(host),
+            "buttons": WebTestGenerator.extract_interactive_elements(host),
+            "tables": WebTestGenerator.extract_data_tables(host),
+            "key_flows": WebTestGenerator.identify_key_flows(host)
+        }
+        per_element_time = time.perf_counter() - start
+        per_element_calls = counter.count
+
+        counter.reset()
+        start = time.perf_counter()
+        single_payload = WebTestGenerator.extract_static_metadata(host)
+        single_payload_time = time.perf_counter() - start
+        single_payload_calls = counter.count
+
+        print(f"URL: {url}")
+        print(f"Interactive elements: {len(per_element['buttons'])}")
+        print(f"{'mode':<16}{'round trips':>14}{'seconds':>12}")
+        print(f"{'per-element':<16}{per_element_calls:>14}{per_element_time:>12.2f}")
+        print(f"{'execute_script':<16}{single_payload_calls:>14}{single_payload_time:>12.2f}")
+        print(f"Output schema identical: {per_element.keys() == single_payload.keys()}")
+        print(f"Element counts match: {len(per_element['buttons']) == len(single_payload['buttons'])}")
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare WebDriver round trips of DOM metadata extraction")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--url", help="Page to extract metadata from")
+    group.add_argument("--synthetic", type=int, help="Generate a local page with this many links")
+    args = parser.parse_args()
+
+    run(args.url or build_synthetic_page(args.synthetic))
+
+
+if __name__ == "__main__":
+    main()
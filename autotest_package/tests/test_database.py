@@ -0,0 +1,251 @@
+import json
+from sqlalchemy import create_engine, inspect, text
+from autotest.db.migrations import run_migrations
+from autotest.tables import domain, page, redirect, test_case_data  # all mapped classes for relationship setup
+from autotest.utils.hashing import canonical_json_hash
+
+
+def test_canonical_json_hash_ignores_key_order():
+    assert canonical_json_hash({'a': 1, 'b': [1, 2]}) == canonical_json_hash({'b': [1, 2], 'a': 1})
+    assert canonical_json_hash({'a': 1}) != canonical_json_hash({'a': 2})
+
+
+def test_test_case_hash_follows_test_case_data():
+    test_case = test_case_data.TestCase(page_url="https://example.com", test_case_data={'name': 'Login', 'steps': []})
+    assert test_case.test_case_hash == canonical_json_hash({'steps': [], 'name': 'Login'})
+
+    test_case.test_case_data = {'name': 'Logout'}
+    assert test_case.test_case_hash == canonical_json_hash({'name': 'Logout'})
+
+
+def test_migration_backfills_test_case_hash(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    data = {'name': 'Login', 'steps': ['open page']}
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE test_case_data (id INTEGER PRIMARY KEY, page_url VARCHAR, test_case_data JSON)"))
+        connection.execute(text("INSERT INTO test_case_data (page_url, test_case_data) VALUES ('https://example.com', :data)"),
+                           {"data": json.dumps(data)})
+
+    run_migrations(engine)
+    run_migrations(engine)  # idempotent
+
+    with engine.connect() as connection:
+        stored_hash = connection.execute(text("SELECT test_case_hash FROM test_case_data")).scalar()
+    assert stored_hash == canonical_json_hash(data)
+    indexes = {index['name'] for index in inspect(engine).get_indexes("test_case_data")}
+    assert "ix_test_case_data_page_url_hash" in indexes
+
+
+def test_auth_form_cache_and_learned_login_signal(tmp_path, monkeypatch):
+    from sqlalchemy.orm import sessionmaker
+    from autotest.core import auth_cache
+    from autotest.db.database import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'auth.db'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(auth_cache, "SessionLocal", sessionmaker(bind=engine))
+
+    cache = auth_cache.AuthFormCache()
+    selectors = {'username_selector': '#user', 'password_selector': '#pass', 'submit_selector': 'button'}
+    assert cache.get("app.example.com", "f1") is None
+
+    # SPA login: the URL stays, the form disappears and a session cookie is set
+    observed = auth_cache.observe_login_signal(False, False, ["csrf"], ["csrf", "sid"])
+    assert auth_cache.evaluate_login_signal(observed) is None  # ambiguous without history
+    cache.save("app.example.com", "f1", selectors=selectors, success_signal=observed)
+
+    learned = cache.get("app.example.com", "f1")
+    assert learned["selectors"] == selectors
+    assert auth_cache.evaluate_login_signal(observed, learned["success_signal"]) is True
+    no_cookie = auth_cache.observe_login_signal(False, False, ["csrf"], ["csrf"])
+    assert auth_cache.evaluate_login_signal(no_cookie, learned["success_signal"]) is None
+
+    assert auth_cache.evaluate_login_signal(auth_cache.observe_login_signal(True, False, [], [])) is True
+    assert auth_cache.evaluate_login_signal(auth_cache.observe_login_signal(False, True, ["a"], ["a"])) is False
+    assert cache.get("other.example.com", "f1") is None
+
+
+def test_crawl_checkpoint_resumes_extraction_and_processing(tmp_path, monkeypatch):
+    from sqlalchemy.orm import sessionmaker
+    from autotest.db.database import Base
+    from autotest.core import crawl_checkpoint, url_extractor
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'crawl.db'}")
+    Base.metadata.create_all(engine, tables=[crawl_checkpoint.CrawlRun.__table__, crawl_checkpoint.CrawlURL.__table__])
+    monkeypatch.setattr(crawl_checkpoint, "SessionLocal", sessionmaker(bind=engine))
+
+    site = {"/": ["/a", "/b"], "/a": ["/c"], "/b": [], "/c": []}
+
+    class FakeDriver:
+        def __init__(self, interrupt_at=None):
+            self.interrupt_at = interrupt_at
+            self.loaded = []
+            self.path = None
+
+        def get(self, url):
+            self.path = url.replace("https://example.com", "") or "/"
+            if self.path == self.interrupt_at:
+                raise KeyboardInterrupt
+            self.loaded.append(self.path)
+
+        def find_element(self, by, value):
+            return object()
+
+        def execute_script(self, script):
+            return [f"https://example.com{path}" for path in site[self.path]]
+
+    base = "https://example.com/"
+    offline = {"requests_per_second": 0, "discovery": "browser", "use_sitemaps": False, "respect_robots": False}
+    checkpoint = crawl_checkpoint.CrawlCheckpoint.open(base, 2)
+    first = FakeDriver(interrupt_at="/c")
+    try:
+        url_extractor.URLExtractor(first, **offline).extract_urls(base, max_depth=2, checkpoint=checkpoint)
+    except KeyboardInterrupt:
+        pass
+    assert sorted(first.loaded) == ["/", "/a", "/b"]
+    assert not checkpoint.extraction_done
+
+    resumed = crawl_checkpoint.CrawlCheckpoint.open(base, 2, resume=True)
+    assert resumed.run_id == checkpoint.run_id
+    second = FakeDriver()
+    urls = url_extractor.URLExtractor(second, **offline).extract_urls(base, max_depth=2, checkpoint=resumed)
+    assert second.loaded == ["/c"]  # visited pages are not loaded again
+    assert urls == ["https://example.com/", "https://example.com/a", "https://example.com/b", "https://example.com/c"]
+
+    resumed.mark_analyzed(urls[0])
+    resumed.mark_done(urls[1], [{"test_name": "Login", "result": {"success": True}}])
+    again = crawl_checkpoint.CrawlCheckpoint.open(base, 2, resume=True)
+    assert again.extraction_done
+    assert again.stage_of(urls[0]) == "analyzed"
+    assert again.stage_of(urls[1]) == "done"
+    assert again.results_of(urls[1]) == [{"test_name": "Login", "result": {"success": True}}]
+    assert again.stage_of(urls[2]) is None
+
+    again.complete()
+    assert crawl_checkpoint.CrawlCheckpoint.open(base, 2, resume=True).run_id != checkpoint.run_id
+
+
+def test_parallel_crawl_checkpoints_every_url_before_it_is_visited(tmp_path, monkeypatch):
+    import time
+    from sqlalchemy.orm import sessionmaker
+    from autotest.db.database import Base
+    from autotest.core import crawl_checkpoint, url_extractor
+    from autotest.core.browser_pool import BrowserPool
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'crawl.db'}")
+    Base.metadata.create_all(engine, tables=[crawl_checkpoint.CrawlRun.__table__, crawl_checkpoint.CrawlURL.__table__])
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(crawl_checkpoint, "SessionLocal", Session)
+
+    site = {"/": ["/a", "/b", "/c"], "/a": ["/a1", "/a2"], "/b": ["/b1"], "/c": [], "/a1": [], "/a2": [], "/b1": []}
+
+    class SiteDriver:
+        window_handles = ["main"]
+
+        def get(self, url):
+            self.path = url.replace("https://example.com", "") or "/"
+
+        def find_element(self, by, value):
+            return object()
+
+        def execute_script(self, script):
+            if script == "return 1;":
+                return 1
+            return [f"https://example.com{path}" for path in site.get(getattr(self, "path", "/"), [])]
+
+        def execute_cdp_cmd(self, command, params):
+            pass
+
+        def quit(self):
+            pass
+
+    checkpoint = crawl_checkpoint.CrawlCheckpoint.open("https://example.com/", 2)
+    record_visit = checkpoint.record_visit
+
+    def slow_record_visit(url, discovered):
+        if url.endswith("/a"):
+            time.sleep(0.2)  # the other fetchers finish /b and /c meanwhile and pop /a's links
+        record_visit(url, discovered)
+
+    checkpoint.record_visit = slow_record_visit
+    pool = BrowserPool(size=3, driver_factory=SiteDriver)
+    extractor = url_extractor.URLExtractor(None, browser_pool=pool, requests_per_second=0, discovery="browser",
+                                           use_sitemaps=False, respect_robots=False)
+    urls = extractor.extract_urls("https://example.com/", max_depth=2, workers=3, checkpoint=checkpoint)
+    pool.close()
+
+    assert len(urls) == len(site)
+    with Session() as db:
+        states = dict(db.query(crawl_checkpoint.CrawlURL.url, crawl_checkpoint.CrawlURL.state).all())
+    assert states == {url: "visited" for url in urls}
+
+
+def test_change_detector_uses_stored_validators_and_scripts(tmp_path, monkeypatch):
+    import httpx
+    from sqlalchemy.orm import sessionmaker
+    from autotest.core import change_detector
+    from autotest.core.selection_policy import SelectionPolicy
+    from autotest.db.database import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'pages.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE page (page_url VARCHAR PRIMARY KEY, test_cases JSON, dom_fingerprint VARCHAR(64))"))
+    run_migrations(engine)  # adds the validator columns to old page tables
+    assert {"etag", "last_modified"} <= {c["name"] for c in inspect(engine).get_columns("page")}
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE page"))
+    Base.metadata.create_all(engine, tables=[page.Page.__table__, test_case_data.TestCase.__table__])
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(change_detector, "SessionLocal", Session)
+
+    url = "https://example.com/login"
+    login, logout = {"name": "Login", "type": "auth"}, {"name": "Logout", "type": "auth"}
+    with Session() as db:
+        db.add(page.Page(page_url=url, test_cases=[login, logout], page_metadata={"title": "Login"}, etag='"v1"'))
+        db.add(test_case_data.TestCase(page_url=url, test_case_data=login, test_script="print('login')",
+                                       script_path="test_scripts/test_login.py"))
+        db.commit()
+
+    current = {"etag": '"v1"'}
+
+    def respond(request):
+        if request.headers.get("if-none-match") == current["etag"]:
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"etag": current["etag"], "content-type": "text/html"}, text="<html></html>")
+
+    detector = change_detector.PageChangeDetector()
+    detector.client = httpx.Client(transport=httpx.MockTransport(respond))
+
+    assert detector.check(url) == change_detector.NOT_MODIFIED
+    assert detector.stored_analysis(url, SelectionPolicy()) is None  # Logout has no script yet
+    analysis = detector.stored_analysis(url, SelectionPolicy(name_pattern="^Login$"))
+    assert analysis["scripts"] == [{"script": "print('login')", "filename": "test_login.py"}]
+    assert analysis["selected_test_cases"] == [login]
+    detector.record(url, change_detector.NOT_MODIFIED)
+
+    current["etag"] = '"v2"'
+    assert detector.check(url) == change_detector.MODIFIED
+    detector.record(url, "analyzed")
+    with Session() as db:
+        assert db.get(page.Page, url).etag == '"v2"'
+    assert detector.check("https://example.com/new") == change_detector.UNKNOWN
+
+    stats = detector.get_stats()
+    assert stats["pages"] == 2 and stats["analyses_skipped"] == 1 and stats["page_loads_skipped"] == 1
+
+
+def test_migration_rekeys_auth_sessions_by_account(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE auth_session (id INTEGER PRIMARY KEY, host VARCHAR UNIQUE, origin VARCHAR, "
+                                "cookies JSON, local_storage JSON, expires_at DATETIME, timestamp DATETIME)"))
+        connection.execute(text("INSERT INTO auth_session (host) VALUES ('app.example.com')"))
+
+    run_migrations(engine)
+    run_migrations(engine)  # idempotent
+
+    assert "username" in {c["name"] for c in inspect(engine).get_columns("auth_session")}
+    with engine.begin() as connection:
+        # Sessions of unknown accounts are dropped, two accounts of one host can be stored
+        assert connection.execute(text("SELECT COUNT(*) FROM auth_session")).scalar() == 0
+        connection.execute(text("INSERT INTO auth_session (host, username) VALUES ('app.example.com', 'a'), ('app.example.com', 'b')"))
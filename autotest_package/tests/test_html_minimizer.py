@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("lxml")
+
+from autotest.core.html_minimizer import minimize_html
+from autotest.core.rate_limiter import estimate_tokens
+
+PAGE = (
+    "<!DOCTYPE html><html><head><title>Shop</title><script>track()</script><style>a{}</style></head>"
+    "<body style='color:red' data-tracking='x'><!-- banner -->"
+    "<nav><a href='/cart' onmouseover='hover()'>Cart</a> items <svg><path d='M0'/></svg></nav>"
+    "<form id='search' action='/s'><input name='q' type='text' data-testid='q'>"
+    "<button type='submit'>Go</button></form>"
+    "<div class='article'>" + "<p>lorem   ipsum dolor sit amet</p>" * 200 + "</div>"
+    "</body></html>"
+)
+
+
+def test_minimize_html_strips_noise_and_keeps_test_attributes():
+    html = minimize_html(PAGE)
+    assert "<script" not in html and "<style" not in html and "<path" not in html
+    assert "banner" not in html
+    assert "style=" not in html and "data-tracking" not in html and "onmouseover" not in html
+    assert '<input name="q" type="text" data-testid="q">' in html
+    assert "<a href=\"/cart\">Cart</a> items <svg></svg>" in html
+    assert "lorem ipsum dolor sit amet" in html
+    assert "> <" not in html
+
+
+def test_minimize_html_prunes_least_relevant_content_to_budget():
+    html = minimize_html(PAGE, token_budget=200)
+    assert estimate_tokens(html) <= 201
+    assert '<form id="search" action="/s">' in html
+    assert "<button type=\"submit\">Go</button>" in html
+    assert "lorem" not in html
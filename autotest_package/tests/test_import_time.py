@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI_IMPORT_BUDGET_US = 500_000  # `autotest-cli --help` used to take several seconds
+HEAVY_MODULES = ("langchain", "selenium", "sqlalchemy", "bs4", "PIL", "tldextract", "openai", "anthropic", "google")
+
+
+def _import_times(statement):
+    """Run a statement under -X importtime and return cumulative import time (us) per module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, cwd=PACKAGE_ROOT, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_stays_within_budget():
+    times = _import_times("import autotest.cli.main")
+    heavy = [name for name in times if name.split(".")[0] in HEAVY_MODULES]
+    assert heavy == []
+    assert times["autotest.cli.main"] < CLI_IMPORT_BUDGET_US
+
+
+def test_only_chosen_provider_sdk_is_imported():
+    result = subprocess.run(
+        [sys.executable, "-c",
+         "import json, sys\n"
+         "from autotest.core.llm_wrapper import LLMWrapper\n"
+         "LLMWrapper(llm_provider_choice=5, use_cache=False)\n"
+         "print(json.dumps(sorted(m for m in sys.modules if m.split('.')[0] in "
+         "('langchain_openai', 'langchain_groq', 'langchain_google_genai', 'langchain_anthropic', 'langchain_ollama'))))"],
+        capture_output=True, text=True, cwd=PACKAGE_ROOT, check=True
+    )
+    loaded = {name.split(".")[0] for name in json.loads(result.stdout.strip().splitlines()[-1])}
+    assert loaded == {"langchain_ollama"}
@@ -0,0 +1,90 @@
+import pytest
+from autotest import LLMWrapper
+from autotest.core.llm_cache import LLMResponseCache
+from autotest.core.rate_limiter import TokenBucket
+
+
+class FakeModel:
+    def __init__(self, model="fake-model", temperature=0.2):
+        self.model = model
+        self.temperature = temperature
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+
+        class Response:
+            content = f"response {self.calls}"
+        return Response()
+
+    async def ainvoke(self, messages):
+        if "fail" in messages[-1].content:
+            raise ValueError("provider error")
+
+        class Response:
+            content = f"async {messages[-1].content}"
+        return Response()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMResponseCache(cache_path=str(tmp_path / "llm_cache.db"), max_entries=2, ttl_seconds=0)
+    yield cache
+    cache.close()
+
+
+def test_cache_key_depends_on_model_and_prompts():
+    key = LLMResponseCache.make_key("openai", "analysis", "gpt", 0.2, "system", "user")
+    assert key == LLMResponseCache.make_key("openai", "analysis", "gpt", 0.2, "system", "user")
+    assert key != LLMResponseCache.make_key("openai", "analysis", "gpt", 0.3, "system", "user")
+    assert key != LLMResponseCache.make_key("openai", "analysis", "gpt", 0.2, "system", "other")
+
+
+def test_cache_hit_miss_and_lru_eviction(cache):
+    assert cache.get("a") is None
+    cache.set("a", "first")
+    cache.set("b", "second")
+    assert cache.get("a") == "first"
+    cache.set("c", "third")  # evicts "b", the least recently used entry
+
+    assert cache.get("b") is None
+    assert cache.get("c") == "third"
+    stats = cache.get_stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["entries"] == 2
+
+
+def test_generate_serves_repeated_requests_from_cache(tmp_path):
+    llm = LLMWrapper(llm_provider_choice=5, use_cache=False)
+    llm.cache = LLMResponseCache(cache_path=str(tmp_path / "llm_cache.db"))
+    llm.models["selenium"] = FakeModel()
+
+    first = llm.generate("system", "user", model_type="selenium")
+    second = llm.generate("system", "user", model_type="selenium")
+
+    assert first == second == "response 1"
+    assert llm.models["selenium"].calls == 1
+    assert llm.get_cache_stats()["hits"] == 1
+
+
+def test_token_bucket_reservations_queue_up():
+    bucket = TokenBucket(60)  # one token per second
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(1) == pytest.approx(1, abs=0.05)
+    assert bucket.reserve(1) == pytest.approx(2, abs=0.05)
+
+
+def test_generate_many_keeps_order_and_isolates_failures():
+    llm = LLMWrapper(llm_provider_choice=5, use_cache=False)
+    llm.models["selenium"] = FakeModel()
+
+    results = llm.generate_many(
+        [("system", "first"), ("system", "fail"), ("system", "third")],
+        model_type="selenium",
+        max_concurrency=2
+    )
+
+    assert results[0] == "async first"
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == "async third"
@@ -0,0 +1,57 @@
+import pytest
+
+from autotest.core.page_chunker import merge_page_analyses, split_into_regions
+from autotest.core.rate_limiter import estimate_tokens
+
+
+def test_split_into_regions_follows_landmarks():
+    pytest.importorskip("lxml")
+    html = (
+        "<html><body>"
+        "<nav>" + "<a href='/x'>Link</a>" * 40 + "</nav>"
+        "<main><form id='login'><input name='user'></form>" + "<p>text</p>" * 80 + "</main>"
+        "<div>" + "<span>loose</span>" * 40 + "</div>"
+        "<footer>" + "<a href='/f'>Footer</a>" * 40 + "</footer>"
+        "</body></html>"
+    )
+    regions = split_into_regions(html, max_tokens=300)
+
+    labels = [label for label, _ in regions]
+    assert labels[0] == "nav"
+    assert any("main" in label for label in labels)
+    assert labels[-1].endswith("body")
+    assert all(estimate_tokens(chunk) <= 300 for _, chunk in regions)
+    assert any("<form id=\"login\">" in chunk for _, chunk in regions)
+
+    assert split_into_regions("<p>small</p>", max_tokens=300) == [("page", "<p>small</p>")]
+
+
+def test_merge_page_analyses_is_deterministic():
+    nav = {
+        "auth_requirements": {"auth_required": False, "auth_type": "none", "auth_fields": []},
+        "interactive_elements": [{"type": "link", "selector": "nav a.home"}],
+        "key_actions": ["navigate"],
+        "main_content": "Navigation",
+    }
+    form = {
+        "auth_requirements": {"auth_required": True, "auth_type": "login",
+                              "auth_fields": [{"name": "user", "selector": "#user"}], "credentials_hint": "demo"},
+        "contact_form_fields": [{"id": "login", "fields": []}],
+        "interactive_elements": [{"type": "link", "selector": "nav a.home"}, {"type": "button", "selector": "#go"}],
+        "key_actions": ["navigate", "log in"],
+        "content_hierarchy": {"primary_sections": ["Login"]},
+        "main_content": "Login form",
+    }
+
+    merged = merge_page_analyses([nav, None, form])
+
+    assert merged == merge_page_analyses([nav, form])
+    assert merged["auth_requirements"] == {
+        "auth_required": True, "auth_type": "login",
+        "auth_fields": [{"name": "user", "selector": "#user"}], "credentials_hint": "demo"
+    }
+    assert [e["selector"] for e in merged["interactive_elements"]] == ["nav a.home", "#go"]
+    assert merged["key_actions"] == ["navigate", "log in"]
+    assert merged["main_content"] == "Navigation Login form"
+    assert merged["content_hierarchy"] == {"primary_sections": ["Login"]}
+    assert merge_page_analyses([]) == {}
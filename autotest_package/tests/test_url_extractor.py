@@ -0,0 +1,233 @@
+import pytest
+from autotest.core.dom_scripts import ANCHOR_HREFS_SCRIPT
+from autotest.core.url_extractor import CrawlFrontier, URLExtractor
+from autotest.core.rate_limiter import HostRateLimiter
+
+
+def test_frontier_pops_shallowest_first_and_ignores_known_urls():
+    frontier = CrawlFrontier()
+    frontier.add_seen(["https://example.com/visited"])
+    assert frontier.push("https://example.com/", 0)
+    assert frontier.push("https://example.com/deep", 2)
+    assert frontier.push("https://example.com/a", 1)
+    assert frontier.push("https://example.com/b", 1)
+    assert not frontier.push("https://example.com/a", 1)
+    assert not frontier.push("https://example.com/visited", 1)
+
+    assert len(frontier) == 4
+    order = [frontier.pop() for _ in range(4)]
+    assert order == [("https://example.com/", 0), ("https://example.com/a", 1),
+                     ("https://example.com/b", 1), ("https://example.com/deep", 2)]
+    assert not frontier
+    assert "https://example.com/a" in frontier  # still indexed after being fetched
+
+
+def test_host_rate_limiter_spaces_requests_per_host():
+    limiter = HostRateLimiter(requests_per_second=2)
+    assert limiter.reserve("a.example.com") == 0
+    assert limiter.reserve("a.example.com") == pytest.approx(0.5, abs=0.05)
+    assert limiter.reserve("b.example.com") == 0  # other hosts are not delayed
+    limiter.set_interval("b.example.com", 3)
+    assert limiter.reserve("b.example.com") == pytest.approx(0.5, abs=0.05)
+    assert limiter.reserve("b.example.com") == pytest.approx(3.5, abs=0.05)
+    assert HostRateLimiter(requests_per_second=0).reserve("a.example.com") == 0
+
+
+def test_parallel_extraction_visits_each_page_once_up_to_max_depth():
+    import threading
+    from autotest.core.browser_pool import BrowserPool
+
+    # Every page links back to the root and to its two children
+    def links(path):
+        return ["/", f"{path.rstrip('/')}/x", f"{path.rstrip('/')}/y", "https://other.example.com/"]
+
+    loads = []
+    lock = threading.Lock()
+
+    class SiteDriver:
+        window_handles = ["main"]
+
+        def get(self, url):
+            self.url = url
+            with lock:
+                loads.append(url)
+
+        def find_element(self, by, value):
+            return object()
+
+        def execute_script(self, script):
+            if script != ANCHOR_HREFS_SCRIPT:
+                return 1 if script == "return 1;" else None
+            path = self.url.replace("https://example.com", "") or "/"
+            return [f"https://example.com{href}" if href.startswith("/") else href for href in links(path)]
+
+        def execute_cdp_cmd(self, command, params):
+            pass
+
+        def quit(self):
+            pass
+
+    pool = BrowserPool(size=3, driver_factory=SiteDriver)
+    extractor = URLExtractor(None, browser_pool=pool, requests_per_second=0, discovery="browser",
+                             use_sitemaps=False, respect_robots=False)
+    urls = extractor.extract_urls("https://example.com/", max_depth=2, workers=3)
+    pool.close()
+
+    expected = {"https://example.com/", "https://example.com/x", "https://example.com/y",
+                "https://example.com/x/x", "https://example.com/x/y", "https://example.com/y/x", "https://example.com/y/y"}
+    assert set(urls) == expected
+    assert sorted(url for url in loads if url != "about:blank") == sorted(expected)  # blank loads are pool resets
+
+
+def test_looks_js_rendered_detects_client_side_pages():
+    from autotest.core.link_discovery import looks_js_rendered, parse_page
+
+    ssr = parse_page('<html><body><a href="/a">A</a><a href="b">B</a><a href="#top">Top</a>'
+                     '<script src="app.js"></script></body></html>', "https://example.com/docs/")
+    assert ssr["hrefs"] == ["https://example.com/a", "https://example.com/docs/b", "https://example.com/docs/#top"]
+    assert not looks_js_rendered(ssr)
+
+    spa = parse_page('<html><body><div id="root"></div><script src="/bundle.js"></script></body></html>',
+                     "https://example.com/")
+    assert looks_js_rendered(spa)
+    assert looks_js_rendered(parse_page('<body><noscript>Please enable JavaScript</noscript><a href="/">Home</a></body>',
+                                        "https://example.com/"))
+    assert not looks_js_rendered(parse_page('<body><p>No links, no scripts</p></body>', "https://example.com/"))
+
+
+def test_hybrid_extraction_renders_only_js_pages_in_the_browser(monkeypatch):
+    import functools
+    import httpx
+    from autotest.core import link_discovery
+
+    pages = {
+        "/": '<html><body><a href="/a">A</a><a href="/spa">App</a><a href="/file.pdf">PDF</a></body></html>',
+        "/a": '<html><body><a href="/">Home</a><a href="/a/b">B</a></body></html>',
+        "/a/b": '<html><body><a href="/">Home</a></body></html>',
+        "/spa": '<html><body><div id="root"></div><script src="/bundle.js"></script></body></html>',
+        "/spa/x": '<html><body><a href="/">Home</a></body></html>',
+    }
+
+    def respond(request):
+        if request.url.path not in pages and request.url.path != "/file.pdf":
+            return httpx.Response(404)  # no robots.txt or sitemap
+        if request.url.path == "/file.pdf":
+            return httpx.Response(200, headers={"content-type": "application/pdf"}, content=b"%PDF")
+        return httpx.Response(200, headers={"content-type": "text/html"}, text=pages[request.url.path])
+
+    monkeypatch.setattr(link_discovery.httpx, "Client",
+                        functools.partial(httpx.Client, transport=httpx.MockTransport(respond)))
+
+    rendered = []
+
+    class RenderingDriver:
+        def get(self, url):
+            rendered.append(url)
+
+        def find_element(self, by, value):
+            return object()
+
+        def execute_script(self, script):
+            assert script == ANCHOR_HREFS_SCRIPT
+            return ["https://example.com/spa/x"]
+
+    extractor = URLExtractor(RenderingDriver(), requests_per_second=0)
+    urls = extractor.extract_urls("https://example.com/", max_depth=2)
+
+    assert set(urls) == {"https://example.com/", "https://example.com/a", "https://example.com/spa",
+                         "https://example.com/file.pdf", "https://example.com/a/b", "https://example.com/spa/x"}
+    assert rendered == ["https://example.com/spa"]
+
+
+def test_sitemap_seeding_respects_robots_and_follows_unchanged_pages(tmp_path, monkeypatch):
+    import functools
+    import gzip
+    from datetime import datetime
+    import httpx
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from autotest.core import sitemap, url_extractor
+    from autotest.db.database import Base
+    from autotest.tables import domain, page, redirect, test_case_data  # all mapped classes for relationship setup
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'pages.db'}")
+    Base.metadata.create_all(engine, tables=[page.Page.__table__])
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(page.Page(page_url="https://example.com/deep/page", test_cases=[], analyzed_at=datetime(2021, 1, 1)))
+        # Updated (timestamp) but never analyzed, so its lastmod can't prove anything
+        db.add(page.Page(page_url="https://example.com/blog/old", test_cases=[]))
+        db.commit()
+    monkeypatch.setattr(url_extractor, "SessionLocal", Session)
+
+    urlset = ('<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+              '{}</urlset>')
+    entry = "<url><loc>https://example.com{}</loc><lastmod>{}</lastmod></url>"
+    files = {
+        "/robots.txt": "User-agent: *\nDisallow: /private\nSitemap: https://example.com/sitemap_index.xml\n",
+        "/sitemap_index.xml": '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                              '<sitemap><loc>https://example.com/pages.xml.gz</loc></sitemap>'
+                              '<sitemap><loc>https://example.com/blog.xml</loc></sitemap></sitemapindex>',
+        "/pages.xml.gz": gzip.compress(urlset.format(entry.format("/deep/page", "2020-01-01")
+                                                     + entry.format("/private/report", "2020-01-01")).encode()),
+        "/blog.xml": urlset.format(entry.format("/blog/new", "2099-01-01T00:00:00Z") + entry.format("/blog/old", "2020-01-01")),
+        "/": '<html><body><a href="/about">About</a><a href="/private/admin">Admin</a></body></html>',
+        "/about": "<html><body><p>About us</p></body></html>",
+        "/blog/new": "<html><body><p>News</p></body></html>",
+        "/blog/old": "<html><body><p>Old news</p></body></html>",
+        "/deep/page": '<html><body><a href="/deep/page/child">Only linked from here</a></body></html>',
+        "/deep/page/child": "<html><body><p>Child</p></body></html>",
+    }
+    fetched = []
+
+    def respond(request):
+        fetched.append(request.url.path)
+        body = files.get(request.url.path)
+        if body is None:
+            return httpx.Response(404)
+        content_type = "text/html" if not request.url.path.endswith((".txt", ".xml", ".gz")) else "application/xml"
+        return httpx.Response(200, headers={"content-type": content_type},
+                              content=body if isinstance(body, bytes) else body.encode())
+
+    monkeypatch.setattr(url_extractor.httpx, "Client",
+                        functools.partial(httpx.Client, transport=httpx.MockTransport(respond)))
+
+    extractor = URLExtractor(None, requests_per_second=0, find_unchanged=True)
+    urls = extractor.extract_urls("https://example.com/", max_depth=2)
+
+    assert set(urls) == {"https://example.com/", "https://example.com/about", "https://example.com/deep/page",
+                         "https://example.com/deep/page/child", "https://example.com/blog/new", "https://example.com/blog/old"}
+    # Unchanged pages only skip their analysis in incremental runs, their links are still followed
+    assert extractor.unchanged_urls == {"https://example.com/deep/page"}
+    assert "/deep/page" in fetched
+    assert not any(path.startswith("/private") for path in fetched)
+
+    extractor = URLExtractor(None, requests_per_second=0)
+    extractor.extract_urls("https://example.com/", max_depth=1)
+    assert extractor.unchanged_urls == set()  # only collected for incremental runs
+
+    files["/robots.txt"] = "User-agent: autotest-web-generator\nCrawl-delay: 5\nDisallow: /private\n"
+    with httpx.Client(transport=httpx.MockTransport(respond)) as client:
+        rules = sitemap.fetch_robots(client, "https://example.com/")
+    assert rules.crawl_delay == 5
+    assert not rules.allowed("https://example.com/private/report")
+
+
+def test_sitemap_image_extension_does_not_replace_page_urls():
+    import httpx
+    from autotest.core import sitemap
+
+    body = ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+            'xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">'
+            '<url><loc>https://ex.com/page</loc><lastmod>2024-05-01</lastmod>'
+            '<image:image><image:loc>https://ex.com/img.jpg</image:loc></image:image></url>'
+            '<url><image:image><image:loc>https://ex.com/orphan.jpg</image:loc></image:image>'
+            '<loc>https://ex.com/other</loc></url>'
+            '</urlset>')
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body.encode()))
+    with httpx.Client(transport=transport) as client:
+        entries = list(sitemap.iter_sitemap_urls(client, ["https://ex.com/sitemap.xml"]))
+
+    assert [url for url, _ in entries] == ["https://ex.com/page", "https://ex.com/other"]
+    assert entries[0][1] == sitemap.parse_lastmod("2024-05-01")
@@ -0,0 +1,22 @@
+from autotest.core.verdict import classify_output, output_fingerprint
+
+
+def test_classify_output_decides_common_results_locally():
+    assert classify_output("2024-05-01 10:00:00 INFO AUTOTEST_RESULT: PASS\n", 0)[0] is True
+    assert classify_output("AUTOTEST_RESULT: PASS\nAUTOTEST_RESULT: FAIL\n", 1)[0] is False
+    assert classify_output("AUTOTEST_RESULT: PASS\n", 1)[0] is None  # contradicts the exit code
+    assert classify_output("....\nRan 4 tests in 3.201s\n\nOK\n", 0)[0] is True
+    assert classify_output("Ran 2 tests in 1.0s\n\nFAILED (failures=1)\n", 1)[0] is False
+    assert classify_output("===== 1 failed, 2 passed in 4.10s =====\n", 0)[0] is False
+    assert classify_output("Traceback (most recent call last):\nTimeoutException\n", 1)[0] is False
+    # Scripts that log a failure but exit with 0 need the LLM
+    assert classify_output("ERROR - Expected error message not found\n", 0)[0] is None
+    assert classify_output('    print("AUTOTEST_RESULT: PASS")\n', 0)[0] is None
+
+
+def test_output_fingerprint_ignores_run_specific_details():
+    first = "2024-05-01 10:00:00,123 INFO Loaded page in 1.52s <WebElement 0x7f3a2c>\n"
+    second = "2024-06-11 17:45:09,999 INFO Loaded page in 0.98s <WebElement 0x7f11ff>\n"
+    assert output_fingerprint(first, 0) == output_fingerprint(second, 0)
+    assert output_fingerprint(first, 0) != output_fingerprint(first, 1)
+    assert output_fingerprint(first, 0) != output_fingerprint(first.replace("Loaded", "Failed to load"), 0)
@@ -9,4 +9,466 @@ def test_web_test_generator_init():
 def test_supported_languages():
     from autotest.core.web_test_generator import SUPPORTED_LANGUAGES
     assert "selenium" in SUPPORTED_LANGUAGES
-    assert "python" in SUPPORTED_LANGUAGES["selenium"]
\ No newline at end of file
+    assert "python" in SUPPORTED_LANGUAGES["selenium"]
+
+def test_split_batched_response():
+    response = (
+        "### TEST_CASE 2\n```python\nprint('second')\n```\n"
+        "### TEST_CASE 1\n```python\nprint('first')\n```\n"
+        "### TEST_CASE 3\nno code here\n"
+    )
+    parts = WebTestGenerator._split_batched_response(response, 3)
+    assert "print('first')" in parts[0]
+    assert "print('second')" in parts[1]
+    assert parts[2] is None
+
+def test_url_worker_pool_merges_results_in_url_order():
+    import logging
+    import threading
+    import time
+    from autotest.core.browser_pool import BrowserPool
+    from autotest.core.worker_pool import URLWorkerPool
+
+    class FakeWorker:
+        def __init__(self, driver):
+            self.driver = driver
+            self.test_results = []
+            self.visited_pages = set()
+
+        def process_single_url(self, url, username, password, no_cache):
+            time.sleep(0.05 if url.endswith("/0") else 0)
+            self.test_results.append({'url': url, 'thread': threading.current_thread().name})
+            self.visited_pages.add(url)
+
+    class FakeGenerator:
+        def __init__(self):
+            self.logger = logging.getLogger("test")
+            self.test_results = []
+            self.visited_pages = set()
+
+        def spawn_worker(self, driver):
+            return FakeWorker(driver)
+
+    drivers = []
+
+    def driver_factory():
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    generator = FakeGenerator()
+    pool = BrowserPool(size=2, driver_factory=driver_factory)
+    urls = [f"https://example.com/{i}" for i in range(5)]
+    URLWorkerPool(generator, workers=2, browser_pool=pool).run(urls)
+
+    assert [r['url'] for r in generator.test_results] == urls
+    assert generator.visited_pages == set(urls)
+    assert len(drivers) <= 2
+    assert pool.get_stats()["leases"] == 5
+
+
+def test_url_worker_pool_keeps_results_of_other_urls_when_one_fails():
+    import logging
+    from autotest.core.browser_pool import BrowserPool
+    from autotest.core.worker_pool import URLWorkerPool
+
+    class FakeWorker:
+        def __init__(self):
+            self.test_results = []
+            self.visited_pages = set()
+
+        def process_single_url(self, url, username, password, no_cache):
+            if url.endswith("/1"):
+                raise RuntimeError("browser crashed")
+            self.test_results.append({'url': url})
+            self.visited_pages.add(url)
+
+    class FakeGenerator:
+        def __init__(self):
+            self.logger = logging.getLogger("test")
+            self.test_results = []
+            self.visited_pages = set()
+
+        def spawn_worker(self, driver):
+            return FakeWorker()
+
+    generator = FakeGenerator()
+    pool = BrowserPool(size=2, driver_factory=FakeDriver)
+    urls = [f"https://example.com/{i}" for i in range(3)]
+    outcomes = URLWorkerPool(generator, workers=2, browser_pool=pool).run(urls)
+
+    assert [r['url'] for r in generator.test_results] == [urls[0], urls[2]]
+    assert outcomes[1] == (urls[1], [], set())
+
+def test_run_script_process_kills_timed_out_script(tmp_path):
+    import subprocess
+    from autotest.core.script_runner import run_script_process
+
+    script = tmp_path / "slow.py"
+    script.write_text("import time\nprint('started')\ntime.sleep(30)\n")
+    with pytest.raises(subprocess.TimeoutExpired):
+        run_script_process(str(script), timeout=1)
+
+    script.write_text("print('done')\n")
+    result = run_script_process(str(script), timeout=10, cpu_limit_seconds=5)
+    assert result.returncode == 0
+    assert result.stdout.strip() == "done"
+
+def test_run_script_process_enforces_memory_limit(tmp_path):
+    import sys
+    from autotest.core.script_runner import run_script_process
+
+    if not sys.platform.startswith("linux"):
+        pytest.skip("memory limits are sampled from /proc")
+
+    # An address space limit this low would keep the interpreter (let alone Chrome) from starting
+    script = tmp_path / "small.py"
+    script.write_text("import threading\nprint('done')\n")
+    result = run_script_process(str(script), timeout=10, memory_limit_mb=100)
+    assert result.returncode == 0
+    assert result.stdout.strip() == "done"
+
+    script = tmp_path / "hungry.py"
+    script.write_text("import time\ndata = b'x' * (300 * 1024 * 1024)\nprint('allocated', flush=True)\ntime.sleep(30)\n")
+    result = run_script_process(str(script), timeout=20, memory_limit_mb=100)
+    assert result.returncode != 0
+    assert "100 MB limit" in result.stderr
+
+def test_parallel_script_execution_keeps_script_order():
+    import logging
+    import time
+
+    tester = WebTestGenerator.__new__(WebTestGenerator)
+    tester.logger = logging.getLogger("test")
+    tester.driver = None
+    tester.test_results = []
+    tester.script_workers = 3
+
+    def fake_execute(script):
+        time.sleep(0.1 if script == "first" else 0)
+        return {'success': True, 'output': script, 'error': ''}
+
+    tester.execute_test_script = fake_execute
+    tester._execute_scripts_in_parallel([(f"Test {i}", f"test_{i}.py", name) for i, name in enumerate(["first", "second", "third"])])
+
+    assert [r['test_name'] for r in tester.test_results] == ["Test 0", "Test 1", "Test 2"]
+    assert [r['result']['output'] for r in tester.test_results] == ["first", "second", "third"]
+
+def test_selection_policy_filters_test_cases_and_urls(tmp_path):
+    from autotest.core.selection_policy import SelectionPolicy
+
+    test_cases = [
+        {'name': 'Valid login', 'type': 'auth'},
+        {'name': 'Search results', 'type': 'functional'},
+        {'name': 'Invalid login', 'type': 'Auth'},
+        {'name': 'Footer links', 'type': 'navigation'},
+    ]
+    assert SelectionPolicy().select_test_cases(test_cases) == [1, 2, 3, 4]
+    assert SelectionPolicy(types=['auth']).select_test_cases(test_cases) == [1, 3]
+    assert SelectionPolicy(name_pattern='login', max_per_page=1).select_test_cases(test_cases) == [1]
+    assert SelectionPolicy(types=['checkout']).select_test_cases(test_cases) == []
+
+    urls = ["https://example.com/", "https://example.com/blog/1", "https://example.com/blog/2"]
+    assert SelectionPolicy(url_pattern='/blog/', max_urls=1).select_urls(urls) == [2]
+    assert SelectionPolicy.as_answer([1, 3]) == "1,3"
+    assert SelectionPolicy.as_answer([]) == "quit"
+
+    policy_file = tmp_path / "policy.yaml"
+    policy_file.write_text("types: [navigation]\nmax_urls: 2\n")
+    policy = SelectionPolicy.from_file(str(policy_file))
+    assert policy.select_test_cases(test_cases) == [4]
+    assert policy.select_urls(urls) == [1, 2]
+
+def test_resolve_cache_state_follows_dom_fingerprint(tmp_path, monkeypatch):
+    import logging
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from autotest.core import web_test_generator
+    from autotest.db.database import Base
+    from autotest.tables.page import Page
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'pages.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(web_test_generator, "SessionLocal", Session)
+
+    class FakeDriver:
+        structure = {'forms': [], 'interactive': [['a', None, None, None, '/home', None, None, False, False, '']]}
+
+        def execute_script(self, script):
+            return self.structure
+
+    tester = WebTestGenerator.__new__(WebTestGenerator)
+    tester.logger = logging.getLogger("test")
+    tester.driver = FakeDriver()
+    url = "https://example.com/"
+
+    regenerate, first_time, fingerprint = tester._resolve_cache_state(url, no_cache=False)
+    assert (regenerate, first_time) == (False, True)
+
+    with Session() as db:
+        db.add(Page(page_url=url, test_cases=[], dom_fingerprint=fingerprint))
+        db.commit()
+    assert tester._resolve_cache_state(url, no_cache=False)[:2] == (False, False)
+    assert tester._resolve_cache_state(url, no_cache=True)[:2] == (True, False)
+
+    FakeDriver.structure = {'forms': [{'id': 'login', 'fields': []}], 'interactive': []}
+    assert tester._resolve_cache_state(url, no_cache=False)[:2] == (False, True)
+
+
+class FakeDriver:
+    """Minimal WebDriver stand-in for browser pool tests"""
+
+    def __init__(self):
+        self.cookies_cleared = 0
+        self.quit_called = False
+        self.healthy = True
+        self.window_handles = ["main"]
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("session crashed")
+        if script == "return 1;":
+            return 1
+        return None
+
+    def execute_cdp_cmd(self, command, params):
+        if command == "Network.clearBrowserCookies":
+            self.cookies_cleared += 1
+
+    def get(self, url):
+        self.url = url
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_browser_pool_resets_recycles_and_replaces_unhealthy_sessions():
+    from autotest.core.browser_pool import BrowserPool
+
+    drivers = []
+
+    def driver_factory():
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    pool = BrowserPool(size=1, max_leases=2, driver_factory=driver_factory)
+    with pool.lease() as driver:
+        assert driver is drivers[0]
+    assert drivers[0].cookies_cleared == 1 and drivers[0].url == "about:blank"
+
+    with pool.lease() as driver:
+        assert driver is drivers[0]  # warm session reused
+    assert drivers[0].quit_called  # recycled after max_leases
+
+    with pool.lease() as driver:
+        assert driver is drivers[1]
+        driver.healthy = False
+    assert drivers[1].quit_called  # reset failed, session discarded
+
+    with pool.lease() as driver:
+        assert driver is drivers[2]
+    drivers[2].healthy = False  # crashes while idle
+    with pool.lease() as driver:
+        assert driver is drivers[3]
+    assert pool.get_stats()["unhealthy"] == 1
+
+    pool.close()
+    assert pool.get_stats()["live"] == 0
+
+
+def test_browser_pool_clears_every_visited_origin_and_recycles_on_process_memory_growth(monkeypatch):
+    from types import SimpleNamespace
+    from autotest.core import browser_pool
+    from autotest.core.browser_pool import BrowserPool
+
+    class HistoryDriver(FakeDriver):
+        def __init__(self):
+            super().__init__()
+            self.service = SimpleNamespace(process=SimpleNamespace(pid=4242))
+            self.cleared_origins = []
+
+        def execute_cdp_cmd(self, command, params):
+            super().execute_cdp_cmd(command, params)
+            if command == "Page.getNavigationHistory":
+                return {"entries": [{"url": "about:blank"}, {"url": "https://shop.example.com/cart"},
+                                    {"url": "https://example.com/login?next=/"}]}
+            if command == "Page.getFrameTree":
+                return {"frameTree": {"frame": {"url": "https://example.com/"},
+                                      "childFrames": [{"frame": {"url": "https://pay.example.net/widget"}}]}}
+            if command == "Storage.clearDataForOrigin":
+                self.cleared_origins.append(params["origin"])
+            return {}
+
+    memory = {"value": 300 * 1024 * 1024}
+    monkeypatch.setattr(browser_pool, "process_tree_memory", lambda pid: memory["value"])
+    drivers = []
+
+    def driver_factory():
+        drivers.append(HistoryDriver())
+        return drivers[-1]
+
+    pool = BrowserPool(size=1, max_leases=None, max_memory_growth_mb=100, driver_factory=driver_factory)
+    with pool.lease():
+        pass
+    assert drivers[0].cleared_origins == ["https://example.com", "https://pay.example.net", "https://shop.example.com"]
+
+    memory["value"] += 50 * 1024 * 1024
+    with pool.lease() as driver:
+        assert driver is drivers[0]  # grew less than the limit
+    memory["value"] += 100 * 1024 * 1024
+    with pool.lease() as driver:
+        assert driver is drivers[0]
+    assert drivers[0].quit_called
+    assert pool.get_stats()["recycled"] == 1
+
+
+def test_script_harness_runs_scripts_in_process_on_pooled_driver():
+    from autotest.core.browser_pool import BrowserPool
+    from autotest.core.script_harness import ScriptHarness
+
+    drivers = []
+
+    def driver_factory():
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    pool = BrowserPool(size=1, driver_factory=driver_factory)
+    harness = ScriptHarness(browser_pool=pool)
+    script = (
+        "import unittest\n"
+        "from selenium import webdriver\n"
+        "from selenium.webdriver.chrome.service import Service\n"
+        "from webdriver_manager.chrome import ChromeDriverManager\n"
+        "class T(unittest.TestCase):\n"
+        "    def test_page(self):\n"
+        "        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))\n"
+        "        driver.get('http://example.com')\n"
+        "        print('visited', driver.url)\n"
+        "        driver.quit()\n"
+        "if __name__ == '__main__':\n"
+        "    unittest.main()\n"
+    )
+    result = harness.run(script)
+    assert result.returncode == 0
+    assert "visited http://example.com" in result.stdout
+    assert "Ran 1 test" in result.stderr and "OK" in result.stderr
+
+    failing = harness.run("from selenium import webdriver\ndriver = webdriver.Chrome()\nraise AssertionError('boom')\n")
+    assert failing.returncode == 1 and "AssertionError: boom" in failing.stderr
+
+    # Both scripts ran on the same warm session, which survived driver.quit()
+    assert len(drivers) == 1 and not drivers[0].quit_called
+    harness.close()
+    pool.close()
+    assert drivers[0].quit_called
+
+
+def test_script_harness_keeps_timed_out_script_output_out_of_later_runs():
+    import subprocess
+    import sys
+    import threading
+    import time
+    from autotest.core.browser_pool import BrowserPool
+    from autotest.core.script_harness import ScriptHarness
+
+    drivers = []
+
+    def driver_factory():
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    stdout = sys.stdout
+    pool = BrowserPool(size=1, driver_factory=driver_factory)
+    harness = ScriptHarness(browser_pool=pool)
+    with pytest.raises(subprocess.TimeoutExpired) as timed_out:
+        harness.run("import time\nprint('started')\nwhile True:\n    print('late')\n    time.sleep(0.01)\n", timeout=0.3)
+    assert "started" in timed_out.value.output
+    assert drivers[0].quit_called  # the hung script's browser is not leased again
+
+    result = harness.run("import time\ntime.sleep(0.1)\nprint('second')\n")
+    assert result.stdout == "second\n"
+    deadline = time.time() + 2
+    while any(thread.name == "script-harness" for thread in threading.enumerate()) and time.time() < deadline:
+        time.sleep(0.01)
+    assert not any(thread.name == "script-harness" for thread in threading.enumerate())
+    assert sys.stdout is stdout  # redirection only lasts while scripts run
+    harness.close()
+    pool.close()
+
+
+def test_open_page_reuses_stored_session_and_logs_in_again_when_rejected(tmp_path, monkeypatch):
+    import logging
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from autotest.core import session_store
+    from autotest.db.database import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'sessions.db'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(session_store, "SessionLocal", sessionmaker(bind=engine))
+
+    class SiteDriver:
+        """Browser of a site that redirects to /login without a valid 'sid' cookie"""
+        valid_sid = "first"
+
+        def __init__(self):
+            self.cookies = {}
+            self.current_url = "about:blank"
+
+        def get(self, url):
+            protected = url.startswith("https://app.example.com/") and url != "https://app.example.com/login"
+            if protected and self.cookies.get("sid") != self.valid_sid:
+                url = "https://app.example.com/login"
+            self.current_url = url
+
+        def get_cookies(self):
+            return [{"name": name, "value": value, "path": "/"} for name, value in self.cookies.items()]
+
+        def add_cookie(self, cookie):
+            self.cookies[cookie["name"]] = cookie["value"]
+
+        def execute_script(self, script, *args):
+            return {"token": "abc"} if script == session_store._LOCAL_STORAGE_SCRIPT else None
+
+    logins = []
+
+    def login_to_website(url, username, password):
+        logins.append(url)
+        tester.driver.cookies["sid"] = SiteDriver.valid_sid
+        tester.driver.get(url)
+        return True
+
+    tester = WebTestGenerator.__new__(WebTestGenerator)
+    tester.logger = logging.getLogger("test")
+    tester.session_store = session_store.SessionStore(tester.logger)
+    tester._session_key = None
+    tester._requires_login = lambda: True
+    tester.login_to_website = login_to_website
+    tester.driver = SiteDriver()
+
+    assert tester._open_page("https://app.example.com/a", "user", "pw") is True
+    assert tester.script_session_state is None  # scripts of the login page log in themselves
+
+    # A fresh browser (e.g. a URL worker) starts from the stored session
+    tester.driver = SiteDriver()
+    tester._session_key = None
+    assert tester._open_page("https://app.example.com/b", "user", "pw") is False
+    assert tester.script_session_state["cookies"] == [{"name": "sid", "value": "first", "path": "/"}]
+    assert tester.script_session_state["local_storage"] == {"token": "abc"}
+    assert len(logins) == 1
+
+    # The site expires the session: log in again and store the new one
+    SiteDriver.valid_sid = "second"
+    assert tester._open_page("https://app.example.com/c", "user", "pw") is True
+    assert len(logins) == 2
+    assert tester.session_store.get("https://app.example.com/d", "user")["cookies"][0]["value"] == "second"
+
+    # Another account never starts from this account's session, and runs without credentials restore none
+    tester.driver = SiteDriver()
+    tester._session_key = None
+    assert tester.session_store.get("https://app.example.com/d", "admin") is None
+    assert tester._open_page("https://app.example.com/e", "admin", "pw") is True
+    assert len(logins) == 3
+    tester.driver = SiteDriver()
+    tester._session_key = None
+    assert tester._open_page("https://app.example.com/f", None, None) is None